@@ -23,13 +23,13 @@
 
 # Core stuff
 import os
-from pathlib import Path
 import re
 import json
 
 # Data stuff
 import pandas as pd # Data analysis
 import xlrd # excel 
+from exams.loader import load_excel_to_df
 
 # Configuration (initial setup)
 with open('config.json', 'r') as file:
@@ -40,40 +40,6 @@
 country = config['country']
 cwd = os.getcwd()
 
-
-# %%
-def load_excel_to_df(filename):
-    """Loads an Excel filename to a Pandas DataFrame.
-
-    Parameters
-    ----------
-    filename : str, required
-        The filename of the excel file to load
-
-    Raises
-    ------
-    NotImplementedError
-        Could raise unknown error. Implement if it happens
-    
-    Returns
-    -------
-    DataFrame
-    """
-    file_path = Path(filename)
-    file_extension = file_path.suffix.lower()[1:]
-
-    if file_extension == 'xlsx':
-        df = pd.read_excel(filename, index_col=None, header=0, engine='openpyxl')
-    elif file_extension == 'xls':
-        df = pd.read_excel(filename, index_col=None, header=0)
-    elif file_extension == 'csv':
-        df = pd.read_csv(filename, index_col=None, header=0)
-    else:
-        raise Exception("File not supported")
-
-    return df
-
-
 # %%
 # Testing the regex
 name = 'AllSchool_A03_2008-09_Results1.xls'
@@ -0,0 +1,6 @@
+"""Shared, importable building blocks used by the pacific-emis-exams notebooks.
+
+The notebooks remain the interactive front end. Anything heavy enough to
+benefit from running outside a notebook cell (e.g. in a worker process) lives
+here so it can be imported by name.
+"""
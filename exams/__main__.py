@@ -0,0 +1,44 @@
+"""Command line entry point to run the processing without Jupyter.
+
+    python -m exams assessment --local-path /path/to/pacific-emis-exams
+    python -m exams onlinesba --local-path /path/to/pacific-emis-exams
+
+The country, test, etc. come from config.json like in the notebooks. The data
+directory is the local_path of the notebooks, given on the command line or as
+local_path in config.json.
+"""
+import argparse
+import json
+import sys
+
+STAGES = ['assessment', 'onlinesba']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m exams', description='Process SOE Assessment workbooks.')
+    parser.add_argument('stage', choices=STAGES,
+                        help='assessment: SOE Assessment workbooks, onlinesba: OnlineSBA load files')
+    parser.add_argument('--config', default='config.json', help='the configuration file (default: config.json)')
+    parser.add_argument('--local-path', help='the root directory of the data (default: local_path in config.json)')
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r') as file:
+        config = json.load(file)
+    local_path = args.local_path or config.get('local_path')
+    if local_path is None:
+        parser.error('--local-path is required when config.json has no local_path')
+
+    from exams import pipeline
+    if args.stage == 'assessment':
+        outputs, errors = pipeline.run_assessment(config, local_path)
+    else:
+        outputs, errors = pipeline.run_onlinesba(config, local_path)
+
+    for filename, error in errors.items():
+        print('Problem processing file: {} ({})'.format(filename, error))
+    print('Completed {} files ({} problems)'.format(len(outputs), len(errors)))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""The AggregateScores sheet of an SOE Assessment computed in a single pass.
+
+From the Scores sheet and the item hierarchy, the number of correct items of
+every indicator, benchmark, standard and test comes out of one matrix product
+and every family of levels is derived from it with array operations only:
+
+* Level of the indicators (bins on the items of the indicator)
+* *_L1Percent..*_L4Percent and weighted Level of benchmarks, standards and test
+  (proportion of their indicators at each level)
+* LevelAlt of benchmarks, standards and test (bins on all their items)
+"""
+import pandas as pd
+
+from exams.levels import assign_levels, level_percents, weighted_levels, levels_to_labels, levels_to_frame
+
+# The families of groups which get weighted and alternative levels
+WEIGHTED_LEVELS = ['benchmarks', 'standards', 'test']
+
+
+def levels_percent_columns(hierarchy, level):
+    """Returns the L1Percent..L4Percent columns of each group of a level
+    e.g. {'A.6.2': ['A.6.2_L1Percent','A.6.2_L2Percent','A.6.2_L3Percent','A.6.2_L4Percent']}.
+    Following SOE, the test ones are not prefixed (i.e. {'A.6': ['L1Percent', etc.]})."""
+    if level == 'test':
+        return {g: ['L{}Percent'.format(k) for k in range(1, 5)] for g in hierarchy.groups[level]}
+    return {g: ['{}_L{}Percent'.format(g, k) for k in range(1, 5)] for g in hierarchy.groups[level]}
+
+
+def aggregate_scores(df_scores, hierarchy, achievement_levels, tie_break='best'):
+    """Computes all the AggregateScores columns.
+
+    Parameters
+    ----------
+    df_scores : DataFrame, required
+        The Scores sheet (1 correct, 0 incorrect for each item column)
+    hierarchy : ItemHierarchy, required
+        The hierarchy of the item columns of df_scores
+    achievement_levels : List, required
+        The labels of the 4 levels (e.g. ['Beginning', 'Developing', 'Proficient', 'Advanced'])
+    tie_break : String, optional
+        'best' or 'worst' level when a weighted level is a tie (see weighted_levels)
+
+    Returns
+    -------
+    DataFrame
+        The aggregated columns in the order of SOE AggregateScores, i.e. sums and
+        totals, indicators Level, benchmarks *_LxPercent and Level, standards
+        *_LxPercent and Level, TotalScore*, LxPercent, test Level, AYP and finally
+        the LevelAlt of benchmarks, standards and test
+    """
+    index = df_scores.index
+    sums, totals = hierarchy.sums(df_scores)
+    indicators = hierarchy.slices['indicators']
+    indicators_levels = assign_levels(sums[:, indicators], totals[:, indicators])
+
+    percents = {}
+    weighted = {}
+    for level in WEIGHTED_LEVELS:
+        groups = hierarchy.groups[level]
+        percents[level] = level_percents(indicators_levels, hierarchy.indicator_groups(level), len(groups))
+        weighted[level] = pd.DataFrame(levels_to_labels(weighted_levels(percents[level], tie_break), achievement_levels),
+                                       index=index, columns=[g + 'Level' for g in groups])
+
+    def percents_frame(level):
+        percent_columns = levels_percent_columns(hierarchy, level)
+        return pd.DataFrame(percents[level].reshape(len(index), -1), index=index,
+                            columns=[c for g in hierarchy.groups[level] for c in percent_columns[g]])
+
+    # A file contains a single test hence the unprefixed LxPercent columns
+    test_percents = percents['test'][:, -1, :]
+    total_score = sums[:, hierarchy.slices['test']].sum(axis=1)
+
+    alt = slice(hierarchy.slices[WEIGHTED_LEVELS[0]].start, hierarchy.slices[WEIGHTED_LEVELS[-1]].stop)
+    levels_alt = assign_levels(sums[:, alt], totals[:, alt])
+
+    return pd.concat([
+        hierarchy.to_frame(sums, totals, index=index),
+        levels_to_frame(indicators_levels, [i + 'Level' for i in hierarchy.groups['indicators']],
+                        achievement_levels, index=index),
+        percents_frame('benchmarks'), weighted['benchmarks'],
+        percents_frame('standards'), weighted['standards'],
+        pd.DataFrame({'TotalScore': total_score,
+                      'TotalScore_LowerLimit': total_score - 6,
+                      'TotalScore_UpperLimit': total_score + 6}, index=index),
+        pd.DataFrame(test_percents, index=index, columns=['L1Percent', 'L2Percent', 'L3Percent', 'L4Percent']),
+        weighted['test'],
+        pd.DataFrame({'AYP': test_percents[:, 2] + test_percents[:, 3]}, index=index),
+        levels_to_frame(levels_alt, [g + 'LevelAlt' for g in hierarchy.columns[alt]],
+                        achievement_levels, index=index),
+    ], axis=1)
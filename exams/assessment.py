@@ -0,0 +1,167 @@
+"""The SOE Assessment pipeline of soe-assessment.ipynb without the notebook.
+
+A Responses sheet goes through Scores and AggregateScores exactly like in the
+notebook and the three sheets are written to a workbook. The batch version
+does this for every AllSchools workbook of a country/test (one workbook per
+exam-year) using a pool of worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from exams.aggregate import aggregate_scores
+from exams.cache import WorkbookCache
+from exams.export import write_excel_sheets, write_side_outputs
+from exams.hierarchy import ItemHierarchy
+from exams.loader import find_excel_files, _load_one
+from exams.scoring import score_matrix
+
+
+def score_workbook(df_student_results, achievement_levels, tie_break='best'):
+    """Produces the Scores and AggregateScores sheets of a Responses sheet.
+
+    Parameters
+    ----------
+    df_student_results : DataFrame, required
+        The Responses sheet of an SOE Assessment workbook
+    achievement_levels : List, required
+        The labels of the 4 levels (e.g. ['Beginning', 'Developing', 'Proficient', 'Advanced'])
+    tie_break : String, optional
+        'best' or 'worst' level when a weighted level is a tie
+
+    Returns
+    -------
+    df_student_results_scores, df_student_results_aggscores : DataFrame
+    """
+    cols_items = sorted(c for c in df_student_results.columns if 'Item_' in c)
+
+    df_student_results_scores = df_student_results.copy()
+    df_student_results_scores[cols_items] = score_matrix(df_student_results_scores, cols_items)
+
+    hierarchy = ItemHierarchy(cols_items)
+    df_student_results_aggscores = pd.concat([df_student_results_scores,
+                                              aggregate_scores(df_student_results_scores, hierarchy,
+                                                               achievement_levels, tie_break=tie_break)], axis=1)
+    df_student_results_aggscores = df_student_results_aggscores.drop(cols_items, axis=1)
+    return df_student_results_scores, df_student_results_aggscores
+
+
+def write_assessment_workbook(filename, df_student_results, df_student_results_scores, df_student_results_aggscores,
+                              streaming=True, side_outputs=()):
+    """Writes the Responses, Scores and AggregateScores sheets to an Excel workbook
+    (see exams.export).
+
+    Parameters
+    ----------
+    filename : str, required
+        The .xlsx workbook to write
+    df_student_results, df_student_results_scores, df_student_results_aggscores : DataFrame, required
+        The Responses, Scores and AggregateScores sheets
+    streaming : Boolean, optional
+        Use the constant memory streaming writer
+    side_outputs : List, optional
+        Also write each sheet to 'parquet' and/or 'csv' files next to the workbook
+    """
+    sheets = {'Responses': df_student_results,
+              'Scores': df_student_results_scores,
+              'AggregateScores': df_student_results_aggscores}
+    write_excel_sheets(filename, sheets, streaming=streaming)
+    if side_outputs:
+        write_side_outputs(filename, sheets, side_outputs)
+
+
+def assessment_workbook_filename(output_path, name):
+    """e.g. .../soe-assessment-workbook-AllSchools_A03_2018-19_Results.xlsx for AllSchools_A03_2018-19_Results.xls"""
+    return os.path.join(output_path, 'soe-assessment-workbook-{}.xlsx'.format(Path(name).stem))
+
+
+def _assess_one(filename, output_filename, achievement_levels, tie_break, cache_path=None, fingerprint=None,
+                side_outputs=()):
+    """Worker running the whole pipeline on one workbook. Returns the error as
+    a string instead of raising so that one bad workbook never takes the whole
+    pool down."""
+    df = None
+    if cache_path is not None:
+        try:
+            df = WorkbookCache(cache_path).get(fingerprint)
+        except Exception:
+            # An unreadable cache entry is only a cache miss
+            df = None
+    if df is None:
+        df, error = _load_one(filename, cache_path, fingerprint)
+        if error is not None:
+            return error
+    try:
+        df_scores, df_aggscores = score_workbook(df, achievement_levels, tie_break)
+        write_assessment_workbook(output_filename, df, df_scores, df_aggscores, side_outputs=side_outputs)
+    except Exception as e:
+        return '{}: {}'.format(type(e).__name__, e)
+    return None
+
+
+def assess_excel_files(path, output_path, achievement_levels, tie_break='best', processes=None, cache_path=None,
+                       side_outputs=()):
+    """Runs the SOE Assessment pipeline over every AllSchools workbook inside
+    a directory tree (e.g. .../RMI/MISAT) in parallel.
+
+    Parameters
+    ----------
+    path : str, required
+        The root directory to walk
+    output_path : str, required
+        Directory where to write one workbook per AllSchools workbook (created if needed)
+    achievement_levels : List, required
+        The labels of the 4 levels
+    tie_break : String, optional
+        'best' or 'worst' level when a weighted level is a tie
+    processes : int, optional
+        Number of worker processes. None uses all cores, 1 runs sequentially
+        in the current process.
+    cache_path : str, optional
+        Directory of the parsed workbooks cache (see exams.cache). None disables the cache.
+    side_outputs : List, optional
+        Also write each sheet to 'parquet' and/or 'csv' files next to the workbooks
+
+    Returns
+    -------
+    outputs : Dict
+        The workbooks written keyed by source file name
+        (e.g. {'AllSchools_A03_2018-19_Results.xls': '.../soe-assessment-workbook-AllSchools_A03_2018-19_Results.xlsx'})
+    errors : Dict
+        The source files that could not be processed and why
+    """
+    filenames = {name: f for name, f in find_excel_files(path).items() if name.startswith('AllSchools_')}
+    os.makedirs(output_path, exist_ok=True)
+
+    fingerprints = {}
+    if cache_path is not None:
+        cache = WorkbookCache(cache_path)
+        fingerprints = {name: cache.fingerprint(f) for name, f in filenames.items()}
+        cache.save_index()
+
+    names = list(filenames)
+    output_filenames = [assessment_workbook_filename(output_path, name) for name in names]
+    args = ([filenames[name] for name in names],
+            output_filenames,
+            [achievement_levels] * len(names),
+            [tie_break] * len(names),
+            [cache_path] * len(names),
+            [fingerprints.get(name) for name in names],
+            [side_outputs] * len(names))
+
+    if processes == 1 or len(names) <= 1:
+        results = list(map(_assess_one, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_assess_one, *args))
+
+    outputs = {}
+    errors = {}
+    for name, output_filename, error in zip(names, output_filenames, results):
+        if error is None:
+            outputs[name] = output_filename
+        else:
+            errors[filenames[name]] = error
+    return outputs, errors
@@ -0,0 +1,180 @@
+"""On-disk cache of parsed SOE workbooks.
+
+Parsing .xls/.xlsx files is by far the slowest part of loading the data, so
+each parsed Responses sheet is stored as a Parquet file named after the hash
+of the workbook content. A small JSON index remembers the path, modification
+time and size of every workbook already hashed so unchanged files are not
+even re-read to compute their hash.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+# Bump whenever load_excel_to_df changes in a way that affects its output so
+# that stale cache entries are simply ignored.
+CACHE_VERSION = 2
+
+# Parquet schema metadata key listing the columns stored JSON encoded
+JSON_COLUMNS_KEY = b'exams_json_columns'
+
+
+def hash_file(filename, chunk_size=1024 * 1024):
+    """Returns the SHA1 hex digest of a file content."""
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def atomic_write(filename, write):
+    """Calls write(tmp_filename) and then renames the temporary file into place
+    so that a reader (or a crash) never sees a half written cache entry. The
+    temporary file keeps the extension since some writers (e.g. openpyxl) check it."""
+    root, extension = os.path.splitext(filename)
+    tmp_filename = '{}.{}.tmp{}'.format(root, os.getpid(), extension)
+    try:
+        write(tmp_filename)
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+def encode_mixed_columns(df, encode=json.dumps, skipna=False):
+    """Parquet columns must have a single type but the raw SOE workbooks are
+    dirty (e.g. a SchoolID column with both 101 and 'AIL101'). Those columns
+    are encoded one value per cell (JSON by default, decoded back on read by
+    the cache).
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The DataFrame to store as Parquet
+    encode : Callable, optional
+        Function encoding a value to a string (e.g. json.dumps or str)
+    skipna : bool, optional
+        Whether to leave the missing values as they are instead of encoding them
+
+    Returns
+    -------
+    df : DataFrame
+        df itself or a copy with the mixed columns encoded
+    columns : List
+        The encoded columns
+    """
+    columns = [c for c in df.columns
+               if df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True).startswith('mixed')]
+    if columns:
+        df = df.copy()
+        for c in columns:
+            values = [encode(v) for v in df[c]]
+            df[c] = df[c].where(df[c].isna(), values) if skipna else values
+    return df, columns
+
+
+class WorkbookCache:
+    """Cache of parsed workbooks keyed by file path, modification time and content hash.
+
+    Parameters
+    ----------
+    cache_path : str, required
+        Directory where the cache lives (created if needed)
+    """
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.index_filename = os.path.join(cache_path, 'index.json')
+        os.makedirs(cache_path, exist_ok=True)
+        try:
+            with open(self.index_filename, 'r') as file:
+                self.index = json.load(file)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def fingerprint(self, filename):
+        """Returns the content hash of a workbook. The hash is only recomputed
+        when the path, modification time or size changed since last time."""
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        entry = self.index.get(path)
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry['sha1']
+        sha1 = hash_file(path)
+        self.index[path] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha1': sha1}
+        return sha1
+
+    def _entry(self, fingerprint, extension):
+        return os.path.join(self.cache_path, 'v{}-{}.{}'.format(CACHE_VERSION, fingerprint, extension))
+
+    def get(self, fingerprint):
+        """Returns the cached DataFrame for a fingerprint or None on a cache miss."""
+        filename = self._entry(fingerprint, 'parquet')
+        if os.path.exists(filename):
+            import pyarrow.parquet as pq
+            table = pq.read_table(filename)
+            df = table.to_pandas()
+            metadata = table.schema.metadata or {}
+            for c in json.loads(metadata.get(JSON_COLUMNS_KEY, b'[]')):
+                df[c] = [json.loads(v) for v in df[c]]
+            return df
+        filename = self._entry(fingerprint, 'pkl')
+        if os.path.exists(filename):
+            with open(filename, 'rb') as file:
+                return pickle.load(file)
+        return None
+
+    def put(self, fingerprint, df):
+        """Stores a parsed workbook. Frames Parquet cannot represent (e.g. non
+        string column names, which pyarrow would silently convert) are pickled instead."""
+        if all(isinstance(c, str) for c in df.columns):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                df_encoded, json_columns = encode_mixed_columns(df)
+                table = pa.Table.from_pandas(df_encoded)
+                metadata = dict(table.schema.metadata or {})
+                metadata[JSON_COLUMNS_KEY] = json.dumps(json_columns).encode()
+                table = table.replace_schema_metadata(metadata)
+                atomic_write(self._entry(fingerprint, 'parquet'), lambda f: pq.write_table(table, f))
+                return
+            except Exception:
+                pass
+        def write_pickle(f):
+            with open(f, 'wb') as file:
+                pickle.dump(df, file, protocol=pickle.HIGHEST_PROTOCOL)
+        atomic_write(self._entry(fingerprint, 'pkl'), write_pickle)
+
+    def save_index(self):
+        """Persists the path/mtime/size to hash index."""
+        def write_index(f):
+            with open(f, 'w') as file:
+                json.dump(self.index, file, indent=1)
+        atomic_write(self.index_filename, write_index)
+
+
+def fingerprint_files(filenames, cache_path=None):
+    """The content hash of several workbooks, through the path/mtime/size index
+    of the cache when there is one (unchanged workbooks are then not re-read).
+
+    Parameters
+    ----------
+    filenames : Dict, required
+        The workbooks keyed by file name (see exams.loader.find_excel_files)
+    cache_path : str, optional
+        Directory of the parsed workbooks cache. None hashes every workbook.
+
+    Returns
+    -------
+    Dict
+        The fingerprints keyed by file name
+    """
+    if cache_path is None:
+        return {name: hash_file(filename) for name, filename in filenames.items()}
+    cache = WorkbookCache(cache_path)
+    fingerprints = {name: cache.fingerprint(filename) for name, filename in filenames.items()}
+    cache.save_index()
+    return fingerprints
@@ -0,0 +1,392 @@
+"""SOE and Pacific EMIS style charts of the Results sheet summaries.
+
+The charts of soe-assessment.ipynb (the *_summary_per and *_summary_per_x
+DataFrames) drawn in a notebook or rendered to PNG/SVG files in batch. The
+style of the bars is given once per level (i.e. per bar container) when the
+bars are drawn instead of restyling every bar afterwards. The batch rendering
+draws on plain Figure objects (Agg canvas, no pyplot or GUI) in a pool of
+worker processes. Rendered charts can be kept in a cache keyed by the hash of
+what is plotted so that only new or changed charts are rendered again.
+"""
+import hashlib
+import json
+import os
+import shutil
+import warnings
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from exams.cache import atomic_write
+
+FORMATS = ['png', 'svg']
+
+# Bump whenever plot_soe, plot_emis or render_chart change what is drawn so
+# that stale cached charts are simply ignored.
+CHART_CACHE_VERSION = 1
+
+# The style of each level (column) in the order of exams.summary.prepare_for_chart
+# i.e. levels 3, 4, 2 and 1
+SOE_STYLE = [
+    {'hatch': '----', 'color': '#ffffff', 'edgecolor': '#0000ff'},
+    {'hatch': 'ooo', 'color': '#ffffff', 'edgecolor': '#800080'},
+    {'hatch': '////', 'color': '#ffffff', 'edgecolor': '#008000'},
+    {'hatch': '\\\\\\\\', 'color': '#ffffff', 'edgecolor': '#ff0000'},
+]
+EMIS_STYLE = [
+    {'color': '#92d050'},
+    {'color': '#00b050'},
+    {'color': '#ffc000'},
+    {'color': '#ff0000'},
+]
+
+# The x label of each metric and the y label and title of each variant of the
+# summaries (see students_each_rubric_level and level_count_each_rubric_level_soe)
+METRIC_LABELS = {'indicators': 'Indicators', 'benchmarks': 'Benchmarks', 'standards': 'Standard', 'test': 'Whole test'}
+VARIANTS = {
+    '': ('Student', 'Level Percentage Method'),
+    'alt': ('Student', 'Item Count Method'),
+    'weighted': ('Indicators (Level count)', 'Weighted Method'),
+    'soe': ('Indicators (Level count)', 'Indicators Level Count Method'),
+}
+
+
+def plottable(df):
+    """The levels as columns and the benchmarks (or standards, etc.) as rows
+    without the Total row of a *_summary_per DataFrame."""
+    return df.drop('Total', axis='index').T.sort_index()
+
+
+class PlottableSummaries(Mapping):
+    """The *_summary_per DataFrames of summaries (e.g. students_each_rubric_level)
+    ready for plotting, each prepared when first accessed and then kept. Like
+    RubricSummary plotting one chart does not build all the other summaries.
+
+    Parameters
+    ----------
+    summaries : Mapping, required
+        The summaries keyed by name e.g. {'df_indicators_summary_per': df, etc.}
+    prepare : Callable, optional
+        Function of the name and DataFrame returning the DataFrame to plot
+        (plottable by default)
+    """
+
+    def __init__(self, summaries, prepare=None):
+        self._summaries = summaries
+        self._prepare = prepare or (lambda name, df: plottable(df))
+        self._names = [name for name in summaries if 'summary_per' in name]
+        self._dfs = {}
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        if name not in self._dfs:
+            self._dfs[name] = self._prepare(name, self._summaries[name])
+        return self._dfs[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+def _stacked_bars(ax, df, styles, horizontal=False):
+    """Draws the stacked bars of each column of df with the style of that column.
+    Like pandas positive and negative values are stacked on their own side of 0."""
+    values = np.nan_to_num(df.to_numpy(dtype=np.float64))
+    positions = np.arange(len(df))
+    positive = np.zeros(len(df))
+    negative = np.zeros(len(df))
+    for column, v, style in zip(df.columns, values.T, styles):
+        start = np.where(v >= 0, positive, negative)
+        if horizontal:
+            ax.barh(positions, v, height=0.5, left=start, label=str(column), **style)
+        else:
+            ax.bar(positions, v, width=0.5, bottom=start, label=str(column), **style)
+        positive += np.where(v >= 0, v, 0)
+        negative += np.where(v < 0, v, 0)
+    labels = [str(i) for i in df.index]
+    if horizontal:
+        ax.set_yticks(positions, labels)
+    else:
+        ax.set_xticks(positions, labels, rotation=90)
+    return values
+
+
+def _percent_labels(ax, values, horizontal=False, offset=0.0):
+    """Writes the percent of every non empty bar in its middle (shifted by offset along the bars' axis)."""
+    rows, cols = np.nonzero(values)
+    v = values[rows, cols]
+    # the middle of each bar is its start plus half its value
+    cumulative = np.where(values >= 0, np.cumsum(np.where(values >= 0, values, 0), axis=1),
+                          np.cumsum(np.where(values < 0, values, 0), axis=1))
+    middle = cumulative[rows, cols] - v / 2
+    for position, m, text in zip(rows + offset, middle, np.char.mod('%.0f%%', np.abs(v) * 100)):
+        x, y = (m, position) if horizontal else (position, m)
+        ax.text(x, y, text, ha='center', va='center', fontsize=8)
+
+
+def plot_soe(df, exam, label='xlabel', dimension='Students', title='N/A',
+             country_name='Republic of the Marshall Islands', ax=None):
+    """A function to plot a DataFrame in SOE style.
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The DataFrame to plot the graph with (see plottable)
+    exam : String, required
+        The name of the exam (i.e. TestName)
+    label : String, optional
+        A string that will be show in the X axis label
+    dimension : String, optional
+        A string to modify that Y axis label. In general for this plots we have two types of analysis:
+            - SOE style of "level counts" or counting of indicators in a particular benchmark/standard/test at each performance level
+            - EMIS styles (more common) of counting of students  in a particular benchmark/standard/test at each performance level
+    title : String, optional
+        The method used to produce df
+    country_name : String, optional
+        The first line of the title
+    ax : Axes, optional
+        Where to draw the chart (a new figure when None)
+
+    Returns
+    -------
+    fig : Figure
+    """
+    import matplotlib.pyplot as plt
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(8, 4))
+    else:
+        fig = ax.figure
+
+    values = _stacked_bars(ax, df, SOE_STYLE)
+    _percent_labels(ax, values, offset=0.45)
+
+    ax.set_title('{}\n{}\nAll Students of AllSchools\nSOE Chart Style ({})'.format(country_name, exam, title), color='black')
+    ax.set_xlabel(label)
+    ax.set_ylabel('Percent of '+dimension+' in Each Performance Level')
+    ax.legend(loc='upper right', bbox_to_anchor=(1.0, 1.35))
+    return fig
+
+
+def plot_emis(df, exam, label='xlabel', dimension='Students', title='N/A',
+              country_name='Republic of the Marshall Islands', ax=None):
+    """A function to plot a DataFrame in EMIS style.
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The DataFrame to plot the graph with (see plottable)
+    exam : String, required
+        The name of the exam (i.e. TestName)
+    label : String, optional
+        A string that will be show in the X axis label
+    dimension : String, optional
+        A string to modify that Y axis label (see plot_soe)
+    title : String, optional
+        The method used to produce df
+    country_name : String, optional
+        The first line of the title
+    ax : Axes, optional
+        Where to draw the chart (a new figure when None)
+
+    Returns
+    -------
+    fig : Figure
+    """
+    import matplotlib.pyplot as plt
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(8, 6))
+    else:
+        fig = ax.figure
+
+    values = _stacked_bars(ax, df, EMIS_STYLE, horizontal=True)
+    _percent_labels(ax, values, horizontal=True)
+
+    ax.set_title('{}\n{}\nAll Students of AllSchools\nPacific EMIS Chart Style ({})'.format(country_name, exam, title), color='black')
+    ax.set_xlabel(label)
+    ax.set_ylabel('Percent of '+dimension+' in Each Performance Level')
+    ax.legend(loc='upper right', bbox_to_anchor=(1.0, 1.5))
+    return fig
+
+
+PLOTS = {'soe': plot_soe, 'emis': plot_emis}
+FIGSIZES = {'soe': (8, 4), 'emis': (8, 6)}
+STYLES = {'soe': SOE_STYLE, 'emis': EMIS_STYLE}
+SAVEFIG_KWARGS = {'bbox_inches': 'tight'}
+# The matplotlib settings changing the rendered files (see chart_key)
+RC_PARAMS = ['figure.dpi', 'savefig.dpi', 'font.family', 'font.size', 'hatch.linewidth', 'svg.fonttype']
+
+
+def chart_jobs(exam, summaries, variant=None):
+    """The charts of every *_summary_per (SOE style) and *_summary_per_x (EMIS style)
+    DataFrame of a RubricSummaries (the gender versions are not charted).
+
+    Parameters
+    ----------
+    exam : String, required
+        The name of the exam (i.e. TestName)
+    summaries : Mapping, required
+        e.g. students_each_rubric_level or level_count_each_rubric_level_soe
+    variant : String, optional
+        'soe' for level_count_each_rubric_level_soe, None for the student counts
+
+    Returns
+    -------
+    jobs : List
+        One dict per chart with the keyword arguments of render_chart
+    """
+    jobs = []
+    for name in summaries:
+        parts = name.split('_')
+        if parts[2:] not in (['summary', 'per'], ['summary', 'per', 'x']):
+            continue
+        base = next(m for m in METRIC_LABELS if parts[1].startswith(m))
+        dimension, title = VARIANTS[variant or parts[1][len(base):]]
+        if base == 'indicators':
+            title = 'Item Count Method'
+        style = 'emis' if parts[-1] == 'x' else 'soe'
+        # e.g. 'MISAT Grade 6 Math-df_benchmarks_summary_per_x' or 'MISAT Grade 6 Math-soe-df_benchmarks_summary_per'
+        jobs.append({'name': '-'.join([exam] + ([variant] if variant else []) + [name]),
+                     'style': style, 'df': plottable(summaries[name]), 'exam': exam,
+                     'label': METRIC_LABELS[base], 'dimension': dimension, 'title': title})
+    return jobs
+
+
+def render_chart(filename_root, style, df, exam, label, dimension, title, formats=FORMATS):
+    """Renders one chart to filename_root.png, filename_root.svg, etc. Returns
+    the error as a string instead of raising so that one bad chart never takes
+    the whole pool down."""
+    from matplotlib.figure import Figure
+
+    try:
+        # Not registered with pyplot: nothing to close and no GUI backend involved
+        fig = Figure(figsize=FIGSIZES[style])
+        PLOTS[style](df, exam, label, dimension, title, ax=fig.subplots())
+        for extension in formats:
+            atomic_write('{}.{}'.format(filename_root, extension),
+                         lambda f: fig.savefig(f, **SAVEFIG_KWARGS))
+    except Exception as e:
+        return '{}: {}'.format(type(e).__name__, e)
+    return None
+
+
+def chart_key(job):
+    """The SHA1 hex digest of everything a chart depends on: the plotted DataFrame
+    (values, index and columns i.e. the achievement levels), the style, exam,
+    labels and title and the figure and rendering settings (figure size, bar
+    styles, savefig arguments, matplotlib version and settings)."""
+    import matplotlib
+    df = job['df']
+    style = job['style']
+    settings = [FIGSIZES.get(style), STYLES.get(style), SAVEFIG_KWARGS, matplotlib.__version__,
+                [str(matplotlib.rcParams[p]) for p in RC_PARAMS]]
+    h = hashlib.sha1(json.dumps([CHART_CACHE_VERSION, style, job['exam'], job['label'], job['dimension'],
+                                 job['title'], [str(c) for c in df.columns], settings]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class ChartCache:
+    """Cache of rendered chart files keyed by chart_key.
+
+    Parameters
+    ----------
+    cache_path : str, required
+        Directory where the cache lives (created if needed)
+    """
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        os.makedirs(cache_path, exist_ok=True)
+
+    def _entry(self, key, extension):
+        return os.path.join(self.cache_path, '{}.{}'.format(key, extension))
+
+    def get(self, key, filename_root, formats=FORMATS):
+        """Copies the cached files of a chart to filename_root.png, etc. Returns
+        False (and copies nothing) unless every format is cached."""
+        entries = [self._entry(key, extension) for extension in formats]
+        if not all(os.path.exists(entry) for entry in entries):
+            return False
+        for entry, extension in zip(entries, formats):
+            atomic_write('{}.{}'.format(filename_root, extension), lambda f: shutil.copyfile(entry, f))
+        return True
+
+    def put(self, key, filename_root, formats=FORMATS):
+        """Stores the rendered files filename_root.png, etc. of a chart."""
+        for extension in formats:
+            atomic_write(self._entry(key, extension),
+                         lambda f: shutil.copyfile('{}.{}'.format(filename_root, extension), f))
+
+
+def _render_job(output_path, formats, job):
+    job = dict(job)
+    return render_chart(os.path.join(output_path, job.pop('name')), formats=formats, **job)
+
+
+def render_charts(jobs, output_path, formats=FORMATS, processes=None, cache_path=None):
+    """Renders many charts (e.g. those of chart_jobs of every exam) to files in parallel.
+
+    Parameters
+    ----------
+    jobs : List, required
+        The charts to render (see chart_jobs)
+    output_path : str, required
+        Directory where to write the charts (created if needed)
+    formats : List, optional
+        The file formats (i.e. extensions) to write each chart to
+    processes : int, optional
+        Number of worker processes. None uses all cores, 1 runs sequentially
+        in the current process.
+    cache_path : str, optional
+        Directory of the rendered charts cache (see ChartCache). Only the charts
+        not found in it are rendered. None disables the cache.
+
+    Returns
+    -------
+    outputs : Dict
+        The files written keyed by chart name
+    errors : Dict
+        The charts that could not be rendered and why
+    """
+    os.makedirs(output_path, exist_ok=True)
+
+    names = [job['name'] for job in jobs]
+
+    # Unchanged charts are copied from the cache, only the others are rendered
+    if cache_path is not None:
+        cache = ChartCache(cache_path)
+        keys = {job['name']: chart_key(job) for job in jobs}
+        def cached(job):
+            # A cache that cannot be read is a cache miss
+            try:
+                return cache.get(keys[job['name']], os.path.join(output_path, job['name']), formats)
+            except Exception:
+                return False
+        jobs = [job for job in jobs if not cached(job)]
+
+    rendered = [job['name'] for job in jobs]
+    args = ([output_path] * len(jobs), [formats] * len(jobs), jobs)
+
+    if processes == 1 or len(jobs) <= 1:
+        results = list(map(_render_job, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_render_job, *args))
+
+    errors = {name: error for name, error in zip(rendered, results) if error is not None}
+    if cache_path is not None:
+        for name in rendered:
+            if name not in errors:
+                # The chart itself was rendered fine, it only will not be reused
+                try:
+                    cache.put(keys[name], os.path.join(output_path, name), formats)
+                except Exception as e:
+                    warnings.warn('Could not cache chart {} ({}: {})'.format(name, type(e).__name__, e))
+    outputs = {name: [os.path.join(output_path, '{}.{}'.format(name, extension)) for extension in formats]
+               for name in names if name not in errors}
+    return outputs, errors
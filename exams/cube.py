@@ -0,0 +1,141 @@
+"""Results cube: number of students per island, school, gender, metric and level.
+
+The levels of every Level column of the AggregateScores sheet are counted for
+every island, school and gender in one pass (a single bincount over the
+students x columns matrix of level codes). The Results sheet of any school or
+island (or all of them) is then only a slice and sum of the cube instead of
+re-running the whole analysis on the students of that school.
+"""
+import numpy as np
+import pandas as pd
+
+from exams.summary import RubricSummary, summary_frames
+
+# The dimensions students are counted by, from the least to the most detailed
+DIMENSIONS = ['IslandName', 'SchoolName', 'Gender']
+
+
+class ResultsCube:
+    """Number of students at each level of every levels column by island, school and gender.
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The students with their dimensions (e.g. IslandName, SchoolName, Gender)
+        and levels columns (e.g. df_student_results_analysis)
+    cols_levels : Dict, required
+        The levels columns of each metric
+        e.g. {'indicators': ['A.6.2.1.3Level', etc.], 'benchmarksalt': ['A.6.2.1LevelAlt', etc.]}
+    achievement_levels : List, required
+        The labels of the 4 levels (e.g. ['Beginning', 'Developing', 'Proficient', 'Advanced'])
+    dimensions : List, optional
+        The columns of df to count the students by
+
+    Attributes
+    ----------
+    keys : MultiIndex
+        The combinations of the dimensions found in df (e.g. ('Majuro', 'Aerok A', 'F'))
+    columns : List
+        All the levels columns, metric after metric
+    counts : ndarray
+        The (keys x columns x levels) number of students
+    observed : ndarray
+        The (keys x columns x levels) levels reached by any student, with a name
+        or not (i.e. shown in the summaries even with 0 students)
+    """
+
+    def __init__(self, df, cols_levels, achievement_levels, dimensions=DIMENSIONS):
+        self.achievement_levels = list(achievement_levels)
+        self.dimensions = list(dimensions)
+        self.cols_levels = {metric: list(cols) for metric, cols in cols_levels.items()}
+        self.columns = [c for cols in self.cols_levels.values() for c in cols]
+        self.slices = {}
+        offset = 0
+        for metric, cols in self.cols_levels.items():
+            self.slices[metric] = slice(offset, offset + len(cols))
+            offset += len(cols)
+
+        # Like the Results sheet only the students with a name are counted
+        named = df['StudentName'].notna().to_numpy()
+        grouper = df.groupby(self.dimensions, dropna=False)
+        self.keys = grouper.size().index
+        key_codes = grouper.ngroup().to_numpy()
+
+        # students x columns level codes (-1 without a level)
+        codes = np.column_stack([pd.Categorical(df[c], categories=self.achievement_levels).codes
+                                 for c in self.columns]).astype(np.int64)
+        n_columns = len(self.columns)
+        n_levels = len(self.achievement_levels)
+        cells = (key_codes[:, None] * n_columns + np.arange(n_columns)) * n_levels + codes
+        shape = (len(self.keys), n_columns, n_levels)
+        self.counts = np.bincount(cells[(codes >= 0) & named[:, None]], minlength=np.prod(shape)).reshape(shape)
+        self.observed = np.bincount(cells[codes >= 0], minlength=np.prod(shape)).reshape(shape) > 0
+
+    def select(self, **selection):
+        """Returns the mask of the keys matching the selection
+        e.g. select(SchoolName='Aerok A') or select(IslandName=['Majuro', 'Ebeye'])"""
+        mask = np.ones(len(self.keys), dtype=bool)
+        for dimension, values in selection.items():
+            if dimension not in self.dimensions:
+                raise KeyError(dimension)
+            if isinstance(values, str) or not np.iterable(values):
+                values = [values]
+            mask &= self.keys.get_level_values(dimension).isin(values)
+        return mask
+
+    def to_frame(self):
+        """Returns the cube as a long DataFrame, one row per island, school, gender,
+        metric, levels column and level with at least one student."""
+        k, c, l = np.nonzero(self.counts)
+        metrics = np.array([metric for metric, cols in self.cols_levels.items() for _ in cols], dtype=object)
+        df = self.keys[k].to_frame(index=False)
+        df['metric'] = metrics[c]
+        df['column'] = np.array(self.columns, dtype=object)[c]
+        df['level'] = pd.Categorical.from_codes(l, categories=self.achievement_levels, ordered=True)
+        df['Students'] = self.counts[k, c, l]
+        return df
+
+    def summaries(self, metric, **selection):
+        """Same as exams.summary.level_summaries for the students of the selection.
+
+        Parameters
+        ----------
+        metric : String, required
+            One of the metrics of cols_levels (e.g. indicators, benchmarksalt)
+        selection : optional
+            The islands, schools, etc. to keep e.g. SchoolName='Aerok A'. All students when none.
+
+        Returns
+        -------
+        df_summary, df_summary_gender : DataFrame
+        """
+        mask = self.select(**selection)
+        counts = self.counts[mask][:, self.slices[metric], :]
+        observed = self.observed[mask][:, self.slices[metric], :]
+        names = [c.split('Level')[0] for c in self.cols_levels[metric]]
+
+        # Students without a gender are in the summary but not in the summary by gender
+        gender_codes, genders = pd.factorize(self.keys[mask].get_level_values('Gender'), sort=True)
+        with_gender = gender_codes >= 0
+        counts_gender = np.zeros((len(genders),) + counts.shape[1:], dtype=counts.dtype)
+        np.add.at(counts_gender, gender_codes[with_gender], counts[with_gender])
+        observed_gender = np.zeros(counts_gender.shape, dtype=bool)
+        np.logical_or.at(observed_gender, gender_codes[with_gender], observed[with_gender])
+
+        return summary_frames(self._series(counts.sum(axis=0), observed.any(axis=0), names),
+                              self._series(counts_gender, observed_gender, names, genders), names)
+
+    def _series(self, counts, observed, names, genders=None):
+        """The counts of the observed levels as a Series indexed by level, metric (and Gender)."""
+        cells = np.nonzero(observed)
+        index = [pd.Categorical.from_codes(cells[-1], categories=self.achievement_levels, ordered=True),
+                 pd.Categorical.from_codes(cells[-2], categories=names)]
+        if genders is not None:
+            index.append(np.asarray(genders, dtype=object)[cells[0]])
+        return pd.Series(counts[cells], index=pd.MultiIndex.from_arrays(index, names=['level', 'metric', 'Gender'][:len(index)]))
+
+    def rubric_summary(self, metric, descriptions, **selection):
+        """The RubricSummary (i.e. students_each_rubric_level of a metric) of the
+        students of the selection e.g. rubric_summary('indicators', descriptions['indicators'], SchoolName='Aerok A')"""
+        return RubricSummary(metric, lambda: self.summaries(metric, **selection), descriptions,
+                             achievement_levels=self.achievement_levels)
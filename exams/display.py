@@ -0,0 +1,23 @@
+"""Output helpers that work both inside and outside of Jupyter.
+
+The stages print their diagnostics and, when testing, display DataFrames. In a
+notebook that is IPython's rich display; when run headless (e.g. python -m exams
+on a server) IPython may not even be installed so it falls back to print.
+"""
+import pprint
+
+pp = pprint.PrettyPrinter(indent=4)
+
+
+def display(obj):
+    """IPython display when available, print otherwise."""
+    try:
+        from IPython import get_ipython
+        from IPython.display import display as ipython_display
+    except ImportError:
+        print(obj)
+        return
+    if get_ipython() is None:
+        print(obj)
+    else:
+        ipython_display(obj)
@@ -0,0 +1,59 @@
+"""Access to the Pacific EMIS database (schools and student enrolments).
+
+sqlalchemy (and the ODBC driver) are only imported when a connection is
+actually made so that stages not needing the EMIS start without them.
+"""
+import pandas as pd
+
+# For students currenly only those of that year are loaded and used to compare with exams data
+# e.g. student enrolled in 2018-19 compared with exams data for 2018-19
+QUERY_STUDENT_ENROL = """
+SELECT
+	stuCardID
+	, CONCAT(stuGiven,' ',stuFamilyName) AS Student -- stuMiddleNames,' ',
+	, stuGender
+	, stuDoB
+	, schNo
+	, stueYear
+	FROM Student_ S
+	INNER JOIN StudentEnrolment_ SE ON S.stuID = SE.stuID
+"""
+
+QUERY_SCHOOLS = """
+SELECT
+	schNo
+	, schName
+	FROM Schools
+"""
+
+
+def create_emis_engine(config):
+    """Creates the SQLAlchemy engine of the EMIS SQL Server from config.json
+    (server_ip, server_port, database, uid, pwd)."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.engine import URL
+
+    conn = """
+    Driver={{ODBC Driver 17 for SQL Server}};
+    Server={},{};
+    Database={};
+    authentication=SqlPassword;UID={};PWD={};
+    TrustServerCertificate=yes;
+    autocommit=True
+    """.format(config['server_ip'], config['server_port'], config['database'], config['uid'], config['pwd'])
+
+    connection_url = URL.create("mssql+pyodbc", query={"odbc_connect": conn})
+    return create_engine(connection_url)
+
+
+def load_emis_data(engine):
+    """Loads the student enrolments and the schools from the EMIS.
+
+    Returns
+    -------
+    df_student_enrol, df_schools : DataFrame
+    """
+    with engine.begin() as sql_conn:
+        df_student_enrol = pd.read_sql_query(QUERY_STUDENT_ENROL, sql_conn)
+        df_schools = pd.read_sql_query(QUERY_SCHOOLS, sql_conn)
+    return df_student_enrol, df_schools
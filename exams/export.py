@@ -0,0 +1,104 @@
+"""Writing the sheets of a workbook to Excel and side files.
+
+pd.ExcelWriter with openpyxl builds every cell of every sheet as an object in
+memory before saving, which is slow and heavy for AggregateScores (hundreds of
+derived columns). The streaming writer uses an openpyxl write-only workbook
+instead: rows are serialized to the file as they are appended, a block of rows
+at a time, so memory stays flat whatever the size of the cohort. The same
+sheets can also be written as Parquet or CSV files next to the workbook.
+"""
+import os
+
+import pandas as pd
+
+from exams.cache import atomic_write, encode_mixed_columns
+
+SIDE_OUTPUTS = ['parquet', 'csv']
+
+# Number of rows converted to Python values at once by the streaming writer
+CHUNK_SIZE = 1000
+
+
+def _rows(df, chunk_size=CHUNK_SIZE):
+    """The rows of df as lists of Python values with None instead of NaN/NaT/NA,
+    converted a block of rows at a time."""
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size].astype(object)
+        yield from chunk.where(chunk.notna(), None).to_numpy().tolist()
+
+
+def write_excel_sheets(filename, sheets, streaming=True):
+    """Writes DataFrames to the sheets of an Excel workbook (without the index).
+
+    Parameters
+    ----------
+    filename : str, required
+        The .xlsx workbook to write
+    sheets : Dict, required
+        The DataFrames keyed by sheet name e.g. {'Responses': df_student_results, etc.}
+    streaming : Boolean, optional
+        Use the constant memory write-only workbook. False uses pd.ExcelWriter
+        (bold header row, more memory)
+    """
+    def write_workbook(f):
+        if streaming:
+            from openpyxl import Workbook
+            wb = Workbook(write_only=True)
+            for sheet_name, df in sheets.items():
+                ws = wb.create_sheet(sheet_name)
+                ws.append([str(c) for c in df.columns])
+                for row in _rows(df):
+                    ws.append(row)
+            wb.save(f)
+        else:
+            with pd.ExcelWriter(f, engine='openpyxl') as writer:
+                for sheet_name, df in sheets.items():
+                    df.to_excel(writer, index=False, sheet_name=sheet_name)
+    atomic_write(filename, write_workbook)
+
+
+def _parquet_frame(df):
+    """The mixed columns as strings and the column names as strings (see
+    exams.cache.encode_mixed_columns)."""
+    df, _ = encode_mixed_columns(df, encode=str, skipna=True)
+    if not all(isinstance(c, str) for c in df.columns):
+        df = df.copy()
+        df.columns = [str(c) for c in df.columns]
+    return df
+
+
+def side_output_filename(filename, sheet_name, extension):
+    """e.g. .../soe-assessment-workbook-AllSchools_A03_2018-19_Results-AggregateScores.parquet
+    for the AggregateScores sheet of .../soe-assessment-workbook-AllSchools_A03_2018-19_Results.xlsx"""
+    return '{}-{}.{}'.format(os.path.splitext(filename)[0], sheet_name, extension)
+
+
+def write_side_outputs(filename, sheets, formats=SIDE_OUTPUTS):
+    """Writes each sheet of a workbook to its own Parquet and/or CSV file next to it.
+
+    Parameters
+    ----------
+    filename : str, required
+        The workbook the sheets belong to (see side_output_filename)
+    sheets : Dict, required
+        The DataFrames keyed by sheet name
+    formats : List, optional
+        'parquet' and/or 'csv'
+
+    Returns
+    -------
+    filenames : List
+        The files written
+    """
+    filenames = []
+    for sheet_name, df in sheets.items():
+        for extension in formats:
+            output_filename = side_output_filename(filename, sheet_name, extension)
+            if extension == 'parquet':
+                atomic_write(output_filename, lambda f: _parquet_frame(df).to_parquet(f, index=False))
+            elif extension == 'csv':
+                atomic_write(output_filename, lambda f: df.to_csv(f, index=False))
+            else:
+                raise ValueError('Unknown side output format: {}'.format(extension))
+            filenames.append(output_filename)
+    return filenames
@@ -0,0 +1,169 @@
+"""The Test.Grade.Standard.Benchmark.Indicator hierarchy of an SOE Assessment.
+
+Each item header encodes where the item sits in the curriculum
+(e.g. Item_001_AS0602010401E_ddd is indicator A.6.2.1.4 of benchmark A.6.2.1
+of standard A.6.2 of test A.6). The hierarchy is compiled once into a sparse
+item by group incidence matrix so that the scores of every indicator,
+benchmark, standard and test come out of a single matrix product.
+"""
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# From the most detailed to the least detailed
+LEVELS = ['indicators', 'benchmarks', 'standards', 'test']
+
+
+def item_groups(item):
+    """Returns the indicator, benchmark, standard and test of an item.
+
+    Parameters
+    ----------
+    item : String, required
+        The item string (e.g. Item_002_AS0602010402M_aaa)
+
+    Returns
+    -------
+    groups : Tuple
+        e.g. ('A.6.2.1.4', 'A.6.2.1', 'A.6.2', 'A.6')
+    """
+    item_parts = list(item.split('_')[2])
+    test = item_parts[0] + '.' + item_parts[3]
+    standard = test + '.' + item_parts[5]
+    benchmark = standard + '.' + item_parts[7]
+    indicator = benchmark + '.' + item_parts[9]
+    return indicator, benchmark, standard, test
+
+
+class ItemHierarchy:
+    """The items of a test compiled into their indicators, benchmarks, standards and test.
+
+    Parameters
+    ----------
+    cols_items : List, required
+        The item columns (e.g. ['Item_001_AS0602010401E_ddd', 'Item_002_AS0602010402M_aaa'])
+
+    Attributes
+    ----------
+    items : Dict
+        For each level the items of each group, exactly like the former
+        indicators_items, benchmarks_items, standards_items and test_items dicts
+        e.g. items['benchmarks'] = {'A.6.2.1': ['Item_001_AS0602010401E_ddd', 'Item_002_AS0602010402M_aaa']}
+    groups : Dict
+        For each level the sorted group names e.g. groups['standards'] = ['A.6.1', 'A.6.2']
+    slices : Dict
+        For each level the slice of its groups in columns e.g. slices['benchmarks'] = slice(12, 18)
+    incidence : scipy.sparse.csc_matrix
+        The (items x groups) matrix with a 1 where an item belongs to a group. The
+        groups are all the indicators, then all the benchmarks, standards and test
+    """
+
+    def __init__(self, cols_items):
+        self.cols_items = list(cols_items)
+        self.items = {level: {} for level in LEVELS}
+        for item in self.cols_items:
+            for level, group in zip(LEVELS, item_groups(item)):
+                self.items[level].setdefault(group, []).append(item)
+        self.groups = {level: sorted(self.items[level]) for level in LEVELS}
+
+        # Column offset of each group in the incidence matrix
+        self.columns = [g for level in LEVELS for g in self.groups[level]]
+        self.slices = {}
+        offset = 0
+        for level in LEVELS:
+            self.slices[level] = slice(offset, offset + len(self.groups[level]))
+            offset += len(self.groups[level])
+        item_index = {item: i for i, item in enumerate(self.cols_items)}
+        rows = []
+        cols = []
+        for level in LEVELS:
+            for j, group in enumerate(self.groups[level]):
+                for item in self.items[level][group]:
+                    rows.append(item_index[item])
+                    cols.append(self.slices[level].start + j)
+        self.incidence = sp.csc_matrix((np.ones(len(rows), dtype=np.int64), (rows, cols)),
+                                       shape=(len(self.cols_items), len(self.columns)))
+
+    def sums(self, df_scores):
+        """Computes the scores and totals of every indicator, benchmark, standard and test.
+
+        Parameters
+        ----------
+        df_scores : DataFrame, required
+            The Scores sheet (1 correct, 0 incorrect for each item column)
+
+        Returns
+        -------
+        sums, totals : ndarray
+            The (students x groups) number of correct items and total number of
+            items of each group, in the order of columns
+        """
+        scores = df_scores[self.cols_items]
+        values = np.nan_to_num(scores.to_numpy(dtype=np.float64)).astype(np.int64)
+        answered = scores.notna().to_numpy(dtype=np.int64)
+
+        sums = (self.incidence.T @ values.T).T
+        totals = (self.incidence.T @ answered.T).T
+        return sums, totals
+
+    def to_frame(self, sums, totals, index=None):
+        """Lays out sums and totals as one contiguous block with, for each level
+        in turn, the score of each group followed by its total possible score
+        (e.g. A.6.2.1.3, A.6.2.1.4, A.6.2.1.3Total, A.6.2.1.4Total, A.6.2.1, A.6.2.1Total, etc.)"""
+        blocks = []
+        names = []
+        for level in LEVELS:
+            groups = self.groups[level]
+            blocks += [sums[:, self.slices[level]], totals[:, self.slices[level]]]
+            names += groups + [g + 'Total' for g in groups]
+        return pd.DataFrame(np.hstack(blocks), index=index, columns=names)
+
+    def aggregate(self, df_scores):
+        """Same as sums but returns the DataFrame of to_frame."""
+        return self.to_frame(*self.sums(df_scores), index=df_scores.index)
+
+    def indicator_groups(self, level):
+        """Returns the position in groups[level] of the benchmark (or standard, test)
+        of each indicator, in the order of groups['indicators'].
+
+        Parameters
+        ----------
+        level : String, required
+            One of benchmarks, standards or test
+
+        Returns
+        -------
+        ndarray
+            e.g. array([0, 0, 1]) for the indicators A.6.1.1.1, A.6.1.1.2 and A.6.1.2.1 of benchmarks
+        """
+        position = {group: j for j, group in enumerate(self.groups[level])}
+        k = LEVELS.index(level)
+        return np.array([position[item_groups(self.items['indicators'][indicator][0])[k]]
+                         for indicator in self.groups['indicators']], dtype=np.int64)
+
+    def group_indicators(self, level):
+        """Returns the indicators of each benchmark (or standard, test)
+        e.g. {'A.6.2.1': ['A.6.2.1.3', 'A.6.2.1.4']} for benchmarks"""
+        indicators = {group: [] for group in self.groups[level]}
+        for indicator, j in zip(self.groups['indicators'], self.indicator_groups(level)):
+            indicators[self.groups[level][j]].append(indicator)
+        return indicators
+
+    def indicator_incidence(self, level):
+        """Returns the (indicators x groups[level]) sparse matrix with a 1 where an
+        indicator belongs to a benchmark (or standard, test). Any indicator by
+        something table (e.g. number of students at each level) times this matrix
+        sums the indicators into their benchmarks (or standards, test).
+
+        Parameters
+        ----------
+        level : String, required
+            One of benchmarks, standards or test
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+        """
+        groups = self.indicator_groups(level)
+        return sp.csr_matrix((np.ones(len(groups), dtype=np.int64), (np.arange(len(groups)), groups)),
+                             shape=(len(groups), len(self.groups[level])))
@@ -0,0 +1,189 @@
+"""Achievement level assignment from the number of correct items.
+
+A student achieves one of four levels (e.g. Beginning, Developing, Proficient,
+Advanced) on an indicator (or benchmark, standard, test) depending on how many
+of its items were answered correctly. Rather than a pd.cut per column, the
+cut-points of every possible total number of items are precomputed into a
+lookup table and levels are assigned with a single gather for all columns.
+
+Levels are handled as int8 codes from 0 (e.g. Beginning) to 3 (e.g. Advanced)
+all along the aggregation; the achievement_levels labels are only applied to
+build the final columns.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def get_achievement_levels(country):
+    """Returns the labels of the 4 achievement levels used by a country's national test."""
+    if country == 'FSM':
+        return ['well below competent', 'approaching competent', 'minimally competent', 'competent'] # NMCT
+    elif country == 'RMI':
+        return ['Beginning', 'Developing', 'Proficient', 'Advanced'] # MISAT
+    else:
+        return ['Level 1', 'Level 2', 'Level 3', 'Level 4'] # Default
+
+
+# Bin edges (pd.cut style, right closed, lowest included) used by SOE when the
+# number of items is not a multiple of 4 (see soe-assessment-tools Bin tool).
+# Any other total is cut into 4 equal width bins over the possible range 0..total
+SOE_BINS = {
+    1: [-0.002, -0.001, 0.5, 0.75, 1.],
+    2: [-0.002, -0.001, 0.999, 1.5, 2.],
+    3: [-0.003, 0.75, 1.5, 2.25, 3.],
+    5: [-0.005, 1.25, 3.5, 4.75, 5.],
+    9: [-0.009, 4.25, 6.5, 7.75, 9.],
+    11: [-0.011, 5.75, 7.50, 9.25, 11.],
+}
+
+
+def get_bins(total_possible_score):
+    """Returns the bin edges for a total possible score (i.e. number of items).
+
+    Parameters
+    ----------
+    total_possible_score : int, required
+        The total number of items of an indicator (or benchmark, standard, test)
+
+    Returns
+    -------
+    bins : List
+        e.g. [0, 10, 20, 30, 40] for 40 items
+    """
+    if total_possible_score in SOE_BINS:
+        return SOE_BINS[total_possible_score]
+    return [total_possible_score * i / 4 for i in range(5)]
+
+
+def get_cut_points(total_possible_score):
+    """Returns the minimum number of correct items required for levels 2, 3 and 4.
+
+    A score falls in the bin (edge, next edge] so the minimum integer score
+    of a level is the floor of its lower edge plus one.
+
+    Parameters
+    ----------
+    total_possible_score : int, required
+        The total number of items
+
+    Returns
+    -------
+    cut_points : Tuple
+        e.g. (3, 5, 7) for 8 items
+    """
+    bins = get_bins(total_possible_score)
+    return tuple(max(int(np.floor(edge)) + 1, 0) for edge in bins[1:4])
+
+
+@lru_cache(maxsize=None)
+def get_level_table(max_total):
+    """Returns the level lookup table of every total up to max_total.
+
+    Parameters
+    ----------
+    max_total : int, required
+        The largest total number of items to support
+
+    Returns
+    -------
+    table : ndarray
+        A (max_total+1 x max_total+1) int8 table where table[total, correct]
+        is the level code (0 to 3) of a student with correct items out of total
+    """
+    correct = np.arange(max_total + 1)
+    table = np.zeros((max_total + 1, max_total + 1), dtype=np.int8)
+    for total in range(1, max_total + 1):
+        cut_points = np.array(get_cut_points(total))
+        table[total] = (correct[:, None] >= cut_points).sum(axis=1)
+    table.flags.writeable = False
+    return table
+
+
+def assign_levels(correct, totals):
+    """Maps numbers of correct items to level codes with one vectorized gather.
+
+    Parameters
+    ----------
+    correct : ndarray, required
+        The (students x groups) numbers of correct items (e.g. the A.6.2.1.3, A.6.2.1.4 columns)
+    totals : ndarray, required
+        The matching (students x groups) total number of items (e.g. A.6.2.1.3Total, A.6.2.1.4Total)
+
+    Returns
+    -------
+    codes : ndarray
+        The (students x groups) int8 level codes from 0 (e.g. Beginning) to 3 (e.g. Advanced)
+    """
+    correct = np.asarray(correct, dtype=np.int64)
+    totals = np.asarray(totals, dtype=np.int64)
+    table = get_level_table(int(totals.max(initial=0)))
+    return table[totals, correct]
+
+
+def level_percents(codes, groups, n_groups):
+    """Computes the proportion of indicators at each level within each benchmark
+    (or standard, test) by counting the level codes with a single bincount.
+
+    Parameters
+    ----------
+    codes : ndarray, required
+        The (students x indicators) level codes of the indicators
+    groups : ndarray, required
+        The position of the group of each indicator (see ItemHierarchy.indicator_groups)
+    n_groups : int, required
+        The number of groups
+
+    Returns
+    -------
+    percents : ndarray
+        A (students x groups x 4) array where percents[s, g, k] is the proportion of
+        the indicators of group g where student s achieved level k (i.e. the
+        A.6.2.1_L1Percent, A.6.2.1_L2Percent, etc. columns)
+    """
+    n_students = codes.shape[0]
+    groups = np.asarray(groups, dtype=np.int64)
+    bins = ((np.arange(n_students)[:, None] * n_groups + groups) * 4 + codes).ravel()
+    counts = np.bincount(bins, minlength=n_students * n_groups * 4).reshape(n_students, n_groups, 4)
+    total_indicators = np.bincount(groups, minlength=n_groups)
+    return counts / total_indicators[:, None]
+
+
+def weighted_levels(percents, tie_break='best'):
+    """Returns the level codes with the highest proportion of indicators (the
+    so called weighted levels).
+
+    Parameters
+    ----------
+    percents : ndarray, required
+        The (students x groups x 4) proportions from level_percents
+    tie_break : String, optional
+        When two or more levels have the same highest proportion, take the
+        'best' (highest) or the 'worst' (lowest) of them
+
+    Returns
+    -------
+    codes : ndarray
+        The (students x groups) int8 level codes
+    """
+    if tie_break == 'best':
+        return (3 - np.argmax(percents[..., ::-1], axis=-1)).astype(np.int8)
+    elif tie_break == 'worst':
+        return np.argmax(percents, axis=-1).astype(np.int8)
+    else:
+        raise ValueError("Unknown tie_break '{}', expected 'best' or 'worst'".format(tie_break))
+
+
+def levels_to_labels(codes, achievement_levels):
+    """Returns the achievement_levels labels of level codes as an object array."""
+    return np.asarray(achievement_levels, dtype=object)[codes]
+
+
+def levels_to_frame(codes, columns, achievement_levels, index=None):
+    """Builds a DataFrame of ordered categorical level labels from level codes
+    (the same as what pd.cut(..., labels=achievement_levels) produces)."""
+    return pd.DataFrame(
+        {c: pd.Categorical.from_codes(codes[:, j], categories=achievement_levels, ordered=True)
+         for j, c in enumerate(columns)},
+        index=index)
@@ -0,0 +1,152 @@
+"""Loading of SOE Assessment workbooks (Responses sheet) into DataFrames."""
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from exams.cache import WorkbookCache
+
+
+def load_excel_to_df(filename):
+    """Loads an Excel filename to a Pandas DataFrame.
+
+    Parameters
+    ----------
+    filename : str, required
+        The filename of the excel file to load
+
+    Raises
+    ------
+    Exception
+        If the file extension is not one of xlsx, xls or csv
+
+    Returns
+    -------
+    DataFrame
+    """
+    file_path = Path(filename)
+    file_extension = file_path.suffix.lower()[1:]
+
+    if file_extension == 'xlsx':
+        df = pd.read_excel(filename, index_col=None, header=0, engine='openpyxl')
+    elif file_extension == 'xls':
+        df = pd.read_excel(filename, index_col=None, header=0)
+    elif file_extension == 'csv':
+        df = pd.read_csv(filename, index_col=None, header=0)
+    else:
+        raise Exception("File not supported")
+
+    return df
+
+
+def find_excel_files(path):
+    """List all the files inside a directory tree (e.g. data/RMI/MISAT).
+
+    The walk order is the same as the one historically used in the notebooks
+    (os.walk with topdown=False) so results come out in a familiar order.
+
+    Parameters
+    ----------
+    path : str, required
+        The root directory to walk
+
+    Returns
+    -------
+    filenames : Dict
+        e.g. {'AllSchools_A03_2018-19_Results.xls': '/path/to/AllSchools_A03_2018-19_Results.xls'}
+    """
+    filenames = {}
+    for root, directories, files in os.walk(path, topdown=False):
+        for name in files:
+            filenames[name] = os.path.join(root, name)
+    return filenames
+
+
+def _load_one(filename, cache_path=None, fingerprint=None):
+    """Worker wrapper returning either a DataFrame or the error as a string
+    so that one bad workbook never takes the whole pool down. Freshly parsed
+    workbooks are written to the cache by the worker itself (a failure to
+    cache is only a warning, the workbook is still returned)."""
+    try:
+        df = load_excel_to_df(filename)
+    except Exception as e:
+        return None, '{}: {}'.format(type(e).__name__, e)
+    if cache_path is not None:
+        try:
+            WorkbookCache(cache_path).put(fingerprint, df)
+        except Exception as e:
+            warnings.warn('Could not cache {} ({}: {})'.format(filename, type(e).__name__, e))
+    return df, None
+
+
+def load_excel_files(path, processes=None, cache_path=None, include=None, fingerprints=None):
+    """Loads all SOE Assessment workbooks inside a directory tree using a pool
+    of worker processes. Parsing with xlrd/openpyxl is CPU bound so this scales
+    with the number of cores.
+
+    Parameters
+    ----------
+    path : str, required
+        The root directory to walk (e.g. .../RMI/MISAT or .../RMI/MISAT/MISAT 2019)
+    processes : int, optional
+        Number of worker processes. None uses all cores, 1 loads the files
+        sequentially in the current process (handy when debugging).
+    cache_path : str, optional
+        Directory of the parsed workbooks cache (see exams.cache). Workbooks
+        that did not change since they were last parsed are read from there
+        and Excel is skipped entirely. None disables the cache.
+    include : collection, optional
+        Only load the workbooks with these file names (e.g. the ones that
+        changed since the last run). None loads everything.
+    fingerprints : Dict, optional
+        The fingerprints already computed keyed by file name (see
+        exams.cache.fingerprint_files) so the workbooks are not hashed again
+
+    Returns
+    -------
+    dfs : Dict
+        The DataFrames keyed by file name (e.g. {'AllSchools_A03_2018-19_Results.xls': DataFrame})
+    errors : Dict
+        The files that could not be loaded and why (e.g. {'notes.txt': 'Exception: File not supported'})
+    """
+    filenames = find_excel_files(path)
+    if include is not None:
+        filenames = {name: f for name, f in filenames.items() if name in include}
+
+    cache = WorkbookCache(cache_path) if cache_path is not None else None
+    results = {}
+    fingerprints = dict(fingerprints or {})
+    if cache is not None:
+        for name, filename in filenames.items():
+            if name not in fingerprints:
+                fingerprints[name] = cache.fingerprint(filename)
+            df = cache.get(fingerprints[name])
+            if df is not None:
+                results[name] = (df, None)
+        cache.save_index()
+
+    # Only the cache misses need parsing
+    to_load = [name for name in filenames if name not in results]
+    args = ([filenames[name] for name in to_load],
+            [cache_path] * len(to_load),
+            [fingerprints.get(name) for name in to_load])
+
+    if processes == 1 or len(to_load) <= 1:
+        loaded = list(map(_load_one, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            loaded = list(executor.map(_load_one, *args))
+    results.update(zip(to_load, loaded))
+
+    dfs = {}
+    errors = {}
+    for name, filename in filenames.items():
+        df, error = results[name]
+        if error is None:
+            dfs[name] = df
+        else:
+            errors[filename] = error
+
+    return dfs, errors
@@ -0,0 +1,150 @@
+"""Manifest of the files produced by a run so that later runs can be incremental.
+
+For every source workbook the manifest records the fingerprint of the
+workbook itself, the fingerprint of everything else the output depends on
+(configuration flags, EMIS lookups, etc.) and the files that were written.
+A workbook only needs reprocessing when one of those changed or one of its
+outputs went missing. For every output file it also records the workbooks
+(and their fingerprints) that produced it, so that a stale workbook also
+invalidates the other workbooks of the same output.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from exams.cache import atomic_write
+
+# Bump whenever the processing changes in a way that invalidates previous outputs
+MANIFEST_VERSION = 2
+
+
+def hash_dataframe(df):
+    """Returns a SHA1 hex digest of a DataFrame content (values and column names)."""
+    h = hashlib.sha1()
+    h.update(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def hash_settings(*settings):
+    """Returns a SHA1 hex digest of any mix of JSON serializable objects and DataFrames.
+
+    Parameters
+    ----------
+    settings : required
+        e.g. hash_settings(config_flags, df_schools, schools_lookup_from_exams_byname)
+    """
+    h = hashlib.sha1()
+    for s in settings:
+        if isinstance(s, pd.DataFrame):
+            h.update(hash_dataframe(s).encode())
+        else:
+            h.update(json.dumps(s, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class Manifest:
+    """Input fingerprints and output files of previous runs.
+
+    Parameters
+    ----------
+    filename : str, required
+        The JSON file holding the manifest (created on first save)
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.entries = {}
+        # The source workbooks of every output file e.g. {'.../2018-19-A03.xlsx': {'AllSchools_A03_2018-19_Results.xls': 'sha1'}}
+        self.outputs = {}
+        try:
+            with open(filename, 'r') as file:
+                manifest = json.load(file)
+            if manifest.get('version') == MANIFEST_VERSION:
+                self.entries = manifest['entries']
+                self.outputs = manifest['outputs']
+        except (OSError, ValueError):
+            pass
+
+    def is_stale(self, name, source, settings):
+        """Whether a source workbook needs reprocessing.
+
+        Parameters
+        ----------
+        name : str, required
+            The source workbook name (e.g. AllSchools_A03_2018-19_Results.xls)
+        source : str, required
+            The source workbook fingerprint (see exams.cache.hash_file)
+        settings : str, required
+            The fingerprint of everything else the outputs depend on (see hash_settings)
+
+        Returns
+        -------
+        True if the workbook changed, the settings changed, it was never processed
+        or one of its output files no longer exists.
+        """
+        entry = self.entries.get(name)
+        if entry is None or entry['source'] != source or entry['settings'] != settings:
+            return True
+        return not all(os.path.exists(f) for f in entry['outputs'])
+
+    def stale(self, sources, settings):
+        """The source workbooks needing reprocessing: the stale ones (see is_stale)
+        and the other sources of any output file of a stale source.
+
+        Parameters
+        ----------
+        sources : Dict, required
+            The fingerprints of all the source workbooks keyed by name
+        settings : str, required
+            The fingerprint of everything else the outputs depend on (see hash_settings)
+
+        Returns
+        -------
+        List
+            The names of the sources to reprocess (in the order of sources)
+        """
+        stale = {name for name, source in sources.items() if self.is_stale(name, source, settings)}
+        while True:
+            shared = set()
+            for output_sources in self.outputs.values():
+                if (stale.intersection(output_sources)
+                        or any(name in sources and sources[name] != source for name, source in output_sources.items())):
+                    shared.update(name for name in output_sources if name in sources)
+            if shared <= stale:
+                break
+            stale |= shared
+        return [name for name in sources if name in stale]
+
+    def claims(self, names):
+        """The output files recorded for the given sources e.g.
+        {'.../2018-19-A03.xlsx': ['AllSchools_A03_2018-19_Results.xls']}"""
+        names = set(names)
+        claims = {output: [name for name in output_sources if name in names]
+                  for output, output_sources in self.outputs.items()}
+        return {output: names for output, names in claims.items() if names}
+
+    def record(self, name, source, settings, outputs):
+        """Remembers that a source workbook was successfully processed into outputs."""
+        self.forget(name)
+        self.entries[name] = {'source': source, 'settings': settings, 'outputs': list(outputs)}
+        for output in outputs:
+            self.outputs.setdefault(output, {})[name] = source
+
+    def forget(self, name):
+        """Removes a source workbook and its claims on output files."""
+        entry = self.entries.pop(name, None)
+        for output in (entry['outputs'] if entry else []):
+            output_sources = self.outputs.get(output, {})
+            output_sources.pop(name, None)
+            if not output_sources:
+                self.outputs.pop(output, None)
+
+    def save(self):
+        def write_manifest(f):
+            with open(f, 'w') as file:
+                json.dump({'version': MANIFEST_VERSION, 'entries': self.entries, 'outputs': self.outputs},
+                          file, indent=1, sort_keys=True)
+        atomic_write(self.filename, write_manifest)
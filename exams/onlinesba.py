@@ -0,0 +1,1018 @@
+"""Conversion of raw SOE Assessment workbooks into OnlineSBA load files.
+
+The stages of soe-to-onlinesba.ipynb as importable functions: merge the exams
+data with the EMIS student enrolments, clean the exams, schools, items,
+students and teachers, convert to the OnlineSBA format and write the load file.
+The config.json flags each stage depends on are passed as keyword arguments
+(see clean_and_convert to run them all from the config itself).
+"""
+import itertools
+import os
+import random
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from exams.cache import atomic_write
+from exams.display import display, pp
+from exams.manifest import hash_settings
+from exams.school_aliases import SchoolAliasResolver, FUZZY_CUTOFF
+
+# The config.json flags that change the OnlineSBA outputs
+CONFIG_FLAGS = ['skip_incorrect_answers', 'flag_duplicate_students', 'remove_items_metadata', 'export',
+                'fix_schoolid_in_source_data', 'accept_teachers_with_three_chars_only',
+                'accept_unknown_gender', 'accept_unknown_student', 'accept_unknown_teacher',
+                'disambiguate_students', 'school_alias_fuzzy_cutoff']
+
+# The valid answers to an item
+ANSWERS = ['A', 'B', 'C', 'D', 'BLANK', 'MULT']
+
+# Multiple answers like (A,C), A&B, etc.
+MULTIPLE_ANSWERS = r'\({0,1}[A-D](,|&).*\){0,1}'
+
+# Generate unique identifiers (reproducible from one run to the next)
+_rd = random.Random()
+_rd.seed(0)
+
+
+def normalize_student_names(names):
+    """Lower case and trim spaces to make the join case insensitive and exactly
+    like the SQL Server join (the default collation of Pacific EMIS anyway)."""
+    return names.str.lower().str.strip()
+
+
+def school_year_to_enrol_year(school_years):
+    """The EMIS enrolment year of an exams SchoolYear e.g. 2019 for '2018-19'
+    (NaN when it cannot be read)."""
+    return pd.to_numeric('20' + school_years.astype(str).str.split('-').str[-1].str.strip(), errors='coerce')
+
+
+def normalize_school_ids(school_ids):
+    """Upper case and trimmed school IDs as strings (like clean_schools does for SchoolID)."""
+    return school_ids.astype(str).str.upper().str.strip()
+
+
+class EnrolmentIndex:
+    """The student enrolments ready to be joined with exams data, built once per
+    run instead of once per exams file.
+
+    Names found more than once in the enrolments (the same student enrolled
+    several years or different students of same name) are not joined on the
+    name alone. They are looked up in blocks of (name, enrolment year, school)
+    and then of (name, enrolment year) and only joined when the block holds a
+    single enrolment.
+
+    Parameters
+    ----------
+    df_student_enrol : DataFrame, required
+        The student enrolment DataFrame (from EMIS), left unchanged
+
+    Attributes
+    ----------
+    df_nonambiguous : DataFrame
+        The enrolments whose (normalized) name is unique, with that name as Student2
+    df_ambiguous : DataFrame
+        The enrolments of students with same name but different DoB, school, etc.
+        (i.e. different students of same name)
+    names : Index
+        The unique names of df_nonambiguous (a hash table lookup per exams student)
+    df_enrol : DataFrame
+        df_nonambiguous followed by df_ambiguous, the enrolments joined by position
+    blocks : List
+        The (name, year, school) and (name, year) MultiIndex of the ambiguous
+        enrolments unique in their block, with their position in df_ambiguous
+    """
+
+    def __init__(self, df_student_enrol):
+        # Only keep one of the duplicates from the EMIS
+        df = df_student_enrol.drop_duplicates(keep='last')
+        df = df.assign(Student2=normalize_student_names(df['Student']))
+
+        # isolate into a seperate DataFrame students with
+        # same name but different DoB, school, etc. (i.e. different students of same name)
+        ambiguous = df.duplicated(subset=['Student2'], keep=False).to_numpy()
+        self.df_nonambiguous = df[~ambiguous].reset_index(drop=True)
+        self.df_ambiguous = df[ambiguous].sort_values(by=['Student2']).reset_index(drop=True)
+        self.names = pd.Index(self.df_nonambiguous['Student2'].astype('category'))
+        self.df_enrol = pd.concat([self.df_nonambiguous, self.df_ambiguous], ignore_index=True)
+
+        keys = pd.DataFrame({'Student2': self.df_ambiguous['Student2'],
+                             'year': pd.to_numeric(self.df_ambiguous['stueYear'], errors='coerce'),
+                             'school': normalize_school_ids(self.df_ambiguous['schNo'])})
+        keys = keys[keys['year'].notna()]
+        self.blocks = []
+        for block in (['Student2', 'year', 'school'], ['Student2', 'year']):
+            unique = keys[~keys.duplicated(subset=block, keep=False)]
+            self.blocks.append((block, pd.MultiIndex.from_frame(unique[block]), unique.index.to_numpy()))
+
+    def __len__(self):
+        return len(self.df_nonambiguous.index) + len(self.df_ambiguous.index)
+
+    def match(self, df_student_results, disambiguate=False):
+        """Left join of the exams data with the enrolments on the normalized student
+        name (like DataFrame.merge with how='left').
+
+        Parameters
+        ----------
+        df_student_results : DataFrame, required
+            The student results DataFrame (from SOE Assessment response sheet)
+        disambiguate : bool, optional
+            Also join the ambiguous names with the SchoolYear and SchoolID of the
+            exams data (see EnrolmentIndex). The number of rows joined this way is printed
+        """
+        names = normalize_student_names(df_student_results['StudentName'])
+        positions = self.names.get_indexer(names)
+
+        if (disambiguate and len(self.df_ambiguous.index)
+                and {'SchoolYear', 'SchoolID'}.issubset(df_student_results.columns)):
+            keys = pd.DataFrame({'Student2': names.to_numpy(),
+                                 'year': school_year_to_enrol_year(df_student_results['SchoolYear']).to_numpy(),
+                                 'school': normalize_school_ids(df_student_results['SchoolID']).to_numpy()})
+            # the ambiguous enrolments come after the non ambiguous ones in self.df_enrol
+            offset = len(self.df_nonambiguous.index)
+            disambiguated = 0
+            for block, index, block_positions in self.blocks:
+                missing = np.flatnonzero(positions < 0)
+                found = index.get_indexer(pd.MultiIndex.from_frame(keys.iloc[missing][block]))
+                positions[missing[found >= 0]] = offset + block_positions[found[found >= 0]]
+                disambiguated += (found >= 0).sum()
+            if disambiguated:
+                print('Matched {} more rows with an ambiguous student name by school year and school'.format(disambiguated))
+        df_right = self.df_enrol.reindex(positions).reset_index(drop=True)
+
+        df_left = df_student_results.reset_index(drop=True).assign(StudentName2=names.to_numpy())
+        overlap = df_left.columns.intersection(df_right.columns)
+        return pd.concat([df_left.rename(columns={c: c+'_from_exams' for c in overlap}),
+                          df_right.rename(columns={c: c+'_from_db' for c in overlap})], axis=1)
+
+
+def merge_exams_data_with_student_enrol_df(df_student_results, df_student_enrol, testing=False, disambiguate=False):
+    """ Merge both the dirty exams data with the clean student enrollments dataset
+
+    Parameters
+    ----------
+    df_student_results : DataFrame, required
+        The student results DataFrame (from SOE Assessment response sheet)
+    df_student_enrol : EnrolmentIndex or DataFrame, required
+        The student enrolments index built once per run, or the student
+        enrolment DataFrame (from EMIS) to build it from
+    disambiguate : bool, optional
+        Also join students whose name is ambiguous in the EMIS when their
+        name, school year and school identify a single enrolment (opt-in since
+        it changes the load files, the extra rows matched are reported)
+        
+    Raises
+    ------
+    NotImplementedError
+        Could raise unknown error. Implement if it happens
+    
+    Returns
+    -------
+    DataFrame
+    """
+    if isinstance(df_student_enrol, EnrolmentIndex):
+        enrolment_index = df_student_enrol
+    else:
+        enrolment_index = EnrolmentIndex(df_student_enrol)
+    if testing: print('Total student enrol: ', len(enrolment_index))
+    if testing: print('Total student enrol that are not ambiguous: ', len(enrolment_index.df_nonambiguous.index))
+    if testing: print('Total student enrol that are ambiguous: ', len(enrolment_index.df_ambiguous.index))
+    if testing: 
+        print('df_student_enrol_nonambiguous') 
+        display(enrolment_index.df_nonambiguous.head(2))
+
+    # Non-ambiguous student enrolment records are joined on the name. The ambiguous
+    # ones only when the school year and school of the exams data disambiguate
+    # students with same name (see EnrolmentIndex)
+
+    # Merge student exams data with student enrolments
+    try:
+        df_students_results_and_enrol = enrolment_index.match(df_student_results, disambiguate=disambiguate)
+    except KeyError:        
+        print('StudentName column is not present or misspelled (hint from data): ', df_student_results[:1].iloc[:, : 5].to_csv(index=False, header=False))
+        return
+    except:
+        print('Unknown error')
+        return
+    if testing: 
+        print('df_students_results_and_enrol') 
+        display(df_students_results_and_enrol.head(2))
+    
+    return df_students_results_and_enrol
+
+
+def clean_exams(df, name, testing=False):
+    """ Does any cleanup/validation needed with Exams ID/Name.
+
+    Parameters
+    ----------    
+    df: DataFrame, required
+        The student results and enrol DataFrame
+    name: str, required
+        The name of the excel file this DataFrame came from
+    testing: bool, required
+        Whether we are test (usually single DataFrame)    
+        
+    Raises
+    ------
+    NotImplementedError
+        Could raise unknown error. Implement if it happens
+    
+    Returns
+    -------
+    DataFrame
+    """
+    expected_testid = name.split('_')[1]
+    
+    # Basic check of the TestID in the filename
+    p = re.compile('[A-Z]{1}[0-9]{2}')
+    if not p.match(expected_testid):
+        print("The TestID is not what was expected. Make sure the excel file {} follows the format AllSchools_TESTID_YYYY-YY_Results.xls".format(name))
+    
+    # Check the TestID in the data is has expected (i.e. what is in the filename)
+    testid_fromdata = df['TestID'].iloc[0]
+    if testid_fromdata != expected_testid:
+        print("The TestID in the data is not the same as the expected test ID from the excel filename for {}".format(name))
+        
+    # Check that all the TestID are the same in the data
+    if len(df['TestID'].unique()) != 1:
+        print("The TestID in the data is not unique and contains unexpected values (e.g. A03 mixed with B03) from the excel filename for {}".format(name))
+        
+    # No actual cleanup at the moment, just flag data validation issues
+    if testing:
+        print('Cleaned exams for file {}'.format(name))
+        #display(df)
+        
+    return df
+    
+class SchoolLookup:
+    """The EMIS schools and the hard coded mapping of exams school names ready to
+    resolve the schools of exams data, built once per run instead of once per
+    exams file.
+
+    Parameters
+    ----------
+    df_schools : DataFrame, required
+        The schools DataFrame (from EMIS)
+    schools_lookup_from_exams_byname: Dict, required
+        The hard coded mapping of exams school names to school IDs (see exams.school_aliases)
+    fuzzy_cutoff : int, optional
+        Minimum rapidfuzz ratio (0-100) of an approximate school name match, None
+        to only use the hard coded mapping (see exams.school_aliases.SchoolAliasResolver)
+
+    Attributes
+    ----------
+    school_ids : Index
+        All valid school IDs in the EMIS
+    schools_lookup : Series
+        The EMIS official school ID to name mapping
+    schools_lookup_byname : Series
+        The EMIS school name to ID mapping
+    aliases : SchoolAliasResolver
+        The 'SchoolName-IslandName' of the exams data to school ID hard coded mapping
+    """
+
+    def __init__(self, df_schools, schools_lookup_from_exams_byname, fuzzy_cutoff=FUZZY_CUTOFF):
+        # Like dict(zip()) the last of duplicated IDs or names wins
+        self.school_ids = pd.Index(df_schools['schNo'].unique())
+        self.schools_lookup = df_schools.drop_duplicates('schNo', keep='last').set_index('schNo')['schName']
+        self.schools_lookup_byname = df_schools.drop_duplicates('schName', keep='last').set_index('schName')['schNo']
+        self.aliases = SchoolAliasResolver(schools_lookup_from_exams_byname, fuzzy_cutoff=fuzzy_cutoff)
+
+    @staticmethod
+    def school_keys(df):
+        """The 'SchoolName-IslandName' key of the hard coded mapping of every row of df."""
+        return df['SchoolName'].astype(str) + '-' + df['IslandName'].astype(str)
+
+    def resolve(self, school_ids, school_keys):
+        """The school ID of the exams data if it exists in the EMIS, otherwise the
+        hard coded mapping of the school name (NaN when unknown).
+
+        Parameters
+        ----------
+        school_ids : Series, required
+            The normalized school IDs of the exams data (see normalize_school_ids)
+        school_keys : Series, required
+            The 'SchoolName-IslandName' keys (see school_keys)
+
+        Returns
+        -------
+        school_ids_emis, school_ids_mapped : Series
+        """
+        school_ids_emis = school_ids.where(school_ids.isin(self.school_ids))
+        school_ids_mapped = self.aliases.resolve(school_keys)
+        return school_ids_emis, school_ids_mapped
+
+
+def clean_schools(df, df_schools, name, schools_lookup_from_exams_byname, testing=False, fix_schoolid_in_source_data=False):
+    """ Does any cleanup/validation needed with SchoolIDs.
+
+    Parameters
+    ----------    
+    df: DataFrame, required
+        The student results and enrol DataFrame
+    df_schools : SchoolLookup or DataFrame, required
+        The schools lookup built once per run, or the schools DataFrame (from EMIS)
+        to build it from
+    name: str, required
+        The name of the excel file this DataFrame came from
+    schools_lookup_from_exams_byname: Dict, required
+        The hard coded mapping of exams school names to school IDs (see exams.school_aliases)
+        Not used when df_schools is a SchoolLookup (it has its own)
+    testing: bool, required
+        Whether we are test (usually single DataFrame) 
+    fix_schoolid_in_source_data: bool, optional
+        Whether unknown school IDs are to be fixed in the source data (otherwise
+        the missing entries of the hard coded mapping are printed)
+        
+    Raises
+    ------
+    NotImplementedError
+        Could raise unknown error. Implement if it happens
+    
+    Returns
+    -------
+    DataFrame
+    """        
+
+    # From EMIS, get school ID to name official mapping
+    if isinstance(df_schools, SchoolLookup):
+        school_lookup = df_schools
+    else:
+        school_lookup = SchoolLookup(df_schools, schools_lookup_from_exams_byname)
+    
+    if testing: 
+        print('schools_lookup')
+        pp.pprint(dict(itertools.islice(school_lookup.schools_lookup.items(), 3)))
+        
+        print('schools_lookup_byname')
+        pp.pprint(dict(itertools.islice(school_lookup.schools_lookup_byname.items(), 3)))
+    
+        print('schools_lookup_from_exams_byname')
+        pp.pprint(dict(itertools.islice(school_lookup.aliases.index.items(), 3)))
+
+    # ??? Check if this is primary or elementary, some have same school names so use
+    # grade of test to define the school
+
+    # Create a temporary SchoolName and SchoolIsland joined
+    df['SchoolNameTemp'] = school_lookup.school_keys(df)
+    if testing:
+        print('Cleaning schools SchoolNameTemp')
+        display(df['SchoolNameTemp'])
+    
+    # Upper case all school ID and strip spaces
+    df['SchoolID'] = normalize_school_ids(df['SchoolID'])
+    
+    # Check if the school ID in the exams data file exists in the EMIS (SchoolIDTemp1)
+    # and if the school name in the exams data file has a mapping hard coded (old/incorrect schoolIDs)
+    df['SchoolIDTemp1'], df['SchoolIDTemp2'] = school_lookup.resolve(df['SchoolID'], df['SchoolNameTemp'])
+
+    if testing:
+        print('Cleaning schools SchoolIDTemp1')
+        display(df['SchoolIDTemp1'])
+        print('Cleaning schools SchoolIDTemp2')
+        display(df['SchoolIDTemp2'])
+        
+    # Coalesce to get the school ID
+    df['SchoolIDFinal'] = df.SchoolIDTemp1.combine_first(df.SchoolIDTemp2)
+    
+    # An attempt to get all correct School names from EMIS to save trouble of further
+    # building the hard coded schools_lookup_from_exams_byname
+    df['SchoolNameFinal'] = df['SchoolIDFinal'].map(school_lookup.schools_lookup)
+
+    # Check if there is a school that does not have a known
+    # mapping either from the EMIS' df_schools or the manually
+    # maintained above mapping (old ID, incorrect ones, etc.)
+    # If True look at the source file
+    if df['SchoolNameFinal'].isnull().values.any():
+        print('SchoolID/SchoolName still unknown/check source excel file {}'.format(name)) #df[:1].iloc[:, : 10].to_csv(index=False, header=False)        
+        
+        # How to clean the data based on configuration (fix in source data or using hand mapping)
+        if fix_schoolid_in_source_data:
+            df_school_name_missing = df[df['SchoolNameFinal'].isna()]
+            print("You have a bad school ID ({}) in your file {}".format(df_school_name_missing['SchoolID'].unique(), name))
+        else:
+            # Unfortunately need to fix this by hand (mostly in RMI)
+            print('All school name and island name combination not yet part of hard coded mapping (if none listed, they likely have a mapping but school is not yet in EMIS):')
+            unique_combination_not_mapped = set(df.loc[df['SchoolIDTemp2'].isna(), 'SchoolNameTemp'].unique())
+            for i in unique_combination_not_mapped:
+                print("'" + i + "': '',")
+    if testing:
+        print("DataFrame with records with schoolID still unknown in excel file {}.".format(name))
+        display(df[df['SchoolNameFinal'].isnull()])
+    
+    df = df.drop(labels = ['SchoolID','SchoolName','SchoolNameTemp','SchoolIDTemp1','SchoolIDTemp2'], axis=1)
+    df = df.rename(columns = {'SchoolIDFinal': 'SchoolID','SchoolNameFinal': 'SchoolName'})
+
+    if testing:
+        print('Cleaned schools DataFrame from file {}.'.format(name))
+        display(df)
+        
+    return df
+        
+def normalize_answers(df_items, numeric_last_item=False):
+    """ Normalizes and validates the answers of all the items in one pass over
+    the flattened item block (instead of a Python function call per cell).
+
+    Text answers are stripped and upper cased, multiple answers become MULT and
+    missing or empty answers become BLANK. An answer is valid when it is one of
+    ANSWERS.
+
+    Parameters
+    ----------
+    df_items : DataFrame, required
+        The item columns (students x items)
+    numeric_last_item : bool, optional
+        Whether the last item can also be a numeric (High School test H08)
+
+    Returns
+    -------
+    answers : ndarray
+        The (students x items) normalized answers
+    valid : ndarray
+        The (students x items) boolean validity matrix
+    invalid : Tuple
+        The (row positions, column positions) of the invalid answers, row after row
+    """
+    shape = df_items.shape
+    answers = pd.Series(df_items.to_numpy(dtype=object).ravel(), dtype=object)
+
+    # The .str methods give NaN for anything not a string (e.g. a numeric answer)
+    try:
+        text = answers.str.strip().str.upper().str.replace(MULTIPLE_ANSWERS, 'MULT', regex=True)
+    except AttributeError:
+        # No text answers at all
+        text = pd.Series(np.nan, index=answers.index, dtype=object)
+    answers = text.where(text.notna(), answers)
+    answers = answers.mask(answers.isna() | answers.eq(''), 'BLANK')
+
+    answers = answers.to_numpy().reshape(shape)
+    valid = pd.Series(answers.ravel()).isin(ANSWERS).to_numpy().reshape(shape)
+    if numeric_last_item and shape[1] != 0:
+        # Numbers can come in as string, in particular when the
+        # Series contains some error (i.e. 1` instead of 1)
+        valid[:, -1] |= pd.to_numeric(pd.Series(answers[:, -1]), errors='coerce').notna().to_numpy()
+
+    return answers, valid, np.nonzero(~valid)
+
+def clean_items(df, name, testing=False, remove_items_metadata=False, skip_incorrect_answers=False):
+    """ Does any cleanup/validation needed with Items (test responses.)
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The student results and enrol DataFrame with items to clean    
+    name: str, required
+        The name of the excel file this DataFrame came from
+    testing: bool, required
+        Whether we are test (usually single DataFrame) 
+    remove_items_metadata: bool, optional
+        Whether to shorten the items to ITEM_001 (instead of ITEM_001_AS0602010401E_DDD)
+    skip_incorrect_answers: bool, optional
+        Whether to replace invalid answers by BLANK instead of flagging them
+        
+    Raises
+    ------
+    NotImplementedError
+        Could raise unknown error. Implement if it happens
+    
+    Returns
+    -------
+    DataFrame
+    """ 
+
+    # We need to know what test we are cleaning items for since 
+    # is affects the validation
+    test = df['TestID'].iloc[1]
+
+    def simplify_items(x):
+        """ If column an item make it uppercase and strip the redundant string
+        """
+        if x.startswith('Item_'):  
+            if remove_items_metadata:
+                item = '_'.join(x.split('_', 2)[:2])
+            else:
+                item = '_'.join(x.split('_', 2))
+            return str.upper(item)
+        return x 
+          
+    # Re-arrange and rename item columns
+    df = df.rename(columns = simplify_items)
+    
+    # Get list of items columns (by position, a repeated item is still cleaned)
+    positions = np.flatnonzero(df.columns.str.startswith('ITEM_'))
+    cols = df.columns[positions].tolist()
+    if testing: 
+        print('Cleaned items columns:', cols)
+        print('Cleaned items columns length:', len(cols))        
+        print('Cleaned items Item-only DataFrame.columns length:', len(df[cols].columns))
+        print('Cleaned items Item-only DataFrame.columns')
+        display(df[cols].columns)
+    if len(set(cols)) != len(cols):
+        print('Detected a mismatch in item numbers (e.g. repeating Item_039, Item_039, etc.) in excel file {}'.format(name))
+
+    # Normalize and validate all the answers at once. For high school tests
+    # the last item can also be a numeric
+    answers, valid, (rows, columns) = normalize_answers(df.iloc[:, positions], numeric_last_item=(test == 'H08'))
+
+    if testing:
+        print('Items errors mask DataFrame:')
+        display(df[~valid.all(axis=1)])
+        for r, c in zip(rows, columns):
+            print('Bad Item answer {}'.format(answers[r, c]))
+
+    if len(rows) != 0:
+        # Collect invalid items to return very specific feedback
+        # (rows as in the excel file i.e. after the header row)
+        invalid_items = [cols[c]+" rows: "+str(df.index.values[rows[columns == c]] + 2)
+                         for c in np.unique(columns)]
+
+        # Do not even flag incorrect answers
+        if not skip_incorrect_answers:
+            print('Invalid answers detected in test {}{} year {} (from excel file {}). Invalid answers are in {}'.format(
+                df['TestName'].iloc[0], ' (note: supposedly a High School test)' if test == 'H08' else '',
+                df['SchoolYear'].iloc[0], name, str(invalid_items)))
+        else:
+            # but clean them up instead
+            answers[rows, columns] = 'BLANK'
+
+    for i, position in enumerate(positions):
+        df.isetitem(position, answers[:, i])
+            
+    if testing:
+        print('Cleaned items DataFrame from file {}.'.format(name))
+        display(df)
+    
+    return df
+
+def clean_students(df, name, testing=False, accept_unknown_gender=False, accept_unknown_student=False,
+                   flag_duplicate_students=False, rd=None):
+    """ Cleanup students data here. There is stuff from other functions like in the merge
+    above that could be put more cleanly here.
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The student results and enrol DataFrame
+    name: str, required
+        The name of the excel file this DataFrame came from
+    testing: bool, required
+        Whether we are test (usually single DataFrame) 
+    accept_unknown_gender: bool, optional
+        Whether to silently accept unknown genders
+    accept_unknown_student: bool, optional
+        Whether to silently accept students without a name (or ???)
+    flag_duplicate_students: bool, optional
+        Whether to only keep the duplicate students (to examine them) instead of
+        adding ? to the name of the duplicates
+    rd: random.Random, optional
+        The random generator of the UUID given to students not in the EMIS
+        (defaults to one seeded with 0 for reproducible outputs)
+        
+    Raises
+    ------
+    NotImplementedError
+        Could raise unknown error. Implement if it happens
+    
+    Returns
+    -------
+    DataFrame
+    """
+    if rd is None:
+        rd = _rd
+    
+    genders = {
+        'Male': 'M',
+        'MALE': 'M',
+        'm': 'M',       
+        'M': 'M',       
+        'M,': 'M',
+        'M ': 'M',
+        'Boy': 'M',
+        'BOY': 'M',
+        'b': 'M',        
+        'B': 'M',
+        'n': 'M',
+        'mm': 'M',
+        'MM': 'M',
+        'FM': 'M',        
+        'm  m': 'M',
+        'Bm': 'M',
+        'Female': 'F',        
+        'FEMALE': 'F',
+        'f': 'F',       
+        'F': 'F',
+        'Girl': 'F',        
+        'GIRL': 'F',
+        'g': 'F',        
+        'G': 'F',
+        #'I': 'F',
+        '`f': 'F',
+        'FF': 'F',
+        'ff': 'F',
+        #'?': 'M',
+        #'??': 'M',
+        #'???': 'M',
+        #'????': 'M',
+        #'BLANK': 'M',
+        #'a': 'F',
+        #'A': 'F',
+        'BLANKm': 'M',
+        #',': 'M',
+        #'ERROR #3100': 'M',
+        #'**': 'M',
+    }
+    
+    yesno = {
+        'Yes': 'Yes',        
+        'YEs': 'Yes',
+        'YES': 'Yes',        
+        'yes': 'Yes',
+        'y': 'No',
+        'No': 'No',        
+        'NO': 'No',
+        'no': 'No',        
+        'n': 'No',
+    }
+    
+    if testing:
+        print('Cleaning students...')
+        
+    # Strip any extra spaces for student names
+    try:
+        df['StudentName'] = df['StudentName'].apply(lambda x: x.strip())
+    except Exception as e:
+        print('Student name with non-string data detected in test {} year {} (from excel file {})'.format(
+            df['TestName'].iloc[0], df['SchoolYear'].iloc[0], name))
+        
+    # Adjust the correct student ID where possible and generate UUID for all others
+    
+    # At this point student ID already there come from the EMIS
+    # Perhaps it might be useful to build a list of automatically assigned
+    # UUIDs as they get processed and look there as well?!
+    missing_student_id_tot = df['stuCardID'].isna().sum()
+    missing_student_ids = []
+
+    for i in range(missing_student_id_tot):
+        missing_student_ids.append(uuid.UUID(int=rd.getrandbits(128), version=4))
+
+    df.loc[df.stuCardID.isnull(), 'stuCardID'] = missing_student_ids    
+        
+    # Coalesce student genders
+    df['GenderFinal'] = df.stuGender.combine_first(df.Gender)
+    
+    # Clean genders (should we also flag?)
+    df['GenderFinal'] = df['GenderFinal'].str.strip() # strip out leading/trailing spaces
+    df['GenderFinal'] = df['GenderFinal'].map(genders)
+    # Tell me if the DataFrame has any unkown gender
+    df_badgenders = df[~df['Gender'].isin(list(genders.keys()))]
+    
+    if not df_badgenders.empty:
+        if accept_unknown_gender:
+            # Accept but "fix" the bad gender (is there anything to fix?)
+            pass
+        else:
+            print('Some unknown gender detected (these ones: {}) detected in test {} year {} (from excel file {})'.format(
+                set(df_badgenders['Gender'].unique()), df['TestName'].iloc[0], df['SchoolYear'].iloc[0], name))
+        if testing:
+            print('These records have bad genders')
+            display(df[df['GenderFinal'].isna()])
+    
+    # Clean some boolean (should we flag?)
+    df['SpEdCode'] = df['SpEdCode'].map(yesno)
+    df['SpEdCode'] = df['SpEdCode'].fillna('No')        
+    df['Accommodation'] = df['Accommodation'].map(yesno)
+    df['Accommodation'] = df['Accommodation'].fillna('No')
+    
+    # Student names with * or ??? to be flagged and/or handled
+    if df['StudentName'].str.contains('^ *\?+ *$', na=False, regex=True).any() and not accept_unknown_student:
+        print('Student name with ??? (unknown/bad student name) detected in test {} year {} (from excel file {})'.format(
+            df['TestName'].iloc[0], df['SchoolYear'].iloc[0], name))
+        
+    df['StudentName'] = df['StudentName'].replace(to_replace=r'^ *\?+ *$', value=np.nan, regex=True)
+    
+    # Student NaN
+    if df['StudentName'].isnull().values.any() and not accept_unknown_student:
+        print('Student name without any value (no student name) detected in test {} year {} (from excel file {})'.format(
+            df['TestName'].iloc[0], df['SchoolYear'].iloc[0], name))
+        if testing:
+            display(df.loc[df['StudentName'].isnull()])
+    
+    # Replace all unknown with 'Unknown student 1', 'Unknown student 2', etc.    
+    #df['StudentName'] = df['StudentName'].fillna('Unknown')
+    mask = df['StudentName'].isna()
+    values = [f'Unknown student {x}' for x in range(1, mask.sum()+1)]        
+    df.loc[mask, 'StudentName'] = values
+    
+    # Student names repeating
+    #df.duplicated(subset=['StudentName'], keep='first')
+    df_dups = df.duplicated(subset=['StudentName'], keep='first')
+        
+    if flag_duplicate_students:
+        print('Students that looks like duplicates:')
+        df = df[df.duplicated(subset=['StudentName'], keep='first')]    
+    else:
+        # Clean duplicates by adding ? as middle name
+        if testing:
+            print('Cleaning duplicate students')
+        df['StudentName'] = df['StudentName'].where(~df.duplicated(subset=['StudentName'], keep='first'), df['StudentName'].add(' ?'))
+    
+    if testing:
+        print('Cleaned students DataFrame from file {}.'.format(name))
+        display(df)
+    
+    df = df.drop(labels = ['Gender'], axis=1)
+    df = df.rename(columns = {'GenderFinal': 'Gender'})
+        
+    return df
+
+def clean_teachers(df, name, testing=False, accept_unknown_teacher=False, accept_teachers_with_three_chars_only=False):
+    """ Mostly a placeholder at the moment. But might be desirable to cleanup
+    teachers, add teacher ID, etc.
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The student results (contains teachers) and enrol DataFrame
+    name: str, required
+        The name of the excel file this DataFrame came from
+    testing: bool, required
+        Whether we are test (usually single DataFrame) 
+    accept_unknown_teacher: bool, optional
+        Whether to silently accept teachers without a name (or ???)
+    accept_teachers_with_three_chars_only: bool, optional
+        Whether to silently accept teacher names of 3 characters or less
+        
+    Raises
+    ------
+    NotImplementedError
+        Could raise unknown error. Implement if it happens
+    
+    Returns
+    -------
+    DataFrame
+    """
+    
+    # Teachers containing numbers instead of names
+    if pd.to_numeric(df['Teacher'], errors='coerce').any():
+        print('Teacher with numeric values detected in test {} year {} (from excel file {})'.format(
+            df['TestName'].iloc[0], df['SchoolYear'].iloc[0], name))
+    # Clean it. The cleaning here is temporary and only so the remaining code works
+    # this should really cleaned up in source data
+    df['Teacher'] = df['Teacher'].astype('string')
+    
+    # Fill missing teachers
+    df['Teacher'] = df['Teacher'].fillna('N/A')
+    
+    # Teachers names with ??? (Flag it)
+    if df['Teacher'].str.contains(' *\?+ *', na=False, regex=True).any() and not accept_unknown_teacher:
+        print('Teacher with ?? as names detected in test {} year {} (from excel file {})'.format(
+            df['TestName'].iloc[0], df['SchoolYear'].iloc[0], name))
+    # Clean it
+    df['Teacher'] = df['Teacher'].replace(to_replace=' *\?+ *', value='Unknown', regex=True)
+    
+    # Teachers names with less then 3 alphanumeric charactors (Flag it)
+    if df['Teacher'].str.contains('^\w{1,3}$', na=False, regex=True).any() and not accept_teachers_with_three_chars_only:        
+        print('Teacher names with 3 characters or less detected (valid name?) in test {} year {} (from excel file {})'.format(
+            df['TestName'].iloc[0], df['SchoolYear'].iloc[0], name))
+    # Clean it ?
+    #df['Teacher'] = df['Teacher'].replace(to_replace='\w{1,3}', value='Unknown', regex=True)
+    
+    # Teachers without names
+    if df['Teacher'].str.contains('^\s+$', na=False, regex=True).any() and df['Teacher'].hasnans and not accept_unknown_teacher:
+        print('Teacher without names detected in test {} year {} (from excel file {})'.format(
+            df['TestName'].iloc[0], df['SchoolYear'].iloc[0], name))
+    # Clean it
+    df['Teacher'] = df['Teacher'].replace(to_replace='^\s+$', value='Unknown', regex=True)
+    
+    if testing:
+        print('Cleaned teachers DataFrame from file'.format(name))
+        display(df)
+        
+    return df
+
+def convert_to_onlinesba(df, name, testing=False):
+    """ A pretty fat function that does some validation, cleaning and converting
+    to the OnlineSBA format. Function can be split if needed as this tools gets refine
+    through practicalities of real life usage
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The student results and enrol DataFrame
+    name: str, required
+        The name of the excel file this DataFrame came from
+    testing: bool, required
+        Whether we are test (usually single DataFrame) 
+        
+    Raises
+    ------
+    NotImplementedError
+        Could raise unknown error. Implement if it happens
+    
+    Returns
+    -------
+    DataFrame
+    """
+    
+    df = df.rename(columns = {
+        'stuCardID': 'STUDENTID', 
+        'SpEdCode': 'SPED',
+        'Accommodation': 'ACCOM',
+        'StudentName': 'STUDENTNAME',
+        'SchoolID': 'SCHOOLID',
+        'Gender': 'GENDER',
+        'TestID': 'TESTID',
+        'Teacher': 'TEACHERNAME',
+        'SchoolYear': 'SCHOOLYEAR'
+        })
+    df = df.drop(labels = [
+        'RecordNo', 'TestName', 'IslandName', # 'SchoolYear',
+        'SchoolName', 'StudentID', 'Ethnicity', 'Disability', 
+        'ELL', 'Migrant', 'FRLunch', 'StudentName2', 'Student',
+        'stuGender', 'stuDoB', 'schNo', 'stueYear', 'Student2'], axis=1, errors='ignore')
+
+    cols = list(df.columns)
+    cols_items = [i for i in cols if 'ITEM_' in i]
+    cols_items.sort()
+
+    # Re-order. First set of colums will likely always be there and the same
+    # followed by a varying number of exam items
+    df = df[[
+        'SCHOOLYEAR','STUDENTID','SPED','ACCOM','STUDENTNAME','SCHOOLID','GENDER','TESTID',
+        'TEACHERNAME'] + cols_items]
+    
+    if testing:
+        print('Final OnlineSBA DataFrame for data from file {}.'.format(name))
+        display(df)
+    
+    return df
+
+
+def clean_and_convert(df, df_schools, name, schools_lookup_from_exams_byname, config, testing=False, rd=None):
+    """Runs all the clean_* stages and convert_to_onlinesba on a merged DataFrame
+    with the flags of config.json.
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The student results and enrol DataFrame (see merge_exams_data_with_student_enrol_df)
+    df_schools : SchoolLookup or DataFrame, required
+        The schools lookup built once per run or the schools DataFrame (from EMIS)
+        (see clean_schools)
+    name: str, required
+        The name of the excel file this DataFrame came from
+    schools_lookup_from_exams_byname: Dict, required
+        The hard coded mapping of exams school names to school IDs
+    config : Dict, required
+        The configuration (i.e. config.json)
+    testing: bool, optional
+        Whether we are test (usually single DataFrame)
+    rd: random.Random, optional
+        The random generator of the UUID given to students not in the EMIS
+
+    Returns
+    -------
+    DataFrame
+    """
+    df = clean_exams(df, name, testing=testing)
+    df = clean_schools(df, df_schools, name, schools_lookup_from_exams_byname, testing=testing,
+                       fix_schoolid_in_source_data=config['fix_schoolid_in_source_data'])
+    df = clean_items(df, name, testing=testing,
+                     remove_items_metadata=config['remove_items_metadata'],
+                     skip_incorrect_answers=config['skip_incorrect_answers'])
+    df = clean_students(df, name, testing=testing,
+                        accept_unknown_gender=config['accept_unknown_gender'],
+                        accept_unknown_student=config['accept_unknown_student'],
+                        flag_duplicate_students=config['flag_duplicate_students'], rd=rd)
+    df = clean_teachers(df, name, testing=testing,
+                        accept_unknown_teacher=config['accept_unknown_teacher'],
+                        accept_teachers_with_three_chars_only=config['accept_teachers_with_three_chars_only'])
+    return convert_to_onlinesba(df, name, testing=testing)
+
+
+def settings_fingerprint(config, df_schools, df_student_enrol, schools_lookup_from_exams_byname):
+    """The fingerprint of everything other than the workbook itself that the
+    OnlineSBA load file of a workbook depends on (configuration flags, EMIS
+    schools and enrolments, hard coded schools mapping). See exams.manifest"""
+    return hash_settings(
+        {k: config.get(k) for k in CONFIG_FLAGS},
+        df_schools,
+        # only the columns from the database
+        df_student_enrol[['stuCardID','Student','stuGender','stuDoB','schNo','stueYear']].drop_duplicates(keep='last'),
+        schools_lookup_from_exams_byname)
+
+
+def onlinesba_filename(df, local_path, country, export):
+    """e.g. .../RMI/onlinesba-load-files-xls/2018-19-A03.xlsx"""
+    schoolyear = df['SCHOOLYEAR'].values[0]
+    testid = df['TESTID'].values[0]
+    if export == 'csv':
+        return os.path.join(local_path, country+'/onlinesba-load-files-csv/' + schoolyear + '-' + testid + '.csv')
+    return os.path.join(local_path, country+'/onlinesba-load-files-xls/' + schoolyear + '-' + testid + '.xlsx')
+
+
+def write_onlinesba_file(df, filename):
+    """Writes an OnlineSBA load file (CSV directly or Excel, much slower).
+
+    The excel version is used to load into FedEMIS and currently requires
+    a Sheet 'ExamYear' to indicate the year in cell A1. Could remove the
+    SCHOOLYEAR if onlinesba really requires it.
+    """
+    if filename.endswith('.csv'):
+        atomic_write(filename, lambda f: df.to_csv(f, index=False))
+    else:
+        schoolyear = df['SCHOOLYEAR'].values[0]
+        def write_workbook(f):
+            with pd.ExcelWriter(f, engine='openpyxl') as writer:
+                df.to_excel(writer, index=False, sheet_name='Sheet1')
+                wb = writer.book
+                ws = wb.create_sheet(title='ExamYear')
+                ws['A1'] = '20'+schoolyear.split('-')[1]
+        atomic_write(filename, write_workbook)
+
+
+def _write_one(df, filename):
+    """Worker writing one load file. Returns the error as a string instead of
+    raising so that one bad file never takes the whole pool down."""
+    try:
+        write_onlinesba_file(df, filename)
+    except Exception as e:
+        return '{}: {}'.format(type(e).__name__, e)
+    return None
+
+
+def write_onlinesba_files(dfs, local_path, country, export, processes=None, claims=None):
+    """Writes the OnlineSBA load file of every converted DataFrame in parallel.
+
+    Each file is written to a temporary file renamed into place once complete
+    so that an interrupted run never leaves a half written load file. Several
+    source files giving the same load file (e.g. AllSchools_A03_2018-19_Results.xls
+    and a copy AllSchools_A03_2018-19_Results1.xls) would overwrite each other
+    so such a load file is not written and all its sources are reported as errors.
+
+    Parameters
+    ----------
+    dfs : Dict, required
+        The OnlineSBA DataFrames keyed by source file name (see clean_and_convert)
+    local_path : str, required
+        The root directory of the data
+    country : str, required
+        e.g. RMI
+    export : str, required
+        'csv' or 'xlsx' (see onlinesba_filename)
+    processes : int, optional
+        Number of worker processes. None uses all cores, 1 runs sequentially
+        in the current process.
+    claims : Dict, optional
+        The other source files (not in dfs) already giving a load file keyed
+        by load file e.g. from an earlier incremental run (see Manifest.claims)
+
+    Returns
+    -------
+    outputs : Dict
+        The load files written keyed by source file name
+    errors : Dict
+        The source files whose load file could not be written and why
+    """
+    filenames = {}
+    errors = {}
+    for name, df in dfs.items():
+        try:
+            filenames[name] = onlinesba_filename(df, local_path, country, export)
+        except Exception as e:
+            errors[name] = 'Cannot generate filename {}: {}'.format(type(e).__name__, e)
+    for directory in set(os.path.dirname(filename) for filename in filenames.values()):
+        os.makedirs(directory, exist_ok=True)
+
+    sources = {}
+    for name, filename in filenames.items():
+        sources.setdefault(filename, []).append(name)
+    names = []
+    for filename, file_sources in sources.items():
+        others = [other for other in (claims or {}).get(filename, []) if other not in file_sources]
+        if len(file_sources) + len(others) > 1:
+            for name in file_sources:
+                errors[name] = 'Load file {} is also produced by {}'.format(
+                    filename, ', '.join(other for other in file_sources + others if other != name))
+        else:
+            names.append(file_sources[0])
+
+    args = ([dfs[name] for name in names], [filenames[name] for name in names])
+    if processes == 1 or len(names) <= 1:
+        results = list(map(_write_one, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_write_one, *args))
+    file_errors = {filenames[name]: error for name, error in zip(names, results) if error is not None}
+
+    outputs = {}
+    for name in names:
+        if filenames[name] in file_errors:
+            errors[name] = file_errors[filenames[name]]
+        else:
+            outputs[name] = filenames[name]
+    return outputs, errors
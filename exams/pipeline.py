@@ -0,0 +1,115 @@
+"""Headless versions of the notebooks' batch processing.
+
+Each run_* function does what the "all files" cells of a notebook do, driven
+by config.json only (no IPython, no plotting) so that it can be scheduled on a
+server. The stages are imported when a run starts, so importing this module
+(or python -m exams --help) stays cheap.
+"""
+import os
+
+
+def run_assessment(config, local_path):
+    """The SOE Assessment (Scores, AggregateScores) of every AllSchools workbook
+    of the country/test, one workbook per exam-year (see soe-assessment.ipynb).
+
+    Parameters
+    ----------
+    config : Dict, required
+        The configuration (i.e. config.json)
+    local_path : str, required
+        The root directory of the data (e.g. .../pacific-emis-exams containing RMI/MISAT)
+
+    Returns
+    -------
+    outputs : Dict
+        The workbooks written keyed by source file name
+    errors : Dict
+        The source files that could not be processed and why
+    """
+    from exams.assessment import assess_excel_files
+    from exams.levels import get_achievement_levels
+
+    country = config['country']
+    path = os.path.join(local_path, country, config['test'])
+    output_path = os.path.join(local_path, country, 'soe-assessment')
+    return assess_excel_files(path, output_path, get_achievement_levels(country),
+                              tie_break=config.get('level_tie_break', 'best'),
+                              processes=config.get('processes'), cache_path=config.get('cache_path'),
+                              side_outputs=config.get('side_outputs', []))
+
+
+def run_onlinesba(config, local_path, engine=None):
+    """The OnlineSBA load files of every workbook of the country/test (see soe-to-onlinesba.ipynb).
+
+    Parameters
+    ----------
+    config : Dict, required
+        The configuration (i.e. config.json)
+    local_path : str, required
+        The root directory of the data (e.g. .../pacific-emis-exams containing RMI/MISAT)
+    engine : sqlalchemy.engine.Engine, optional
+        The EMIS database (defaults to the one in config.json)
+
+    Returns
+    -------
+    outputs : Dict
+        The load files written keyed by source file name
+    errors : Dict
+        The source files that could not be processed and why
+    """
+    from exams.cache import fingerprint_files
+    from exams.emis import create_emis_engine, load_emis_data
+    from exams.loader import find_excel_files, load_excel_files
+    from exams.manifest import Manifest
+    from exams.onlinesba import (EnrolmentIndex, SchoolLookup, merge_exams_data_with_student_enrol_df, clean_and_convert,
+                                 settings_fingerprint, write_onlinesba_files)
+    from exams.school_aliases import schools_lookup_from_exams_byname, FUZZY_CUTOFF
+
+    country = config['country']
+    if engine is None:
+        engine = create_emis_engine(config)
+    df_student_enrol, df_schools = load_emis_data(engine)
+
+    path = os.path.join(local_path, country+'/'+config['test'])
+    if config['load_year'] != 'all':
+        path = os.path.join(path, config['load_year'])
+
+    # Incremental mode (see exams.manifest)
+    manifest = Manifest(os.path.join(local_path, country+'/onlinesba-load-files-manifest.json'))
+    settings = settings_fingerprint(config, df_schools, df_student_enrol, schools_lookup_from_exams_byname)
+    filenames = find_excel_files(path)
+    source_fingerprints = fingerprint_files(filenames, config.get('cache_path'))
+    if config.get('incremental', False):
+        files_to_load = manifest.stale(source_fingerprints, settings)
+    else:
+        files_to_load = None
+
+    dfs, errors = load_excel_files(path, processes=config.get('processes'), cache_path=config.get('cache_path'),
+                                   include=files_to_load, fingerprints=source_fingerprints)
+    enrolment_index = EnrolmentIndex(df_student_enrol)
+    school_lookup = SchoolLookup(df_schools, schools_lookup_from_exams_byname,
+                                 fuzzy_cutoff=config.get('school_alias_fuzzy_cutoff', FUZZY_CUTOFF))
+    dfs_onlinesba = {}
+    for name, df in dfs.items():
+        try:
+            df = merge_exams_data_with_student_enrol_df(df, enrolment_index,
+                                                        disambiguate=config.get('disambiguate_students', False))
+            if df is None:
+                errors[filenames[name]] = 'Could not be merged with the student enrolments'
+                continue
+            dfs_onlinesba[name] = clean_and_convert(df, school_lookup, name, schools_lookup_from_exams_byname, config)
+        except Exception as e:
+            errors[filenames[name]] = '{}: {}'.format(type(e).__name__, e)
+
+    # The load files are written in parallel (a load file given by several source files is an error)
+    claims = manifest.claims(name for name in source_fingerprints if name not in dfs_onlinesba)
+    outputs, write_errors = write_onlinesba_files(dfs_onlinesba, local_path, country, config['export'],
+                                                  processes=config.get('processes'), claims=claims)
+    for name, error in write_errors.items():
+        errors[filenames[name]] = error
+    for name, filename in outputs.items():
+        manifest.record(name, source_fingerprints[name], settings, [filename])
+
+    # Remember what was produced for the next incremental run
+    manifest.save()
+    return outputs, errors
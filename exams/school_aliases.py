@@ -0,0 +1,722 @@
+"""School names found in the SOE workbooks mapped to their canonical EMIS school ID.
+
+Mostly RMI workbooks with old or incorrect school IDs where the only way to
+identify the school is the school name and island name combination
+(i.e. SchoolName-IslandName).
+
+The SchoolAliasResolver looks names up by their canonical form (case, spaces,
+punctuation and common misspellings folded) so variants such as 'Ailuk -Ailuk '
+and 'Ailuk-Ailuk' need no entry of their own (so the mapping below holds a
+single name of each canonical form). It then falls back to approximate
+matching (rapidfuzz) for typos never seen before. The short words of the
+school name are always matched exactly since short names only differ by a
+letter or number (e.g. 'Woja A' and 'Woja M').
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Misspellings seen in the workbooks (whole words of the canonical form)
+MISSPELLINGS = {
+    'maloeplap': 'maloelap',
+    'maleolap': 'maloelap',
+    'kwajlein': 'kwajalein',
+    'kwajelein': 'kwajalein',
+    'jaljuit': 'jaluit',
+    'alluk': 'ailuk',
+    'jebat': 'jabat',
+    'ronrong': 'rongrong',
+    'seconday': 'secondary',
+}
+
+# Minimum rapidfuzz ratio (0-100) of both the school and island names of an
+# approximate match (None disables approximate matching)
+FUZZY_CUTOFF = 90
+
+_MISSPELLINGS_RE = re.compile(r'\b(' + '|'.join(MISSPELLINGS) + r')\b')
+
+
+def canonical_school_keys(keys):
+    """The canonical form of 'SchoolName-IslandName' keys: lower case, punctuation
+    other than the hyphen removed, single spaces, no spaces around the hyphen and
+    common misspellings fixed e.g. 'aerok a-ailinglaplap' for 'Aerok, A -Ailinglaplap '.
+
+    Parameters
+    ----------
+    keys : Series, required
+        The keys to canonicalize
+
+    Returns
+    -------
+    Series
+    """
+    keys = keys.astype(str).str.lower()
+    keys = keys.str.replace(r'[^\w\s-]', ' ', regex=True)
+    keys = keys.str.replace(r'\s+', ' ', regex=True)
+    keys = keys.str.replace(r'\s*-\s*', '-', regex=True).str.strip()
+    return keys.str.replace(_MISSPELLINGS_RE, lambda m: MISSPELLINGS[m.group(1)], regex=True)
+
+
+def _distinguishing_tokens(school):
+    """The words of a school name too short (or numeric) for approximate matching
+    e.g. the 'a' of 'woja a' (as opposed to 'woja m')."""
+    return sorted(token for token in school.split() if len(token) <= 2 or any(c.isdigit() for c in token))
+
+
+def split_school_keys(keys):
+    """The school names and island names of canonical 'schoolname-islandname'
+    keys (the island is None without a hyphen)."""
+    schools, islands = [], []
+    for key in keys:
+        school, _, island = key.rpartition('-')
+        schools.append(school if school else island)
+        islands.append(island if school else None)
+    return schools, islands
+
+
+class SchoolAliasResolver:
+    """Resolves exams school names to school IDs by canonical name, then optionally
+    by the closest canonical name (both the school name and the island name above
+    the cutoff, same distinguishing tokens of the school name).
+
+    Parameters
+    ----------
+    aliases : Dict, required
+        School names (SchoolName-IslandName) to school IDs
+        e.g. schools_lookup_from_exams_byname
+    fuzzy_cutoff : int, optional
+        Minimum rapidfuzz ratio (0-100) of both the school name and the island
+        name of an approximate match. None disables approximate matching (also
+        disabled when rapidfuzz is not installed)
+
+    Attributes
+    ----------
+    index : Series
+        The school ID of every canonical name
+    """
+
+    def __init__(self, aliases, fuzzy_cutoff=FUZZY_CUTOFF):
+        keys = pd.Series(list(aliases.keys()), dtype=object)
+        index = pd.Series(list(aliases.values()), index=canonical_school_keys(keys).to_numpy(), dtype=object)
+        # Like a dict the last of the names with the same canonical form wins
+        self.index = index[~index.index.duplicated(keep='last')]
+        self.fuzzy_cutoff = fuzzy_cutoff
+        # Names already approximately resolved (or not) keyed by canonical name
+        self.approximate = {}
+        # The school and island names (and distinguishing tokens) of every canonical
+        # name are split once and matched all at once against the unknown names
+        self.schools, islands = split_school_keys(self.index.index)
+        self.islands = [island or '' for island in islands]
+        self.tokens = [_distinguishing_tokens(school) for school in self.schools]
+        self.school_ids = self.index.to_numpy()
+
+    def __len__(self):
+        return len(self.index)
+
+    def _match_approximately(self, canonical_keys):
+        """The school ID and canonical name closest to each of canonical_keys
+        ((NaN, None) unless every name above the cutoff gives the same school ID)."""
+        try:
+            from rapidfuzz import fuzz, process
+        except ImportError:
+            return [(np.nan, None)] * len(canonical_keys)
+        if not canonical_keys or not len(self):
+            return [(np.nan, None)] * len(canonical_keys)
+        schools, islands = split_school_keys(canonical_keys)
+        school_scores = process.cdist(schools, self.schools, scorer=fuzz.ratio, score_cutoff=self.fuzzy_cutoff)
+        island_scores = process.cdist([island or '' for island in islands], self.islands, scorer=fuzz.ratio,
+                                      score_cutoff=self.fuzzy_cutoff)
+        matches = []
+        for i, school in enumerate(schools):
+            tokens = _distinguishing_tokens(school)
+            candidates = [j for j in np.flatnonzero((school_scores[i] >= self.fuzzy_cutoff) & (island_scores[i] >= self.fuzzy_cutoff))
+                          if self.tokens[j] == tokens]
+            if len({self.school_ids[j] for j in candidates}) == 1:
+                best = max(candidates, key=lambda j: school_scores[i][j] + island_scores[i][j])
+                matches.append((self.school_ids[best], self.index.index[best]))
+            else:
+                matches.append((np.nan, None))
+        return matches
+
+    def resolve(self, keys):
+        """The school IDs of 'SchoolName-IslandName' keys (NaN when unknown).
+
+        Parameters
+        ----------
+        keys : Series, required
+            The SchoolName-IslandName of the exams data
+
+        Returns
+        -------
+        Series
+        """
+        codes, uniques = pd.factorize(keys, use_na_sentinel=False)
+        canonical = canonical_school_keys(pd.Series(uniques, dtype=object))
+        school_ids = canonical.map(self.index)
+
+        if self.fuzzy_cutoff is not None:
+            unknown = school_ids.isna().to_numpy()
+            to_match = [k for k in dict.fromkeys(canonical[unknown]) if k not in self.approximate]
+            for key, (school_id, name) in zip(to_match, self._match_approximately(to_match)):
+                self.approximate[key] = school_id
+                if name is not None:
+                    # Not in the hard coded mapping so always reported
+                    print("School '{}' approximately matched to '{}' ({})".format(key, name, school_id))
+            school_ids[unknown] = canonical[unknown].map(self.approximate)
+
+        return pd.Series(school_ids.to_numpy()[codes], index=keys.index, dtype=object)
+
+
+# This list is to be confirmed and updated as necessary
+# If a school name is in an exam file but not in here we need to generate an error message
+# and update this list with the correct mapping to the canonical school ID
+schools_lookup_from_exams_byname = {
+    'Ebeye Christian-Private': 'KWA105',
+    'Ebeye SDA-Private Primary': 'KWA109',
+    'Ine-Arno': 'ARN103',
+    'Aerok A-Aelonlaplap': 'AIL100',
+    'Aerok A-Ailinglaplap': 'AIL100',
+    'Aerok A-Maloelap': 'MAL101',
+    'Aerok A-Medium': 'AIL100',
+    'Aerok A-Public': 'AIL100',
+    'Aerok M-Maloelap': 'MAL101',
+    'Aerok M-Northern': 'MAL101',
+    'Aerok M-Public': 'MAL101',
+    'Aerok Protestant-Private': 'AIL109',
+    'Ailuk-Ailuk': 'ALU101',
+    'Ailuk Protestant-Private': 'ALU103',
+    'Ailuk-Public': 'ALU101',
+    'Ailuk-Enejelaar': 'ALU102',
+    'Ailuk-Medium': 'ALU101',
+    'Ailuk-Northern': 'ALU101',
+    'Airok A-Aelonlaplap': 'AIL100',
+    'Airok A-Ailinglaplap': 'AIL100',
+    'Airok A-Central': 'AIL100',
+    'Airok A-Public': 'AIL100',
+    'Airok M-Maloelap': 'MAL101',
+    'Airok M-Mejit': 'MAL101',
+    'Airok M-Public': 'MAL101',
+    'Airok M-Small': 'MAL101',
+    'Airok Protestant-Private': 'AIL109',
+    'Ajeltake Chistian Academy-Majuro': 'MAJ102',
+    'Ajeltake Chistian Academy-Private Primary': 'MAJ102',
+    'Ajeltake Christian Academy-Majuro': 'MAJ102',
+    'Ajeltake Christian Academy-Private': 'MAJ102',
+    'Ajeltake Christian Academy-Private Primary': 'MAJ102',
+    'Ajeltake Christian Academy-Public ': 'MAJ102',
+    'Ajeltake Christian Acedemy-Majuro': 'MAJ102',
+    'Ajeltake Christian Acedemy-Private': 'MAJ102',
+    'Ajeltake-Majuro': 'MAJ101',
+    'Ajeltake-Large': 'MAJ101',
+    'Ajeltake-Public': 'MAJ101',
+    'Arno-Arno': 'ARN101',
+    'Arno-Public': 'ARN101',
+    'Arno-Eastern': 'ARN101',
+    'Arno-Medium': 'ARN101',
+    'Assumption High -Private Secondary': 'MAJ104',
+    'Assumption High School-Public Secondary': 'MAJ104',
+    'Assumption HS-Ailinglaplap': 'MAJ104',
+    'Assumption-Private': 'MAJ103',
+    'Assumption-Majuro': 'MAJ103',
+    'Assumption-Private Primary': 'MAJ103',
+    'Assumption-Private Secondary': 'MAJ104',
+    'Assumption-Public ': 'MAJ103',
+    'Aur-Aur': 'AUR101',
+    'Aur-Public': 'AUR101',
+    'Aur-Medium': 'AUR101',
+    'Aur-Northern': 'AUR101',
+    'Bikarej-Arno': 'ARN102',
+    'Bikarej-Public': 'ARN102',
+    'Bikarej-Eastern': 'ARN102',
+    'Bikarej-Medium': 'ARN102',
+    'Bouj-Aelonlaplap': 'AIL101',
+    'Bouj-Ailinglaplap': 'AIL101',
+    'Bouj-Public': 'AIL101',
+    'Buoj-Ailinglaplap': 'AIL101',
+    'Buoj-Aelonlaplap': 'AIL101',
+    'Buoj-Central': 'AIL101',
+    'Buoj-Medium': 'AIL101',
+    'Buoj-Public': 'AIL101',
+    'Carlos-Kwajalein': 'KWA101',
+    'Carlos-Public': 'KWA101',
+    'Carlos-Small': 'KWA101',
+    'Deaf Center-Majuro': 'MAJ131',
+    'Delap Calvary-Private': 'KSA103',
+    'Delap-Majuro': 'MAJ105',
+    'Delap SDA High -Private Secondary': 'MAJ108',
+    'Delap SDA High School-Public Secondary': 'MAJ108',
+    'Delap SDA HS-Ailinglaplap': 'MAJ108',
+    'Delap SDA-Majuro': 'MAJ107',
+    'Delap SDA-Private': 'MAJ107',
+    'Delap SDA-Private Primary': 'MAJ107',
+    'Delap SDA-Private Secondary': 'MAJ108',
+    'Delap SDA-Public ': 'MAJ107',
+    'Delap-Public': 'MAJ105',
+    'DES-Large': 'MAJ105',
+    'DES-Majuro': 'MAJ105',
+    'DES-Public': 'MAJ105',
+    'Ebadon-Kwajalein': 'KWA102',
+    'Ebadon-Public': 'KWA102',
+    'Ebadon-Small': 'KWA102',
+    'Ebeye Calvary High -Private Secondary': 'KWA104',
+    'Ebeye Calvary High School-Private Secondary': 'KWA104',
+    'Ebeye Calvary HS-Ailinglaplap': 'KWA104',
+    'Ebeye Calvary -Kwajalein': 'KWA103',
+    'Ebeye Calvary-Private': 'KWA103',
+    'Ebeye Calvary-Private Primary': 'KWA103',
+    'Ebeye Calvary-Private Secondary': 'KWA104',
+    'Ebeye Calvary-Public': 'KWA103',
+    'Ebeye Cavalry-Private Primary': 'KWA103',
+    'Ebeye Christian-Kwajalein': 'KWA105',
+    'Ebeye Christian-Private Primary': 'KWA105',
+    'Ebeye Christian-Public ': 'KWA105',
+    'Ebeye Deaf Center -Kwajalein': 'KWA121',
+    'Ebeye Deaf Center -Private Secondary': 'KWA120',
+    'Ebeye Deaf Edu. -Private Secondary': 'KWA120',
+    'Ebeye Elementary-Kwajelein': 'KWA108',
+    'Ebeye Middle Public-Kwajalein': 'KWA107',
+    'Ebeye Middle School-Kwajalein': 'KWA107',
+    'Ebeye Middle School-Public': 'KWA107',
+    'Ebeye Public-Public': 'KWA108',
+    'Ebeye Public-Kwajalein': 'KWA108',
+    'Ebeye Public-Large': 'KWA108',
+    'Ebeye SDA High -Private Secondary': 'KWA110',
+    'Ebeye SDA High School-Private Secondary': 'KWA110',
+    'Ebeye SDA HS-Ailinglaplap': 'KWA110',
+    'Ebeye SDA -Kwajalein': 'KWA109',
+    'Ebeye SDA-Private': 'KWA109',
+    'Ebeye SDA-Private Secondary': 'KWA110',
+    'Ebeye SDA-Public ': 'KWA109',
+    'Ebon-Ebon': 'EBO101',
+    'Ebon-Public': 'EBO101',
+    'Ebon-Medium': 'EBO101',
+    'Ebon-Southern': 'EBO101',
+    'EES/ Ejit??-Kili': 'KIL101',
+    'Ejit-Kili': 'KIL101',
+    'Ejit-Kili/Bikini': 'KIL101',
+    'Ejit-Majuro': 'KIL101',
+    'Ejit-Medium': 'KIL101',
+    'Ejit-Public': 'KIL101',
+    'Ejit-Southern': 'KIL101',
+    'Enburr-Kwajalein': 'KWA111',
+    'Enejelaar-Ailuk': 'ALU102',
+    'Enejelaar-Northern': 'ALU102',
+    'Enejelaar-Public': 'ALU102',
+    'Enejelaar-Small': 'ALU102',
+    'Enejet-Mili': 'MIL101',
+    'Enejet-Public': 'MIL101',
+    'Enejet-Eastern': 'MIL101',
+    'Enejet-Enejet': 'MIL101',
+    'Enejet-Medium': 'MIL101',
+    'Enekoion-Ebon': 'EBO102',
+    'Enekoion-Public': 'EBO102',
+    'Enekoion-Small': 'EBO102',
+    'Enekoion-Southern': 'EBO102',
+    'Enewa-Aelonlaplap': 'AIL102',
+    'Enewa-Ailinglaplap': 'AIL102',
+    'Enewa-Public': 'AIL102',
+    'Enewa-Central': 'AIL102',
+    'Enewa-Small': 'AIL102',
+    'Enewetak-Enewetak': 'ENE101',
+    'Enewetak-Public': 'ENE101',
+    'Enewetak-Eastern': 'ENE101',
+    'Enniburr High School-Public Secondary': 'KWA119',
+    'Enniburr-Kwajalein': 'KWA111',
+    'Enniburr-Public': 'KWA111',
+    'Enniburr-Medium': 'KWA111',
+    'Enniburr-Public Secondary': 'KWA119',
+    'Father Hacker High School-Private Secondary': 'KWA118',
+    'Father Hacker HS-Ailinglaplap': 'KWA118',
+    'Father Hacker-Private Secondary': 'KWA118',
+    'Gem Chirstian School-Private Primary': 'KWA112',
+    'Gem Christian High School-Private Secondary': 'KWA113',
+    'Gem Christian -Private ': 'KWA112',
+    'Gem Christian School-Kwajalein': 'KWA113',
+    'Gem Christian School-Private': 'KWA112',
+    'Gem Christian School-Private Primary': 'KWA112',
+    'Gem Christian School-Public ': 'KWA112',
+    'Gem High School-Private Secondary': 'KWA113',
+    'Gem HS-Ailinglaplap': 'KWA113',
+    'Gem -Private': 'KWA112',
+    'Gem-Private Secondary': 'KWA113',
+    'Imiej-Jaluit': 'JAL101',
+    'Imiej-Public': 'JAL101',
+    'Imiej-Medium': 'JAL101',
+    'Imiej-Southern': 'JAL101',
+    'Imroj-Jaluit': 'JAL102',
+    'Imroj Protestant-Private': 'JAL110',
+    'Imroj-Public': 'JAL102',
+    'Imroj-Southern': 'JAL102',
+    'Imroj-Medium': 'JAL102',
+    'Ine-Public': 'ARN103',
+    'Ine-Eastern': 'ARN103',
+    'Ine-Medium': 'ARN103',
+    'Jabat-Jabat': 'JAB101',
+    'Jabat-Central': 'JAB101',
+    'Jabat-Public': 'JAB101',
+    'Jabnoden-Jaluit': 'JAL103',
+    'Jabnoden-Public': 'JAL103',
+    'Jabnodren-Jaluit': 'JAL103',
+    'Jabnodren-Public ': 'JAL103',
+    'Jabnodren-Southern': 'JAL103',
+    'Jabonden-Jaluit': 'JAL103',
+    'Jabor-Jaluit': 'JAL104',
+    'Jabor-Public': 'JAL104',
+    'Jabor-Medium': 'JAL104',
+    'Jabor-Southern': 'JAL104',
+    'Jabot -Public': 'JAB101',
+    'Jabro-Private': 'KWA115',
+    'Jah-Ailinglaplap': 'AIL103',
+    'Jah-Public': 'AIL103',
+    'Jah-Aelonlaplap': 'AIL103',
+    'Jah-Central': 'AIL103',
+    'Jah-Small': 'AIL103',
+    'Jaluit-Jaluit': 'JAL105',
+    'Jaluit-Public': 'JAL105',
+    'Jaluit-???': 'JAL105',
+    'Jaluit-Medium': 'JAL105',
+    'Jaluit-Southern': 'JAL105',
+    'Jang-Public': 'MAL102',
+    'Jang-Maloelap': 'MAL102',
+    'Jang-Northern': 'MAL102',
+    'Jang-Small': 'MAL102',
+    'Japo-Arno': 'ARN104',
+    'Japo-Public': 'ARN104',
+    'Japo-Eastern': 'ARN104',
+    'Japo-Medium': 'ARN104',
+    'Jebal -Likiep ': 'LIK101',
+    'Jebro High School-Private Secondary': 'KWA114',
+    'Jebro High School-Public Secondary': 'KWA114',
+    'Jebro HS-Ailinglaplap': 'KWA114',
+    'Jebro Kabua-Private': 'KWA115',
+    'Jebro-Kwajalein': 'KWA115',
+    'Jebro-Private': 'KWA115',
+    'Jebro-Private Primary': 'KWA115',
+    'Jebro-Private Secondary': 'KWA114',
+    'Jebro-Public ': 'KWA115',
+    'Jebwan-Ailinglaplap': 'AIL105',
+    'Jebwan-Aelonlaplap': 'AIL105',
+    'Jebwan-Central': 'AIL105',
+    'Jebwan-Public': 'AIL105',
+    'Jebwan-Small': 'AIL105',
+    'Jeh-Ailinglaplap': 'AIL104',
+    'Jeh-Public': 'AIL104',
+    'Jeh SDA-Private': 'AIL110',
+    'Jeh-Aelonlaplap': 'AIL104',
+    'Jeh-Central': 'AIL104',
+    'Jeh-Medium': 'AIL104',
+    'Jepal-Public': 'LIK101',
+    'Jepal-Likiep': 'LIK101',
+    'Jepal-Northern': 'LIK101',
+    'Jepal-Small': 'LIK101',
+    'JHS-Ailinglaplap': 'JAL106',
+    'JHS-Public Secondary': 'JAL106',
+    'Jobwon -Ailinglaplap': 'AIL105',
+    'KAHS-Ailinglaplap': 'KWA116',
+    'KAHS-Public Secondary': 'KWA116',
+    'Kattiej-Aelonlaplap': 'AIL106',
+    'Kattiej-Ailinglaplap': 'AIL106',
+    'Kattiej-Public': 'AIL106',
+    'Kattiej-Central': 'AIL106',
+    'Kattiej-Small': 'AIL106',
+    'Kaven-Maloelap': 'MAL103',
+    'Kaven-Public': 'MAL103',
+    'Kaven-Northern': 'MAL103',
+    'Kaven-Small': 'MAL103',
+    'Kilange-Arno': 'ARN105',
+    'Kilange-Public': 'ARN105',
+    'Kilange-Eastern': 'ARN105',
+    'Kilange-Medium': 'ARN105',
+    'Kili-Kili': 'KIL102',
+    'Kili-Public': 'KIL102',
+    'Kili-Southern': 'KIL102',
+    'Kili-Kili/Bikini': 'KIL102',
+    'Kili-Medium': 'KIL102',
+    'Kinange-Arno': 'ARN105',
+    'Lae-Lae': 'LAE101',
+    'Lae-Public': 'LAE101',
+    'Lae-Medium': 'LAE101',
+    'Lae-Western': 'LAE101',
+    'Laura Christian Academy-Majuro': 'MAJ129',
+    'Laura Christian Academy-Private': 'MAJ129',
+    'Laura High School-Majuro': 'MAJ111',
+    'Laura High School-Public': 'MAJ111',
+    'Laura-Majuro': 'MAJ109',
+    'Laura Protestant-Private': 'MAJ133',
+    'Laura Public-Public': 'MAJ109',
+    'Laura Public-Large': 'MAJ109',
+    'Laura Public-Majuro': 'MAJ109',
+    'Laura SDA-Majuro': 'MAJ110',
+    'Laura SDA-Private': 'MAJ110',
+    'Laura SDA-Private Primary': 'MAJ110',
+    'Laura SDA-Public ': 'MAJ110',
+    'Laura-Public ': 'MAJ109',
+    'LHS-Ailinglaplap': 'MAJ111',
+    'LHS-Majuro': 'MAJ111',
+    'LHS-Public Secondary': 'MAJ111',
+    'LHS-Public': 'MAJ111',
+    'Lib-Lib': 'LIB101',
+    'Lib-Medium': 'LIB101',
+    'Lib-Public': 'LIB101',
+    'Lib-Western': 'LIB101',
+    'Life Skills Academy-Majuro': 'MAJ113',
+    'Life Skills Academy-Public': 'MAJ113',
+    'Likiep-Likiep': 'LIK102',
+    'Likiep-Public': 'LIK102',
+    'Likiep-Medium': 'LIK102',
+    'Likiep-Northern': 'LIK102',
+    'Loen-Namu': 'NAU101',
+    'Loen-Public': 'NAU101',
+    'Loen-Central': 'NAU101',
+    'Loen-Medium': 'NAU101',
+    'Long Isand-Majuro': 'MAJ112',
+    'Long Island-Majuro': 'MAJ112',
+    'Long Island-Public': 'MAJ112',
+    'Longar-Arno': 'ARN106',
+    'Longar-Public': 'ARN106',
+    'Longar-Eastern': 'ARN106',
+    'Longar-Medium': 'ARN106',
+    'Lukoj-Arno': 'ARN107',
+    'Lukoj-Eastern': 'ARN107',
+    'Lukoj-Public': 'ARN107',
+    'Lukoj-Small': 'ARN107',
+    'Lukonwod-Mili': 'MIL102',
+    'Lukonwod-Public': 'MIL102',
+    'Lukonwod-Eastern': 'MIL102',
+    'Lukonwod-Enewetak': 'ENE101',
+    'Lukonwod-Lukonwod': 'MIL102',
+    'Lukonwod-Small': 'MIL102',
+    'Lukunwod-Mili': 'MIL102',
+    'Mae-Namu': 'NAU102',
+    'Mae-Public': 'NAU102',
+    'Mae-Central': 'NAU102',
+    'Majken-Namu': 'NAU103',
+    'Majken-Central': 'NAU103',
+    'Majken-Medium': 'NAU103',
+    'Majken-Public': 'NAU103',
+    'Majkin-Namu': 'NAU103',
+    'Majkin-Public': 'NAU103',
+    'Majkin-Central': 'NAU103',
+    'Majuro Baptist Academy-Private Primary': 'MAJ114',
+    'Majuro Baptist Christian Academy-Majuro': 'MAJ114',
+    'Majuro Baptist Christian Academy-Private': 'MAJ114',
+    'Majuro Baptist Christian Academy-Private Primary': 'MAJ114',
+    'Majuro Baptist Christian Academy-Private Secondary': 'MAJ115',
+    'Majuro Baptist Christian Academy-Public ': 'MAJ114',
+    'Majuro Baptist Christian-Private': 'MAJ114',
+    'Majuro Baptist HS-Ailinglaplap': 'MAJ115',
+    'Majuro Baptist-Private': 'MAJ114',
+    'Majuro Coop High -Private Secondary': 'MAJ117',
+    'Majuro Coop HS-Ailinglaplap': 'MAJ117',
+    'Majuro Cooperative High School-Private Secondary': 'MAJ117',
+    'Majuro Coop-Majuro': 'MAJ116',
+    'Majuro Coop-Private': 'MAJ116',
+    'Majuro Coop-Private Primary': 'MAJ116',
+    'Majuro Coop-Private Secondary': 'MAJ117',
+    'Majuro Coop-Public ': 'MAJ116',
+    'Majuro Deaf Center -Public ': 'MAJ131',
+    'Majuro Deaf Center-Majuro': 'MAJ131',
+    'Majuro Deaf Center-Private Secondary': 'MAJ132',
+    'Majuro Deaf School-Majuro': 'MAJ131',
+    'Majuro Middle School-Majuro': 'MAJ120',
+    'Majuro Middle School-Public': 'MAJ120',
+    'Marshall Christian High School-Private Secondary': 'MAJ118',
+    'Marshall Christian High-Private Secondary': 'MAJ118',
+    'Marshall Christian-Private Secondary': 'MAJ118',
+    'Marshall Islands High School-Majuro': 'MAJ118',
+    'Marshall Islands High School-Public': 'MAJ118',
+    'Marshalls Christian High School-Private': 'MAJ118',
+    'Matolen-Arno': 'ARN108',
+    'Matolen-Public': 'ARN108',
+    'Matolen-Eastern': 'ARN108',
+    'Matolen-Medium': 'ARN108',
+    'MCHS -Ailinglaplap': 'MAJ117',
+    'MCHS-Private Secondary': 'MAJ118',
+    'MCHS-Public Secondary': 'MAJ118',
+    'MDEC-Majuro': 'MAJ131',
+    'MDEC-Public': 'MAJ131',
+    'MDED-Majuro': 'MAJ131',
+    'Mejatto-Mejatto': 'RON101',
+    'Mejatto-Public': 'RON101',
+    'Mejatto -Rongelap': 'RON101',
+    'Mejatto-Kwajalein': 'RON101',
+    'Mejatto-Maloeplap': 'RON101',
+    'Mejatto-Medium': 'RON101',
+    'Mejatto-Western': 'RON101',
+    'Mejel-Ailinglaplap': 'AIL107',
+    'Mejel-Public': 'AIL107',
+    'Mejel-Aelonlaplap': 'AIL107',
+    'Mejel-Central': 'AIL107',
+    'Mejel-Small': 'AIL107',
+    'Mejirirok -Jaluit': 'JAL107',
+    'Mejit-Mejit': 'MEJ101',
+    'Mejit-Public': 'MEJ101',
+    'Mejit-Medium': 'MEJ101',
+    'Mejit-Northern': 'MEJ101',
+    'Mejrirok-Jaluit': 'JAL107',
+    'Mejrirok-Public': 'JAL107',
+    'Mejrirok-Southern': 'JAL107',
+    'Mejurirok-Jaluit': 'JAL107',
+    'Mejurirok-Medium': 'JAL107',
+    'Mejurirok-Public': 'JAL107',
+    'Mejurirok-Southern': 'JAL107',
+    'Melang-Likiep': 'LIK103',
+    'Melang-Public': 'LIK103',
+    'Melang-Northern': 'LIK103',
+    'Melang-Small': 'LIK103',
+    'Melan-Likiep': 'LIK103',
+    'Melan-Public': 'LIK103',
+    'Middle School-Public': 'MAJ120',
+    'MIHS -Ailinglaplap': 'MAJ119',
+    'MIHS-Public Secondary': 'MAJ119',
+    'Mili-Mili': 'MIL103',
+    'Mili-Public': 'MIL103',
+    'Mili-Eastern': 'MIL103',
+    'MMS-Majuro': 'MAJ120',
+    'Nallo-Mili': 'MIL104',
+    'Nallo-Public': 'MIL104',
+    'Nallo-Eastern': 'MIL104',
+    'Nallo-Jaluit': 'MIL104',
+    'Nallo-Medium': 'MIL104',
+    'Namdrik-Namdrik': 'NAM101',
+    'Namdrik-Public': 'NAM101',
+    'Namdrik-Large': 'NAM101',
+    'Namdrik-Southern': 'NAM101',
+    'Namu-Namu': 'NAU104',
+    'Namu-Central': 'NAU104',
+    'Namu-Public': 'NAU104',
+    'Namu-Small': 'NAU104',
+    'Narmej-Jaluit': 'JAL108',
+    'Narmej-Public': 'JAL108',
+    'Narmej-Medium': 'JAL108',
+    'Narmej-Southern': 'JAL108',
+    'Narmij-Jaluit': 'JAL108',
+    'Narmij-Southern': 'JAL108',
+    'NDES-Majuro': 'MAJ126',
+    'NIHS -Ailinglaplap': 'WTH101',
+    'NIHS-Public Secondary': 'WTH101',
+    'NIHS-Private Secondary': 'WTH101',
+    'NIHS-Wotje': 'WTH101',
+    'North Delap-Majuro': 'MAJ126',
+    'North Delap-Public': 'MAJ126',
+    'NVTI-Majuro': 'MAJ128',
+    'Ollet-Maloelap': 'MAL104',
+    'Ollet -Ollet ': 'MAL104',
+    'Ollet-Public': 'MAL104',
+    'Ollet-Northern': 'MAL104',
+    'Ollet-Small': 'MAL104',
+    'Queen of Peace-Kwajalein': 'KWA117',
+    'Queen of Peace-Private': 'KWA117',
+    'Queen of Peace-Private Primary': 'KWA117',
+    'Queen of Peace-Public ': 'KWA117',
+    'Rairok-Majuro': 'MAJ121',
+    'Rairok-Public': 'MAJ121',
+    'Rairok-Large': 'MAJ121',
+    'RES-Large': 'MAJ122',
+    'RES-Majuro': 'MAJ122',
+    'RES-Public': 'MAJ122',
+    'Rita Chrisitan-Private': 'MAJ123',
+    'Rita Christian High School-Private Secondary': 'MAJ124',
+    'Rita Christian High-Private Secondary': 'MAJ124',
+    'Rita Christian HS-Ailinglaplap': 'MAJ124',
+    'Rita Christian-Private': 'MAJ123',
+    'Rita Christian-Majuro': 'MAJ123',
+    'Rita Christian-nan': 'MAJ124',
+    'Rita Christian-Private Primary': 'MAJ123',
+    'Rita Christian-Private Secondary': 'MAJ124',
+    'Rita Christian-Public ': 'MAJ123',
+    'Rita-Majuro': 'MAJ122',
+    'Rita-Public': 'MAJ122',
+    'Rongrong Christian Academy-Private': 'MAJ125',
+    'Rongrong Christian Elementary-Private': 'MAJ125',
+    'Rongrong Christian High-Private Secondary': 'MAJ118',
+    'Rongrong Christian School-Private': 'MAJ118',
+    'RongRong Christian-Private Primary': 'MAJ125',
+    'Rongrong Christian-Private': 'MAJ125',
+    'Rongrong Elementary-Majuro': 'MAJ125',
+    'Rongrong Elementary-Private': 'MAJ125',
+    'Rongrong-Majuro': 'MAJ125',
+    'Rongrong-Private': 'MAJ125',
+    'Rongrong-Public ': 'MAJ125',
+    'Rongrong-RongRong': 'MAJ125',
+    'St.Joseph-Jaluit': 'JAL109',
+    'St.Joseph-Private': 'JAL109',
+    'St. Joseph-Private Primary': 'JAL109',
+    'St.Paul-Arno': 'ARN109',
+    'St. Paul-Private': 'ARN109',
+    'St. Thomas-Private': 'WTH104',
+    'St. Thomas-Wotje': 'WTH104',
+    'St.Joseph-Public ': 'JAL109',
+    'Tarawa-Maloelap': 'MAL105',
+    'Tarawa-Public': 'MAL105',
+    'Tarawa-Majuro': 'MAL105',
+    'Tarawa-Medium': 'MAJ105',
+    'Tarawa-Northern': 'MAL105',
+    'Tinak-Arno': 'ARN109',
+    'Tinak-Public': 'ARN109',
+    'Tinak-Eastern': 'ARN109',
+    'Tinak-Medium': 'ARN109',
+    'Tobal-Aur': 'AUR102',
+    'Tobal-Public': 'AUR102',
+    'Tobal-Medium': 'AUR102',
+    'Tobal-Northern': 'AUR102',
+    'Toka-Ebon': 'EBO103',
+    'Toka-Public': 'EBO103',
+    'Toka-Medium': 'EBO103',
+    'Toka-Southern': 'EBO103',
+    'Tokewa-Mili': 'MIL105',
+    'Tokewa-Public': 'MIL105',
+    'Tokewa-Eastern': 'MIL105',
+    'Tokewa-Small': 'MIL105',
+    'Tutu-Arno': 'ARN110',
+    'Tutu-Public': 'ARN110',
+    'Tutu-Eastern': 'ARN110',
+    'Tutu-Small': 'ARN110',
+    'UES-Large': 'ARN111',
+    'UES-Majuro': 'MAJ126',
+    'UES-Public': 'ARN111',
+    'Ujae-Public': 'UJA101',
+    'Ujae-Ujae': 'UJA101',
+    'Ujae-Medium': 'UJA101',
+    'Ujae-Western': 'UJA101',
+    'Ulien-Arno': 'ARN111',
+    'Ulien-Public': 'ARN111',
+    'Ulien-Eastern': 'ARN111',
+    'Ulien-Medium': 'ARN111',
+    'Uliga-Majuro': 'MAJ126',
+    'Uliga Protestant-Private': 'MAJ130',
+    'UPCS-Majuro': 'MAJ130',
+    'UPCS-Private': 'MAJ130',
+    'Utrik-Public': 'UTR101',
+    'Utrik-Utrik': 'UTR101',
+    'Utrik-Medium': 'UTR101',
+    'Utrik-Northern': 'UTR101',
+    'Wodmeej-Wotje': 'WTH102',
+    'Wodmeej-Northern': 'WTH102',
+    'Wodmeej-Public': 'WTH102',
+    'Wodmeej-Small': 'WTH102',
+    'Wodmej-Public': 'WTH102',
+    'Wodmej -Wotje': 'WTH102',
+    'Woja A-Aelonlaplap': 'AIL108',
+    'Woja A-Ailinglaplap': 'AIL108',
+    'Woja A-Public': 'AIL108',
+    'Woja A-Central': 'AIL108',
+    'Woja A-Medium': 'AIL108',
+    'Woja M-Majuro': 'MAJ127',
+    'Woja M-Public': 'MAJ127',
+    'Woja M-Large': 'MAJ127',
+    'Woja M-Private': 'MAJ127',
+    'Woja SDA-Private': 'AIL111',
+    'Wotho-Wotho': 'WOT101',
+    'Wotje-Wotje': 'WTH103',
+    'Wotje-Large': 'WTH103',
+    'Wotje-Northern': 'WTH103',
+    'Wotje-Public': 'WTH103',
+    'Wotto-Wotto': 'WOT101',
+    'Wotto-Public': 'WOT101',
+    'Wotto-Small': 'WOT101',
+    'Wotto-Western': 'WOT101',
+    'Jang-Majuro': 'MAL102',
+    'Kaven-Majuro': 'MAL103',
+}
@@ -0,0 +1,78 @@
+"""Vectorized scoring of SOE Assessment responses against the answer key.
+
+The answer key is embedded in the item column headers, the last letter being
+the correct answer (e.g. Item_001_AS0602010401E_ddd -> D). Rather than calling
+a Python function per student per item, the whole block of responses is
+turned into a NumPy character matrix once and compared against the key vector.
+"""
+import numpy as np
+import pandas as pd
+
+
+def get_item_columns(columns):
+    """Returns the sorted item columns (e.g. Item_001_AS0602010401E_ddd) of a
+    Responses sheet. Works for both the raw (Item_) and cleaned (ITEM_) headers."""
+    return sorted(c for c in columns if isinstance(c, str) and c.upper().startswith('ITEM_'))
+
+
+def parse_answer_key(cols_items):
+    """Parses the answer key once from the item column headers.
+
+    Parameters
+    ----------
+    cols_items : List, required
+        The item columns (e.g. ['Item_001_AS0602010401E_ddd', 'Item_002_AS0602010402M_aaa'])
+
+    Returns
+    -------
+    key : ndarray
+        The upper case correct answers as a '<U1' vector (e.g. array(['D', 'A']))
+    """
+    return np.array([c[-1].upper() for c in cols_items], dtype='<U1')
+
+
+def score_matrix(df, cols_items=None, strip=False):
+    """Scores all responses at once.
+
+    An answer is correct when it is a string equal to the key letter (case
+    insensitive). Anything else, including NaN and numbers, is incorrect, the
+    same business rule as the original per cell score().
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The Responses sheet
+    cols_items : List, optional
+        The item columns to score (defaults to all the item columns, sorted)
+    strip : bool, optional
+        Whether to ignore leading/trailing spaces in the answers (e.g. ' a ')
+
+    Returns
+    -------
+    scores : ndarray
+        A (students x items) int8 matrix of 1 (correct) and 0 (incorrect)
+    """
+    if cols_items is None:
+        cols_items = get_item_columns(df.columns)
+    key = parse_answer_key(cols_items)
+    responses = df[cols_items].to_numpy(dtype=object)
+
+    if strip:
+        answers = np.char.strip(responses.astype(str))
+    else:
+        answers = responses
+    # The key is a single character so two characters are enough to tell a
+    # correct answer from any other value (e.g. 'AB', 'A ', 'nan', '12.5')
+    answers = np.asarray(answers, dtype='<U2')
+    scores = (answers == key) | (answers == np.char.lower(key))
+    # Signed so that sums upcast to int64 and arithmetic such as TotalScore - 6
+    # does not wrap around like it would with unsigned integers
+    return scores.view(np.int8)
+
+
+def score_responses(df, cols_items=None, strip=False):
+    """Same as score_matrix but returns a DataFrame of the scores with the
+    item columns and the index of the responses."""
+    if cols_items is None:
+        cols_items = get_item_columns(df.columns)
+    return pd.DataFrame(score_matrix(df, cols_items, strip=strip), index=df.index, columns=cols_items)
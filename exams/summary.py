@@ -0,0 +1,399 @@
+"""Number of students at each level of a metric (Results sheet).
+
+The student x level columns of a metric (e.g. A.6.2.1.3Level, A.6.2.1.4Level
+for indicators) are melted once into long form, i.e. one row per student and
+column with its Gender and level, and the counts come out of a single groupby
+instead of one groupby per column. The SOE style level counts of benchmarks,
+standards and test are derived from those of the indicators with the sparse
+matrix of the item hierarchy.
+
+The many variants of a summary (by gender, with descriptions, totals and
+percents ready for charts) are only computed when they are used, see
+RubricSummary.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from exams.levels import get_achievement_levels
+
+
+def melt_levels(df_metric, cols_levels, achievement_levels):
+    """Returns the levels of df_metric in long form.
+
+    Parameters
+    ----------
+    df_metric : DataFrame, required
+        The StudentName, Gender and levels columns of the students
+    cols_levels : List, required
+        The levels columns (e.g. ['A.6.2.1.3Level', etc.])
+    achievement_levels : List, required
+        The labels of the 4 levels (e.g. ['Beginning', 'Developing', 'Proficient', 'Advanced'])
+
+    Returns
+    -------
+    DataFrame
+        The columns Gender, metric (e.g. A.6.2.1.3, categorical in the order of
+        cols_levels), level (ordered categorical) and named (whether the student
+        has a name, only those are counted), one row per student and metric
+    """
+    names = [m.split('Level')[0] for m in cols_levels]
+    df_long = df_metric[['Gender'] + cols_levels].assign(named=df_metric['StudentName'].notna()).melt(
+        id_vars=['Gender', 'named'], value_vars=cols_levels, var_name='metric', value_name='level')
+    df_long['metric'] = pd.Categorical(df_long['metric'].map(dict(zip(cols_levels, names))), categories=names)
+    df_long['level'] = pd.Categorical(df_long['level'], categories=achievement_levels, ordered=True)
+    return df_long
+
+
+def _counts_frame(counts, columns):
+    """Unstacks counts to levels x columns. Levels nobody reached stay empty
+    (NaN) like with the concatenated groupby counts it replaces, which also
+    left all the gender columns of a metric as float when one had a NaN."""
+    df = counts.unstack(columns)
+    df = df.loc[:, df.notna().any().values]
+    nan = df.isna().any()
+    if isinstance(df.columns, pd.MultiIndex):
+        nan = nan.groupby(level=0, observed=True).transform('any')
+    df = df.astype({c: 'int64' for c in df.columns[~nan.values]})
+    df.index.name = None
+    return df
+
+
+def level_summaries(df_metric, cols_levels, achievement_levels):
+    """Counts the students at each level of each column, in total and by gender.
+
+    Parameters
+    ----------
+    df_metric : DataFrame, required
+        The StudentName, Gender and levels columns of the students
+    cols_levels : List, required
+        The levels columns (e.g. ['A.6.2.1.3Level', etc.])
+    achievement_levels : List, required
+        The labels of the 4 levels
+
+    Returns
+    -------
+    df_summary : DataFrame
+        levels x metrics (e.g. A.6.2.1.3) number of students
+    df_summary_gender : DataFrame
+        levels x (metric, Gender) number of students
+    """
+    df_long = melt_levels(df_metric, cols_levels, achievement_levels)
+    # Like the StudentName count of the groupby per column it replaces, a level
+    # reached only by students without a name is there with 0 students
+    return summary_frames(df_long.groupby(['level', 'metric'], observed=True)['named'].sum(),
+                          df_long.groupby(['level', 'metric', 'Gender'], observed=True)['named'].sum(),
+                          list(df_long['metric'].cat.categories))
+
+
+def summary_frames(counts, counts_gender, names):
+    """Lays out the number of students of each (level, metric) and each
+    (level, metric, Gender) as the summary and summary by gender DataFrames
+    (e.g. the counts of level_summaries or of a exams.cube.ResultsCube slice).
+
+    Parameters
+    ----------
+    counts : Series, required
+        The number of students indexed by level and metric
+    counts_gender : Series, required
+        The number of students indexed by level, metric and Gender
+    names : List, required
+        The metrics in the order of the summary columns (e.g. ['A.6.2.1.3', etc.])
+
+    Returns
+    -------
+    df_summary : DataFrame
+        levels x metrics number of students
+    df_summary_gender : DataFrame
+        levels x (metric, Gender) number of students
+    """
+    df_summary = _counts_frame(counts, 'metric')
+    df_summary = df_summary.reindex(columns=[m for m in names if m in df_summary.columns])
+    df_summary.columns = pd.Index(list(df_summary.columns))
+
+    df_summary_gender = _counts_frame(counts_gender, ['metric', 'Gender']).sort_index(axis=1)
+    df_summary_gender.columns = pd.MultiIndex.from_tuples(list(df_summary_gender.columns), names=[None, 'Gender'])
+    return df_summary, df_summary_gender
+
+
+def weighted_level_summaries(df_metric, levels_percent, achievement_levels):
+    """Sums the fraction of the indicators of each metric at each level over
+    the students (i.e. weighted number of students), in total and by gender.
+
+    All the *_LxPercent columns are summed at once and grouped by gender in a
+    single groupby, the result is only reshaped to levels x metrics.
+
+    Parameters
+    ----------
+    df_metric : DataFrame, required
+        The Gender and levels percent columns of the students
+    levels_percent : Dict, required
+        The levels percent columns of each metric (e.g. 
+        {'A.3.2.1': ['A.3.2.1_L1Percent','A.3.2.1_L2Percent','A.3.2.1_L3Percent','A.3.2.1_L4Percent'], etc.})
+    achievement_levels : List, required
+        The labels of the 4 levels
+
+    Returns
+    -------
+    df_summary : DataFrame
+        levels x metrics (e.g. A.3.2.1) weighted number of students
+    df_summary_gender : DataFrame
+        levels x (metric, Gender) weighted number of students
+    """
+    metrics = list(levels_percent)
+    cols = [c for m in metrics for c in levels_percent[m]]
+    df_fractions = df_metric[cols]
+
+    df_summary = pd.DataFrame(df_fractions.sum().to_numpy().reshape(len(metrics), 4).T,
+                              index=achievement_levels, columns=metrics)
+
+    df_gender = df_fractions.groupby(df_metric['Gender']).sum()
+    fractions = df_gender.to_numpy().reshape(len(df_gender.index), len(metrics), 4)
+    df_summary_gender = pd.DataFrame(fractions.transpose(2, 1, 0).reshape(4, -1), index=achievement_levels,
+                                     columns=pd.MultiIndex.from_product([metrics, list(df_gender.index)],
+                                                                        names=[None, 'Gender']))
+    return df_summary, df_summary_gender
+
+
+def soe_level_counts(df_counts, hierarchy, level):
+    """Counts levels (NOT students) of benchmarks, standards or test like SOE does,
+    i.e. the number of students at each level of their indicators summed.
+
+    The indicators x levels counts are multiplied once by the sparse indicators
+    by benchmarks (or standards, test) matrix of the hierarchy. Any other column
+    level of df_counts (e.g. Gender, or school and gender) is kept and costs
+    nothing more since it is stacked into the rows of that same product.
+
+    Parameters
+    ----------
+    df_counts : DataFrame, required
+        Number of students at each level (rows) of each indicator (columns), e.g.
+        df_indicators_summary, or with MultiIndex columns (indicator, Gender, etc.)
+        e.g. df_indicators_summary_gender
+    hierarchy : ItemHierarchy, required
+        The hierarchy of the items of the test
+    level : String, required
+        One of benchmarks, standards or test
+
+    Returns
+    -------
+    DataFrame
+        Same rows and columns as df_counts with the indicators replaced by the
+        benchmarks (or standards, test). Like a sum of the indicator columns it is
+        float only where one of the indicators has a missing level.
+    """
+    extra = list(range(1, df_counts.columns.nlevels))
+    df = df_counts.stack(extra, future_stack=True) if extra else df_counts
+    df = df.reindex(columns=hierarchy.groups['indicators'])
+
+    incidence = hierarchy.indicator_incidence(level)
+    values = df.to_numpy(dtype=np.float64)
+    counts = (incidence.T @ np.nan_to_num(values).T).T
+    missing = (incidence.T @ np.isnan(values).any(axis=0)) > 0
+
+    df_level_counts = pd.DataFrame(counts, index=df.index, columns=hierarchy.groups[level])
+    df_level_counts = df_level_counts.astype({g: 'int64' for g in df_level_counts.columns[~missing]})
+    if extra:
+        df_level_counts = df_level_counts.unstack(extra)
+        df_level_counts.columns.names = df_counts.columns.names
+    return df_level_counts
+
+def prepare_for_chart(df, achievement_levels=None):
+    """Does some basic redundent preparation to a dataframe before plotting with matplotlib.
+    Essentially it does the following:
+     * Computes the percentage (e.g. 0.1, 0.9)
+     * Adds a Total row with 100 percent (i.e. 1)
+     * Rounds all values to 2 decimals
+     * Re-order the levels ready for plotting
+     * Assign negative values for levels to be on the bottom (or left) of the axis
+
+    All columns are done at once on the values so it works the same for any
+    columns (e.g. indicators, (indicator, Gender), (school, Gender)).
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The DataFrame to prep (levels x anything)
+    achievement_levels : List, optional
+        The labels of the 4 levels (defaults to the MISAT ones)
+
+    Returns
+    -------
+    DataFrame
+    """
+    if achievement_levels is None:
+        achievement_levels = get_achievement_levels('RMI')
+    values = df.to_numpy(dtype=np.float64)
+
+    # When level values don't add up to 1 it's because of rounding
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percents = values / np.nansum(values, axis=0)
+    percents = np.vstack([percents, np.nansum(percents, axis=0)]).round(2)
+
+    # Proficient, Advanced, Developing, Beginning, Total (levels that are not there are empty)
+    levels_index = [achievement_levels[2], achievement_levels[3], achievement_levels[1], achievement_levels[0], 'Total']
+    rows = {label: i for i, label in enumerate(list(df.index) + ['Total'])}
+    chart = np.full((len(levels_index), percents.shape[1]), np.nan)
+    for i, label in enumerate(levels_index):
+        if label in rows:
+            chart[i] = percents[rows[label]]
+    chart[2:4] = -chart[2:4]
+    return pd.DataFrame(chart, index=levels_index, columns=df.columns)
+
+
+def add_total_in_column_names(df):
+    """Adds a string of the form (n=X) in the columns showing the total.
+
+    With MultiIndex columns (e.g. (indicator, Gender)) it goes in the last level
+    (e.g. ('A.6.2.1.3', 'F (n=150)')). The totals are numbers of students and
+    shown as such (e.g. n=150 for a float total of 149.99999999999997).
+
+    Parameters
+    ----------
+    df : DataFrame, required
+        The DataFrame to prep
+
+    Returns
+    -------
+    DataFrame
+    """
+    totals = np.round(np.nansum(df.to_numpy(dtype=np.float64), axis=0), 6)
+    whole = totals == np.round(totals)
+    n = np.where(whole, np.round(totals).astype(np.int64).astype(str), totals.astype(str))
+    suffix = pd.Index(np.char.add(np.char.add(' (n=', n), ')'), dtype=object)
+
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        arrays = [df.columns.get_level_values(i) for i in range(df.columns.nlevels)]
+        arrays[-1] = arrays[-1].astype(str) + suffix
+        df.columns = pd.MultiIndex.from_arrays(arrays, names=df.columns.names)
+    else:
+        df.columns = df.columns.astype(str) + suffix
+    return df
+
+
+class RubricSummary(Mapping):
+    """The summary of a metric and its variants, each computed when first
+    accessed and then kept. Plotting or exporting one variant does not build
+    the others.
+
+    It is a read only dict of DataFrames with the keys
+        * 'df_'+metric+'_summary'
+        * 'df_'+metric+'_summary_gender'
+        * 'df_'+metric+'_summary_x'
+        * 'df_'+metric+'_summary_gender_x'
+        * 'df_'+metric+'_summary_tot'
+        * 'df_'+metric+'_summary_gender_tot'
+        * 'df_'+metric+'_summary_per'
+        * 'df_'+metric+'_summary_gender_per'
+        * 'df_'+metric+'_summary_per_x'
+        * 'df_'+metric+'_summary_gender_per_x'
+    (without the gender ones when there is no gender summary)
+
+    Parameters
+    ----------
+    metric : String, required
+        A label identifying the metric (e.g. indicators, benchmarksalt, standardsweighted)
+    counts : Callable, required
+        Function returning the summary and the summary by gender (or None),
+        e.g. lambda: level_summaries(df_indicators, cols_indicators_levels, achievement_levels)
+    descriptions : Dict, required
+        The descriptions of the metric used in the extended (_x) versions
+    gender : Boolean, optional
+        Whether the summary has a gender version
+    achievement_levels : List, optional
+        The labels of the 4 levels for the percents ready for charts (see prepare_for_chart)
+    """
+    VARIANTS = ['summary', 'summary_gender', 'summary_x', 'summary_gender_x', 'summary_tot',
+                'summary_gender_tot', 'summary_per', 'summary_gender_per', 'summary_per_x', 'summary_gender_per_x']
+
+    def __init__(self, metric, counts, descriptions, gender=True, achievement_levels=None):
+        self.metric = metric
+        self.descriptions = descriptions
+        self.achievement_levels = achievement_levels
+        self._counts = counts
+        self._variants = [v for v in self.VARIANTS if gender or 'gender' not in v]
+        self._dfs = {}
+
+    def _key(self, variant):
+        return 'df_'+self.metric+'_'+variant
+
+    def __getitem__(self, key):
+        variant = key[len(self._key('')):] if key.startswith(self._key('')) else None
+        if variant not in self._variants:
+            raise KeyError(key)
+        if variant not in self._dfs:
+            self._dfs[variant] = getattr(self, '_'+variant)()
+        return self._dfs[variant]
+
+    def __iter__(self):
+        return (self._key(v) for v in self._variants)
+
+    def __len__(self):
+        return len(self._variants)
+
+    def _summary(self):
+        df_summary, df_summary_gender = self._counts()
+        self._dfs['summary_gender'] = df_summary_gender
+        return df_summary
+
+    def _summary_gender(self):
+        self._dfs['summary'], df_summary_gender = self._counts()
+        return df_summary_gender
+
+    def _summary_x(self):
+        return self[self._key('summary')].rename(columns = self.descriptions)
+
+    def _summary_gender_x(self):
+        return self[self._key('summary_gender')].rename(columns = self.descriptions)
+
+    def _summary_tot(self):
+        df_summary_tot = self[self._key('summary')].copy()
+        df_summary_tot.loc['Total'] = df_summary_tot.sum()
+        return df_summary_tot
+
+    def _summary_gender_tot(self):
+        df_summary_gender_tot = self[self._key('summary_gender')].copy()
+        df_summary_gender_tot.loc['Total'] = df_summary_gender_tot.sum()
+        return df_summary_gender_tot
+
+    def _chart(self, df):
+        return prepare_for_chart(add_total_in_column_names(df), self.achievement_levels)
+
+    def _summary_per(self):
+        return self._chart(self[self._key('summary')])
+
+    def _summary_gender_per(self):
+        return self._chart(self[self._key('summary_gender')])
+
+    def _summary_per_x(self):
+        return self._chart(self[self._key('summary_x')])
+
+    def _summary_gender_per_x(self):
+        return self._chart(self[self._key('summary_gender_x')])
+
+
+class RubricSummaries(Mapping):
+    """The summaries of several metrics together as one read only dict (e.g.
+    students_each_rubric_level['df_indicators_summary_per']). Adding a
+    summary does not compute any of its variants."""
+
+    def __init__(self, summaries=()):
+        self._summaries = {}
+        for summary in summaries:
+            self.update(summary)
+
+    def update(self, summary):
+        """Adds the variants of a RubricSummary"""
+        for key in summary:
+            self._summaries[key] = summary
+
+    def __getitem__(self, key):
+        return self._summaries[key][key]
+
+    def __iter__(self):
+        return iter(self._summaries)
+
+    def __len__(self):
+        return len(self._summaries)
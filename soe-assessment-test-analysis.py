@@ -19,7 +19,6 @@
 ###############################################################################
 # Core stuff
 import os
-from pathlib import Path
 import re
 import json
 
@@ -30,6 +29,8 @@
 import pandas as pd # Data analysis
 import numpy as np
 import math
+from exams.loader import load_excel_to_df
+from exams.scoring import parse_answer_key, score_matrix
 
 # Pretty printing stuff
 from IPython.display import display, HTML
@@ -52,37 +53,6 @@
 
 
 # %%
-def load_excel_to_df(filename):
-    """Loads an Excel filename to a Pandas DataFrame.
-
-    Parameters
-    ----------
-    filename : str, required
-        The filename of the excel file to load
-
-    Raises
-    ------
-    NotImplementedError
-        Could raise unknown error. Implement if it happens
-    
-    Returns
-    -------
-    DataFrame
-    """
-    file_path = Path(filename)
-    file_extension = file_path.suffix.lower()[1:]
-
-    if file_extension == 'xlsx':
-        df_student_results = pd.read_excel(filename, index_col=None, header=0, engine='openpyxl')
-    elif file_extension == 'xls':
-        df_student_results = pd.read_excel(filename, index_col=None, header=0)
-    elif file_extension == 'csv':
-        df_student_results = pd.read_csv(filename, index_col=None, header=0)
-    else:
-        raise Exception("File not supported")
-
-    return df_student_results
-
 def save(df, filename, as_string):
     # Generate the output file path with -anonymized added
     file_root, file_ext = os.path.splitext(filename)
@@ -148,7 +118,8 @@ def extract_item_info(column_name):
     if match:
         item_number = match.group(1)
         item_details = match.group(2)
-        correct_answer = match.group(3)[0]
+        # Same answer key as the scoring below (see exams.scoring.parse_answer_key)
+        correct_answer = parse_answer_key([column_name])[0]
         return item_number, item_details, correct_answer
     return None, None, None
 
@@ -178,21 +149,16 @@ def extract_item_info(column_name):
 # Display the item information DataFrame
 display(item_info_df)
 
-
 # %%
-# Function to check if the student's answer is correct
-def is_correct_answer(student_answer, correct_answer):
-    return 1 if str(student_answer).strip().upper() == correct_answer else 0
-
 # Initialize a DataFrame to store the results
 df_results = df_student_results.copy()
 
-# Calculate the score for each item
-for column in df_student_results.columns:
-    if column.startswith('ITEM_'):
-        item_number, item_detail, correct_answer = extract_item_info(column)
-        if correct_answer:
-            df_results[f'{column}_CORRECT'] = df_student_results[column].apply(is_correct_answer, correct_answer=correct_answer)
+# Calculate the score for each item. All items with a known correct answer are scored
+# at once against the answer key parsed from their headers (see exams.scoring)
+cols_items = [c for c in df_student_results.columns if c.startswith('ITEM_') and extract_item_info(c)[2]]
+df_scores = pd.DataFrame(score_matrix(df_student_results, cols_items, strip=True),
+                         index=df_student_results.index, columns=[f'{c}_CORRECT' for c in cols_items])
+df_results = pd.concat([df_results, df_scores], axis=1)
 
 # Calculate the total score for each student
 df_results['TOTAL_SCORE'] = df_results.filter(like='_CORRECT').sum(axis=1)
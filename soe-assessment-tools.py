@@ -19,6 +19,7 @@
 # Current list of tools:                                                      #
 #  * List indicators with less then 4 items (or not multiple of 4 items)      #
 #  * Bin tool (show equal width bins vs custom SOE bins)                      #
+#  * Level cut-points lookup table                                            #
 ###############################################################################
 # Core stuff
 import os
@@ -29,6 +30,8 @@
 # Data stuff
 import pandas as pd # Data analysis
 import numpy as np
+from exams.loader import load_excel_to_df, load_excel_files
+from exams.levels import get_cut_points, get_achievement_levels
 
 # Pretty printing stuff
 from IPython.display import display, HTML
@@ -42,47 +45,11 @@
 test = config['test']
 country = config['country']
 cwd = os.getcwd()
+processes = config.get('processes') # None means use all cores
+cache_path = config.get('cache_path') # None disables the parsed workbooks cache
 
-if country == 'FSM':
-    achievement_levels = ['well below competent', 'approaching competent', 'minimally competent', 'competent'] # NMCT
-elif country == 'RMI':
-    achievement_levels = ['Beginning', 'Developing', 'Proficient', 'Advanced'] # MISAT
-else:
-    achievement_levels = ['Level 1', 'Level 2', 'Level 3', 'Level 4'] # Default
-
-
-# %%
-def load_excel_to_df(filename):
-    """Loads an Excel filename to a Pandas DataFrame.
-
-    Parameters
-    ----------
-    filename : str, required
-        The filename of the excel file to load
-
-    Raises
-    ------
-    NotImplementedError
-        Could raise unknown error. Implement if it happens
-    
-    Returns
-    -------
-    DataFrame
-    """
-    file_path = Path(filename)
-    file_extension = file_path.suffix.lower()[1:]
-
-    if file_extension == 'xlsx':
-        df = pd.read_excel(filename, index_col=None, header=0, engine='openpyxl')
-    elif file_extension == 'xls':
-        df = pd.read_excel(filename, index_col=None, header=0)
-    elif file_extension == 'csv':
-        df = pd.read_csv(filename, index_col=None, header=0)
-    else:
-        raise Exception("File not supported")
-
-    return df
-
+# e.g. ['Beginning', 'Developing', 'Proficient', 'Advanced'] for MISAT
+achievement_levels = get_achievement_levels(country)
 
 # %%
 ###############################################################################
@@ -109,23 +76,18 @@ def load_excel_to_df(filename):
 ###############################################################################
 
 # Load all SOE Assessment workbook inside a directory
-# (~50 seconds on iMac with i9 CPU and 32GB RAM)
+# (~50 seconds on iMac with i9 CPU and 32GB RAM when loaded one at a time,
+# the workbooks are now parsed in parallel by a pool of processes)
 cwd = os.getcwd()
 path = os.path.join(cwd, 'data/'+country+'/'+test+'/')
 
-df_student_results_list = []
+df_student_results_dict, load_errors = load_excel_files(path, processes=processes, cache_path=cache_path)
+df_student_results_list = list(df_student_results_dict.values())
 
-for root, directories, files in os.walk(path, topdown=False):
-    for name in files:
-        filename = os.path.join(root, name)
-        print('Loading into DataFrame:', filename)
-        try:
-            df_student_results_list.append(load_excel_to_df(filename))
-        except:
-            print('Problem loading:', filename)
-            #print('Error was:', )            
+for filename, error in load_errors.items():
+    print('Problem loading: {} ({})'.format(filename, error))
 
-print('Completed loading excel files')
+print('Completed loading {} excel files ({} problems)'.format(len(df_student_results_list), len(load_errors)))
 
 # %%
 # %%time
@@ -386,3 +348,10 @@ def compile_items(item, test='N/A', year='N/A'):
 print()
 
 # %%
+# The level lookup table actually used by soe-assessment (see exams.levels)
+# Minimum number of correct items to achieve each level for every total number of items
+df_cut_points = pd.DataFrame([(0,) + get_cut_points(n) for n in range(1, 61)],
+                             index=pd.RangeIndex(1, 61, name='Items'), columns=achievement_levels)
+display(df_cut_points)
+
+# %%
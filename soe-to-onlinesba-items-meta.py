@@ -31,6 +31,7 @@
 
 # Data stuff
 import pandas as pd # Data analysis
+from exams.loader import load_excel_to_df, load_excel_files
 
 # Pretty printing stuff
 from tqdm.notebook import trange, tqdm
@@ -43,40 +44,8 @@
 cwd = os.getcwd()
 
 year_to_load = config['load_year']
-
-
-# %%
-def load_excel_to_df(filename):
-    """Loads an Excel filename to a Pandas DataFrame.
-
-    Parameters
-    ----------
-    filename : str, required
-        The filename of the excel file to load
-
-    Raises
-    ------
-    NotImplementedError
-        Could raise unknown error. Implement if it happens
-    
-    Returns
-    -------
-    DataFrame
-    """
-    file_path = Path(filename)
-    file_extension = file_path.suffix.lower()[1:]
-
-    if file_extension == 'xlsx':
-        df_student_results = pd.read_excel(filename, index_col=None, header=0, engine='openpyxl')
-    elif file_extension == 'xls':
-        df_student_results = pd.read_excel(filename, index_col=None, header=0)
-    elif file_extension == 'csv':
-        df_student_results = pd.read_csv(filename, index_col=None, header=0)
-    else:
-        raise Exception("File not supported")
-
-    return df_student_results
-
+processes = config.get('processes') # None means use all cores
+cache_path = config.get('cache_path') # None disables the parsed workbooks cache
 
 # %%
 # Load a single SOE Assessment workbook (for testing,)
@@ -98,26 +67,20 @@ def load_excel_to_df(filename):
 # %%
 # %%time
 # Load all SOE Assessment workbook inside a directory
-# (~50 seconds on iMac with i9 CPU and 32GB RAM)
+# (~50 seconds on iMac with i9 CPU and 32GB RAM when loaded one at a time,
+# the workbooks are now parsed in parallel by a pool of processes)
 path = os.path.join(local_path, country+'/'+test+'/')
 
 if year_to_load != 'all':
     path = os.path.join(path, year_to_load)
     
-df_student_results_list = []
-
-for root, directories, files in os.walk(path, topdown=False):
-    for name in files:
-        filename = os.path.join(root, name)
-        print('Loading into DataFrame:', filename)
-        try:
-            df_student_results_list.append(load_excel_to_df(filename))
-            #df_student_results_list[name] = load_excel_to_df(filename)
-        except:
-            print('Problem loading:', filename)
-            #print('Error was:', )            
-
-print('Completed loading excel files')
+df_student_results_dict, load_errors = load_excel_files(path, processes=processes, cache_path=cache_path)
+df_student_results_list = list(df_student_results_dict.values())
+
+for filename, error in load_errors.items():
+    print('Problem loading: {} ({})'.format(filename, error))
+
+print('Completed loading {} excel files ({} problems)'.format(len(df_student_results_list), len(load_errors)))
 
 # %%
 l = 'Item_002_AS0302010102m_aaa'
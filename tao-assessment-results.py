@@ -22,6 +22,7 @@
 import json
 from pathlib import Path
 import openpyxl
+from exams.loader import load_excel_to_df
 
 # Configuration (initial setup)
 with open('config.json', 'r') as file:
@@ -41,37 +42,6 @@
 
 
 # %%
-def load_excel_to_df(filename):
-    """Loads an Excel filename to a Pandas DataFrame.
-
-    Parameters
-    ----------
-    filename : str, required
-        The filename of the excel file to load
-
-    Raises
-    ------
-    NotImplementedError
-        Could raise unknown error. Implement if it happens
-    
-    Returns
-    -------
-    DataFrame
-    """
-    file_path = Path(filename)
-    file_extension = file_path.suffix.lower()[1:]
-
-    if file_extension == 'xlsx':
-        df = pd.read_excel(filename, index_col=None, header=0, engine='openpyxl')
-    elif file_extension == 'xls':
-        df = pd.read_excel(filename, index_col=None, header=0)
-    elif file_extension == 'csv':
-        df = pd.read_csv(filename, index_col=None, header=0)
-    else:
-        raise Exception("File not supported")
-
-    return df
-
 def save_df_to_file(df, filename):
     """Saves an Pandas DataFrame to a file handling the file type.
 
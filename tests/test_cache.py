@@ -0,0 +1,59 @@
+"""Parsed workbooks cache and content fingerprints."""
+import os
+
+import pandas as pd
+
+from exams import cache
+from exams.cache import WorkbookCache, atomic_write, fingerprint_files, hash_file
+
+
+def test_fingerprint_index_reuse(tmp_path, monkeypatch):
+    (tmp_path / 'A03.csv').write_text('StudentName\nJane Doe\n')
+    filenames = {'A03.csv': str(tmp_path / 'A03.csv')}
+    cache_path = str(tmp_path / 'cache')
+    fingerprints = fingerprint_files(filenames, cache_path)
+    assert fingerprints == {'A03.csv': hash_file(filenames['A03.csv'])}
+    assert fingerprints == fingerprint_files(filenames)
+
+    hashed = []
+    monkeypatch.setattr(cache, 'hash_file', lambda filename: hashed.append(filename) or 'rehashed')
+    # An unchanged workbook is not read again
+    assert fingerprint_files(filenames, cache_path) == fingerprints
+    assert hashed == []
+    # A modified one is
+    (tmp_path / 'A03.csv').write_text('StudentName\nJohn Roe and more\n')
+    assert fingerprint_files(filenames, cache_path) == {'A03.csv': 'rehashed'}
+    assert hashed == [os.path.abspath(filenames['A03.csv'])]
+
+
+def test_workbook_cache_roundtrip(tmp_path):
+    workbook_cache = WorkbookCache(str(tmp_path))
+    assert workbook_cache.get('sha1') is None
+    # SchoolID mixing numbers and strings is JSON encoded in the parquet file
+    df = pd.DataFrame({'StudentName': ['Jane Doe', 'John Roe'], 'SchoolID': [101, 'AIL101']})
+    workbook_cache.put('sha1', df)
+    assert os.path.exists(workbook_cache._entry('sha1', 'parquet'))
+    pd.testing.assert_frame_equal(workbook_cache.get('sha1'), df)
+
+
+def test_workbook_cache_pickle_fallback(tmp_path):
+    workbook_cache = WorkbookCache(str(tmp_path))
+    # Parquet requires string column names
+    df = pd.DataFrame({1: ['Jane Doe'], (2, 'Item'): ['A']})
+    workbook_cache.put('sha1', df)
+    assert not os.path.exists(workbook_cache._entry('sha1', 'parquet'))
+    assert os.path.exists(workbook_cache._entry('sha1', 'pkl'))
+    pd.testing.assert_frame_equal(workbook_cache.get('sha1'), df)
+
+
+def test_atomic_write_failure_leaves_nothing(tmp_path):
+    filename = str(tmp_path / 'index.json')
+    def write(f):
+        with open(f, 'w') as file:
+            file.write('half')
+        raise OSError('disk full')
+    try:
+        atomic_write(filename, write)
+    except OSError:
+        pass
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,73 @@
+"""Chart jobs, their cache keys and the batch rendering."""
+import os
+
+import matplotlib
+import pandas as pd
+import pytest
+
+from exams import charts
+from exams.charts import ChartCache, chart_jobs, chart_key, render_charts
+from exams.summary import RubricSummaries, RubricSummary
+
+LEVELS = ['Beginning', 'Developing', 'Proficient', 'Advanced']
+
+
+def summaries():
+    def counts():
+        df_summary = pd.DataFrame({'A.6.2.1': [2, 3, 4, 1], 'A.6.2.2': [1, 1, 5, 3]}, index=LEVELS)
+        df_summary_gender = pd.concat({'F': df_summary, 'M': df_summary}, axis=1).swaplevel(axis=1)
+        return df_summary, df_summary_gender
+    return RubricSummaries([RubricSummary('benchmarks', counts, {'A.6.2.1': 'Add', 'A.6.2.2': 'Count'},
+                                          achievement_levels=LEVELS)])
+
+
+def test_chart_jobs():
+    jobs = chart_jobs('MISAT Grade 6 Math', summaries())
+    assert [(job['name'], job['style']) for job in jobs] == [
+        ('MISAT Grade 6 Math-df_benchmarks_summary_per', 'soe'),
+        ('MISAT Grade 6 Math-df_benchmarks_summary_per_x', 'emis')]
+    assert jobs[0]['label'] == 'Benchmarks'
+    assert (jobs[0]['dimension'], jobs[0]['title']) == ('Student', 'Level Percentage Method')
+    assert list(jobs[1]['df'].index) == ['Add (n=10)', 'Count (n=10)']
+    assert chart_jobs('MISAT Grade 6 Math', summaries(), variant='soe')[0]['name'] == \
+        'MISAT Grade 6 Math-soe-df_benchmarks_summary_per'
+
+
+def test_chart_key(monkeypatch):
+    job = chart_jobs('MISAT Grade 6 Math', summaries())[0]
+    key = chart_key(job)
+    assert key == chart_key(dict(job, df=job['df'].copy()))
+    assert key != chart_key(dict(job, title='Item Count Method'))
+    assert key != chart_key(dict(job, df=job['df'] * 2))
+    # The figure and rendering settings are part of the key
+    monkeypatch.setitem(charts.FIGSIZES, 'soe', (10, 4))
+    assert key != chart_key(job)
+    monkeypatch.setitem(charts.FIGSIZES, 'soe', (8, 4))
+    monkeypatch.setitem(matplotlib.rcParams, 'savefig.dpi', 300)
+    assert key != chart_key(job)
+
+
+def test_render_charts_with_cache(tmp_path, monkeypatch):
+    jobs = chart_jobs('MISAT Grade 6 Math', summaries())
+    cache_path = str(tmp_path / 'cache')
+    outputs, errors = render_charts(jobs, str(tmp_path / 'charts'), formats=['png'], processes=1, cache_path=cache_path)
+    assert errors == {}
+    assert all(os.path.exists(filenames[0]) for filenames in outputs.values())
+    assert len(os.listdir(cache_path)) == len(jobs)
+
+    # Cached charts are copied, not rendered again
+    monkeypatch.setattr(charts, '_render_job', lambda *args: pytest.fail('rendered again'))
+    assert render_charts(jobs, str(tmp_path / 'copies'), formats=['png'], processes=1, cache_path=cache_path) == (
+        {name: [str(tmp_path / 'copies' / (name + '.png'))] for name in outputs}, {})
+
+
+def test_render_charts_cache_failure_is_a_warning(tmp_path, monkeypatch):
+    def put(self, key, filename_root, formats):
+        raise OSError('disk full')
+    monkeypatch.setattr(ChartCache, 'put', put)
+    jobs = chart_jobs('MISAT Grade 6 Math', summaries())
+    with pytest.warns(UserWarning, match='Could not cache chart'):
+        outputs, errors = render_charts(jobs, str(tmp_path / 'charts'), formats=['png'], processes=1,
+                                        cache_path=str(tmp_path / 'cache'))
+    assert errors == {}
+    assert sorted(outputs) == sorted(job['name'] for job in jobs)
@@ -0,0 +1,43 @@
+"""Writing the assessment workbook sheets to Excel and side files."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from exams.export import side_output_filename, write_excel_sheets, write_side_outputs
+
+
+def sheets():
+    return {
+        'Responses': pd.DataFrame({'StudentName': ['Jane Doe', 'John Roe', 'Kim Lee'],
+                                   'SchoolID': [101, 'AIL101', np.nan]}),
+        'Scores': pd.DataFrame({'Item_001': [1, 0, 1], 'TotalScore': [1.5, np.nan, 3.0]}),
+    }
+
+
+@pytest.mark.parametrize('streaming', [True, False])
+def test_write_excel_sheets(tmp_path, streaming):
+    filename = str(tmp_path / 'workbook.xlsx')
+    write_excel_sheets(filename, sheets(), streaming=streaming)
+    dfs = pd.read_excel(filename, sheet_name=None)
+    assert list(dfs) == ['Responses', 'Scores']
+    for sheet_name, df in sheets().items():
+        pd.testing.assert_frame_equal(dfs[sheet_name], df, check_dtype=False)
+    # Nothing left behind by the atomic write
+    assert [p.name for p in tmp_path.iterdir()] == ['workbook.xlsx']
+
+
+def test_write_side_outputs(tmp_path):
+    filename = str(tmp_path / 'workbook.xlsx')
+    filenames = write_side_outputs(filename, sheets(), ['parquet', 'csv'])
+    assert filenames == [side_output_filename(filename, s, e) for s in ['Responses', 'Scores'] for e in ['parquet', 'csv']]
+    assert filenames[0] == str(tmp_path / 'workbook-Responses.parquet')
+
+    # Mixed columns are written as strings, missing values stay missing
+    df = pd.read_parquet(filenames[0])
+    assert df['SchoolID'].tolist()[:2] == ['101', 'AIL101']
+    assert df['SchoolID'].isna().tolist() == [False, False, True]
+    pd.testing.assert_frame_equal(pd.read_parquet(filenames[2]), sheets()['Scores'])
+    pd.testing.assert_frame_equal(pd.read_csv(filenames[3]), sheets()['Scores'])
+
+    with pytest.raises(ValueError):
+        write_side_outputs(filename, sheets(), ['json'])
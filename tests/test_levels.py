@@ -0,0 +1,45 @@
+"""Achievement levels from the precomputed cut-point table."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from exams.levels import assign_levels, get_bins, get_cut_points, weighted_levels
+
+
+def test_cut_points():
+    assert get_cut_points(4) == (2, 3, 4)
+    assert get_cut_points(8) == (3, 5, 7)
+    assert get_cut_points(40) == (11, 21, 31)
+    # SOE bins of the totals that are not a multiple of 4
+    assert get_cut_points(1) == (0, 1, 1)
+    assert get_cut_points(3) == (1, 2, 3)
+    assert get_cut_points(5) == (2, 4, 5)
+
+
+@pytest.mark.parametrize('total', range(1, 61))
+def test_assign_levels_same_as_pd_cut(total):
+    # The former per column pd.cut over the bins of the whole 0..total range
+    correct = np.arange(total + 1)
+    expected = pd.cut(correct, get_bins(total), labels=False, include_lowest=True)
+    assert assign_levels(correct[:, None], np.full((total + 1, 1), total))[:, 0].tolist() == list(expected)
+
+
+def test_assign_levels_does_not_depend_on_observed_scores():
+    # With 7 items and only 2 or 3 correct observed, the former bins=4 fallback
+    # cut the observed range 2..3 and gave 2 correct Beginning and 3 Advanced
+    levels = assign_levels([[2], [3]], [[7], [7]])
+    assert levels[:, 0].tolist() == [1, 1]
+
+
+def test_assign_levels_mixed_totals():
+    levels = assign_levels([[0, 3], [4, 1], [2, 12]], [[4, 3], [4, 3], [4, 12]])
+    assert levels.tolist() == [[0, 3], [3, 1], [1, 3]]
+
+
+def test_weighted_levels_tie_break():
+    # Half of the indicators at level 2 and half at level 3
+    percents = np.array([[[0, .5, .5, 0]]])
+    assert weighted_levels(percents, 'best').tolist() == [[2]]
+    assert weighted_levels(percents, 'worst').tolist() == [[1]]
+    with pytest.raises(ValueError):
+        weighted_levels(percents, 'middle')
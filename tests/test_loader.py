@@ -0,0 +1,41 @@
+"""Loading of the workbooks with the parsed workbooks cache."""
+import pandas as pd
+import pytest
+
+from exams.loader import _load_one, load_excel_files
+
+
+def write_workbook(path, name='AllSchools_A03_2018-19_Results.csv'):
+    df = pd.DataFrame({'StudentName': ['Jane Doe', 'John Roe'], 'Item_001_AS0602010401E_ddd': ['D', 'A']})
+    df.to_csv(path / name, index=False)
+    return df
+
+
+def test_load_one_unsupported_file(tmp_path):
+    (tmp_path / 'notes.txt').write_text('notes')
+    df, error = _load_one(str(tmp_path / 'notes.txt'))
+    assert df is None
+    assert error == 'Exception: File not supported'
+
+
+def test_load_one_cache_failure_is_a_warning(tmp_path):
+    expected = write_workbook(tmp_path)
+    # The cache directory cannot be created where a file already is
+    (tmp_path / 'cache').write_text('not a directory')
+    with pytest.warns(UserWarning, match='Could not cache'):
+        df, error = _load_one(str(tmp_path / 'AllSchools_A03_2018-19_Results.csv'),
+                              str(tmp_path / 'cache'), 'fingerprint')
+    assert error is None
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_load_excel_files_with_cache(tmp_path):
+    source = tmp_path / 'MISAT'
+    source.mkdir()
+    expected = write_workbook(source)
+    (source / 'notes.txt').write_text('notes')
+    cache_path = str(tmp_path / 'cache')
+    for _ in range(2):
+        dfs, errors = load_excel_files(str(source), processes=1, cache_path=cache_path)
+        pd.testing.assert_frame_equal(dfs['AllSchools_A03_2018-19_Results.csv'], expected)
+        assert list(errors.values()) == ['Exception: File not supported']
@@ -0,0 +1,90 @@
+"""Incremental mode manifest and the writing of the load files it records."""
+import pandas as pd
+
+from exams.manifest import Manifest
+from exams.onlinesba import settings_fingerprint, write_onlinesba_files
+
+
+def emis():
+    df_schools = pd.DataFrame({'schNo': ['MAJ101', 'AIL101'], 'schName': ['Majuro Elementary', 'Ailinglaplap']})
+    df_student_enrol = pd.DataFrame({'stuCardID': ['S1'], 'Student': ['Jane Doe'], 'stuGender': ['F'],
+                                     'stuDoB': ['2008-01-01'], 'schNo': ['MAJ101'], 'stueYear': [2019]})
+    return df_schools, df_student_enrol
+
+
+def load_file(testid='A03'):
+    return pd.DataFrame({'SCHOOLYEAR': ['18-19'], 'TESTID': [testid], 'STUDENTID': ['S1']})
+
+
+def test_settings_fingerprint_changes():
+    config = {'export': 'csv', 'school_alias_fuzzy_cutoff': None}
+    df_schools, df_student_enrol = emis()
+    lookup = {'Majuro Elementary': 'MAJ101'}
+    settings = settings_fingerprint(config, df_schools, df_student_enrol, lookup)
+    assert settings == settings_fingerprint(dict(config), df_schools.copy(), df_student_enrol, dict(lookup))
+    assert settings != settings_fingerprint(dict(config, export='xlsx'), df_schools, df_student_enrol, lookup)
+    assert settings != settings_fingerprint(config, df_schools, df_student_enrol, dict(lookup, Ailinglaplap='AIL101'))
+    df_schools.loc[1, 'schNo'] = 'AIL102'
+    assert settings != settings_fingerprint(config, df_schools, df_student_enrol, lookup)
+
+
+def test_manifest_staleness(tmp_path):
+    output = tmp_path / '18-19-A03.csv'
+    output.write_text('load file')
+    manifest = Manifest(str(tmp_path / 'manifest.json'))
+    assert manifest.is_stale('A03.xls', 'sha1', 'settings')
+    manifest.record('A03.xls', 'sha1', 'settings', [str(output)])
+    manifest.save()
+
+    manifest = Manifest(str(tmp_path / 'manifest.json'))
+    assert not manifest.is_stale('A03.xls', 'sha1', 'settings')
+    assert manifest.is_stale('A03.xls', 'sha1-modified', 'settings')
+    assert manifest.is_stale('A03.xls', 'sha1', 'other settings')
+    output.unlink()
+    assert manifest.is_stale('A03.xls', 'sha1', 'settings')
+
+
+def test_manifest_older_version_is_ignored(tmp_path):
+    (tmp_path / 'manifest.json').write_text('{"version": 1, "entries": {"A03.xls": {}}}')
+    manifest = Manifest(str(tmp_path / 'manifest.json'))
+    assert manifest.entries == {}
+    assert manifest.outputs == {}
+
+
+def test_manifest_shared_output_is_invalidated(tmp_path):
+    output = str(tmp_path / '18-19-A03.csv')
+    (tmp_path / '18-19-A03.csv').write_text('load file')
+    (tmp_path / '18-19-A04.csv').write_text('load file')
+    manifest = Manifest(str(tmp_path / 'manifest.json'))
+    manifest.record('A03.xls', 'sha1', 'settings', [output])
+    manifest.record('A03 copy.xls', 'sha1-copy', 'settings', [output])
+    manifest.record('A04.xls', 'sha1-A04', 'settings', [str(tmp_path / '18-19-A04.csv')])
+    sources = {'A03.xls': 'sha1', 'A03 copy.xls': 'sha1-copy', 'A04.xls': 'sha1-A04'}
+    assert manifest.stale(sources, 'settings') == []
+    # A modified source invalidates the other source of its load file
+    assert manifest.stale(dict(sources, **{'A03 copy.xls': 'sha1-modified'}), 'settings') == ['A03.xls', 'A03 copy.xls']
+    assert manifest.claims(['A03.xls', 'A04.xls']) == {output: ['A03.xls'],
+                                                        str(tmp_path / '18-19-A04.csv'): ['A04.xls']}
+
+    # A source giving another load file no longer claims the old one
+    manifest.record('A03 copy.xls', 'sha1-copy', 'settings', [str(tmp_path / '18-19-A05.csv')])
+    assert manifest.outputs[output] == {'A03.xls': 'sha1'}
+
+
+def test_write_onlinesba_files_collisions(tmp_path):
+    dfs = {'AllSchools_A03_2018-19_Results.xls': load_file(),
+           'AllSchools_A03_2018-19_Results1.xls': load_file(),
+           'AllSchools_A04_2018-19_Results.xls': load_file('A04')}
+    outputs, errors = write_onlinesba_files(dfs, str(tmp_path), 'RMI', 'csv', processes=1)
+    a04 = str(tmp_path / 'RMI/onlinesba-load-files-csv/18-19-A04.csv')
+    assert outputs == {'AllSchools_A04_2018-19_Results.xls': a04}
+    assert sorted(errors) == ['AllSchools_A03_2018-19_Results.xls', 'AllSchools_A03_2018-19_Results1.xls']
+    assert errors['AllSchools_A03_2018-19_Results.xls'].endswith('also produced by AllSchools_A03_2018-19_Results1.xls')
+    assert not (tmp_path / 'RMI/onlinesba-load-files-csv/18-19-A03.csv').exists()
+
+    # A load file of a source not reprocessed this time is also a collision
+    outputs, errors = write_onlinesba_files({'AllSchools_A04_2018-19_Results1.xls': load_file('A04')},
+                                            str(tmp_path), 'RMI', 'csv', processes=1,
+                                            claims={a04: ['AllSchools_A04_2018-19_Results.xls']})
+    assert outputs == {}
+    assert list(errors) == ['AllSchools_A04_2018-19_Results1.xls']
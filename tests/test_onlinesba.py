@@ -0,0 +1,136 @@
+"""Stages of the conversion of SOE workbooks into OnlineSBA load files."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from exams.onlinesba import EnrolmentIndex, merge_exams_data_with_student_enrol_df, normalize_answers, clean_items
+
+
+def student_enrol():
+    return pd.DataFrame({
+        'stuCardID': ['S1', 'S2', 'S3', 'S4', 'S2'],
+        'Student': ['Jane Doe', 'John Roe ', 'Kim Lee', 'Kim Lee', 'John Roe '],
+        'schNo': ['MAJ101', 'MAJ102', 'MAJ101', 'AIL101', 'MAJ102'],
+        'stueYear': [2019, 2019, 2019, 2019, 2019],
+    })
+
+
+def student_results():
+    return pd.DataFrame({
+        'StudentName': [' JANE doe', 'Nobody', 'john roe', 'Kim Lee'],
+        'SchoolYear': ['2018-19'] * 4,
+        'SchoolID': ['MAJ101', 'MAJ101', 'MAJ102', 'AIL101'],
+    })
+
+
+def test_enrolment_index():
+    index = EnrolmentIndex(student_enrol())
+    # The exact duplicate enrolment is dropped and Kim Lee is ambiguous
+    assert sorted(index.df_nonambiguous['Student2']) == ['jane doe', 'john roe']
+    assert sorted(index.df_ambiguous['stuCardID']) == ['S3', 'S4']
+    assert len(index) == 4
+
+
+def test_merge_joins_unique_names_only():
+    df = merge_exams_data_with_student_enrol_df(student_results(), student_enrol())
+    # A left join on the lower case and trimmed name, in the order of the exams data
+    assert df['StudentName2'].tolist() == ['jane doe', 'nobody', 'john roe', 'kim lee']
+    assert df['stuCardID'].tolist() == ['S1', np.nan, 'S2', np.nan]
+    assert df['Student2'].tolist() == ['jane doe', np.nan, 'john roe', np.nan]
+
+
+def test_merge_with_prebuilt_index():
+    df_student_enrol = student_enrol()
+    index = EnrolmentIndex(df_student_enrol)
+    for _ in range(2):
+        pd.testing.assert_frame_equal(merge_exams_data_with_student_enrol_df(student_results(), index),
+                                      merge_exams_data_with_student_enrol_df(student_results(), df_student_enrol))
+    # The enrolments themselves are left unchanged
+    pd.testing.assert_frame_equal(df_student_enrol, student_enrol())
+
+
+def test_merge_disambiguates_when_asked(capsys):
+    df = merge_exams_data_with_student_enrol_df(student_results(), student_enrol(), disambiguate=True)
+    # Kim Lee of AIL101 in 2018-19 is a single enrolment
+    assert df['stuCardID'].tolist() == ['S1', np.nan, 'S2', 'S4']
+    assert 'Matched 1 more rows' in capsys.readouterr().out
+
+
+def test_normalize_answers():
+    df_items = pd.DataFrame({'ITEM_001': [' a ', '(A,B)', '', np.nan, 'b&c', 'x', 3],
+                             'ITEM_002': [1.0, '2', ' ', '1`', None, 'BLANK', 'mult']}, dtype=object)
+    answers, valid, (rows, columns) = normalize_answers(df_items)
+    # Stripped and upper cased (a lower case answer used to stay invalid),
+    # multiple answers are MULT and missing or empty answers BLANK
+    assert answers[:, 0].tolist() == ['A', 'MULT', 'BLANK', 'BLANK', 'MULT', 'X', 3]
+    assert answers[:, 1].tolist() == [1.0, '2', 'BLANK', '1`', 'BLANK', 'BLANK', 'MULT']
+    assert valid.tolist() == [[True, False], [True, False], [True, True], [True, False],
+                              [True, True], [False, True], [False, True]]
+    assert list(zip(rows.tolist(), columns.tolist())) == [(0, 1), (1, 1), (3, 1), (5, 0), (6, 0)]
+
+
+def test_normalize_answers_numeric_last_item():
+    df_items = pd.DataFrame({'ITEM_001': [12.5, 'A'], 'ITEM_002': [12.5, '7']}, dtype=object)
+    _, valid, _ = normalize_answers(df_items, numeric_last_item=True)
+    # Only the last item of a High School test can be a numeric
+    assert valid.tolist() == [[False, True], [True, True]]
+
+
+def items_results(test):
+    return pd.DataFrame({
+        'TestID': [test] * 4,
+        'TestName': ['Test'] * 4,
+        'SchoolYear': ['2018-19'] * 4,
+        'Item_001_AS0602010401E_ddd': [' D ', '(A,B)', '', 'Z'],
+        'Item_002_AS0602010402M_aaa': ['B', np.nan, 'C&D', 'BLANK'],
+        'Item_003_AS0602010403M_num': ['MULT', 'A', '7', '1`'],
+    })
+
+
+def clean_items_answers(test, capsys, **kwargs):
+    df = clean_items(items_results(test), 'file.xlsx', remove_items_metadata=True, **kwargs)
+    assert [c for c in df.columns if c.startswith('ITEM_')] == ['ITEM_001', 'ITEM_002', 'ITEM_003']
+    return df[['ITEM_001', 'ITEM_002', 'ITEM_003']].to_numpy().T.tolist(), capsys.readouterr().out
+
+
+# The answers and messages of the former per cell clean_items on items_results
+BASELINE = {
+    ('A03', False): ([['D', 'MULT', 'BLANK', 'Z'], ['B', 'BLANK', 'MULT', 'BLANK'], ['MULT', 'A', '7', '1`']],
+                     "Invalid answers detected in test Test year 2018-19 (from excel file file.xlsx). "
+                     "Invalid answers are in ['ITEM_001 rows: [5]', 'ITEM_003 rows: [4 5]']\n"),
+    ('A03', True): ([['D', 'MULT', 'BLANK', 'BLANK'], ['B', 'BLANK', 'MULT', 'BLANK'], ['MULT', 'A', 'BLANK', 'BLANK']],
+                    ''),
+    ('H08', False): ([['D', 'MULT', 'BLANK', 'Z'], ['B', 'BLANK', 'MULT', 'BLANK'], ['MULT', 'A', '7', '1`']],
+                     "Invalid answers detected in test Test (note: supposedly a High School test) year 2018-19 "
+                     "(from excel file file.xlsx). Invalid answers are in ['ITEM_001 rows: [5]', 'ITEM_003 rows: [5]']\n"),
+}
+
+
+@pytest.mark.parametrize('test, skip_incorrect_answers', list(BASELINE))
+def test_clean_items_same_as_baseline(capsys, test, skip_incorrect_answers):
+    answers, out = clean_items_answers(test, capsys, skip_incorrect_answers=skip_incorrect_answers)
+    assert (answers, out) == BASELINE[test, skip_incorrect_answers]
+
+
+def test_clean_items_upper_cases_answers(capsys):
+    df = items_results('A03')
+    df['Item_001_AS0602010401E_ddd'] = [' a ', 'b', '(a,b)', 'c&d']
+    df = clean_items(df, 'file.xlsx', remove_items_metadata=True)
+    # The baseline kept 'a', 'b', '(a,b)' and 'c&d' as they were and flagged them all as invalid
+    assert df['ITEM_001'].tolist() == ['A', 'B', 'MULT', 'MULT']
+    assert 'ITEM_001' not in capsys.readouterr().out
+
+
+def test_clean_items_h08_skip_keeps_valid_last_item(capsys):
+    answers, _ = clean_items_answers('H08', capsys, skip_incorrect_answers=True)
+    # The baseline blanked the whole last item (['BLANK', 'BLANK', 'BLANK', 'BLANK']) since
+    # its mask of the standard items did not cover it
+    assert answers == [['D', 'MULT', 'BLANK', 'BLANK'], ['B', 'BLANK', 'MULT', 'BLANK'], ['MULT', 'A', '7', 'BLANK']]
+
+
+def test_clean_items_h08_numeric_last_item_only(capsys):
+    df = items_results('H08')
+    df['Item_001_AS0602010401E_ddd'] = ['7', 'A', 'B', 'C']
+    clean_items(df, 'file.xlsx', remove_items_metadata=True)
+    # The baseline also accepted numerics in the other items of a High School test
+    assert "Invalid answers are in ['ITEM_001 rows: [2]', 'ITEM_003 rows: [5]']" in capsys.readouterr().out
@@ -0,0 +1,70 @@
+"""Resolution of exams school names to EMIS school IDs."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from exams.school_aliases import SchoolAliasResolver, canonical_school_keys, schools_lookup_from_exams_byname
+
+ALIASES = {
+    'Woja A-Ailinglaplap': 'AIL108',
+    'Woja M-Majuro': 'MAJ127',
+    'Aerok A-Ailinglaplap': 'AIL100',
+    'Ailuk-Ailuk': 'AIL101',
+}
+
+
+def resolve(keys, aliases=ALIASES, **kwargs):
+    """The school IDs of keys, None when unknown."""
+    school_ids = SchoolAliasResolver(aliases, **kwargs).resolve(pd.Series(keys, dtype=object))
+    return school_ids.where(school_ids.notna(), None).tolist()
+
+
+def test_canonical_school_keys():
+    keys = pd.Series(['Aerok, A -Ailinglaplap ', 'AILUK  - Alluk', 'Kwajlein High Seconday-Kwajalein'])
+    assert canonical_school_keys(keys).tolist() == [
+        'aerok a-ailinglaplap', 'ailuk-ailuk', 'kwajalein high secondary-kwajalein']
+
+
+def test_resolve_by_canonical_name():
+    assert resolve(['Woja A -Ailinglaplap', 'woja m-MAJURO', 'Ailuk -Ailuk ', 'Unknown-Majuro', np.nan]) == [
+        'AIL108', 'MAJ127', 'AIL101', None, None]
+
+
+def test_no_approximate_match_when_disabled():
+    assert resolve(['Woja A-Ailinglaplp'], fuzzy_cutoff=None) == [None]
+
+
+def test_approximate_match_by_default(capsys):
+    assert resolve(['Woja A-Ailinglaplp', 'Aerk A-Ailinglaplap']) == ['AIL108', 'AIL100']
+    assert "'aerk a-ailinglaplap' approximately matched to 'aerok a-ailinglaplap' (AIL100)" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('cutoff', [50, 90])
+def test_approximate_match_never_takes_another_school(cutoff):
+    # The school name differs by one letter only (Woja A vs Woja M)
+    assert resolve(['Woja A-Majuro', 'Woja M-Ailinglaplap', 'Aerok M-Ailinglaplap'], fuzzy_cutoff=cutoff) == [
+        None, None, None]
+
+
+def test_approximate_match_of_the_island(capsys):
+    assert resolve(['Woja A-Ailinglaplp', 'Woja M-Majro'], fuzzy_cutoff=90) == ['AIL108', 'MAJ127']
+    out = capsys.readouterr().out
+    assert "'woja a-ailinglaplp' approximately matched to 'woja a-ailinglaplap' (AIL108)" in out
+    assert "'woja m-majro' approximately matched to 'woja m-majuro' (MAJ127)" in out
+
+
+def test_hard_coded_mapping():
+    # Every hard coded name resolves to its own school ID (or to another name of same canonical form)
+    keys = list(schools_lookup_from_exams_byname)
+    resolver = SchoolAliasResolver(schools_lookup_from_exams_byname)
+    school_ids = resolver.resolve(pd.Series(keys, dtype=object))
+    assert school_ids.notna().sum() == sum(1 for v in schools_lookup_from_exams_byname.values() if v)
+    canonical = canonical_school_keys(pd.Series(keys))
+    assert (school_ids.to_numpy() == resolver.index.reindex(canonical).to_numpy()).all()
+
+
+def test_hard_coded_mapping_approximate_matches(capsys):
+    # Each name left out of the mapping is either unknown or approximately matched to its own school
+    aliases = list(schools_lookup_from_exams_byname.items())
+    for i, (key, school_id) in enumerate(aliases):
+        assert resolve([key], dict(aliases[:i] + aliases[i + 1:])) in ([None], [school_id])
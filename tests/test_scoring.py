@@ -0,0 +1,54 @@
+"""Scoring of the responses and the derived AggregateScores totals."""
+import numpy as np
+import pandas as pd
+
+from exams.aggregate import aggregate_scores
+from exams.hierarchy import ItemHierarchy
+from exams.scoring import parse_answer_key, score_matrix
+
+ACHIEVEMENT_LEVELS = ['Beginning', 'Developing', 'Proficient', 'Advanced']
+
+# A single indicator A.6.2.1.4 of 4 items (answers D, A, B, C)
+ITEMS = ['Item_001_AS0602010401E_ddd', 'Item_002_AS0602010401M_aaa',
+         'Item_003_AS0602010401E_bbb', 'Item_004_AS0602010401E_ccc']
+
+
+def test_parse_answer_key():
+    assert parse_answer_key(ITEMS).tolist() == ['D', 'A', 'B', 'C']
+    # The last letter of the header is the answer (also for the upper case headers
+    # of soe-assessment-test-analysis)
+    assert parse_answer_key(['Item_005_AS0602010401E_abc', 'ITEM_006_AS0602010401E_DDB']).tolist() == ['C', 'B']
+
+
+def test_score_matrix_business_rule():
+    # Only a string equal to the key (case insensitive) is correct
+    df = pd.DataFrame({ITEMS[0]: ['D', 'd', ' d ', 'DD', np.nan, 4]})
+    assert score_matrix(df, ITEMS[:1])[:, 0].tolist() == [1, 1, 0, 0, 0, 0]
+    assert score_matrix(df, ITEMS[:1], strip=True)[:, 0].tolist() == [1, 1, 1, 0, 0, 0]
+
+
+def test_score_matrix_is_signed():
+    df = pd.DataFrame([['D', 'A', 'B', 'C'], ['A', 'A', 'A', 'A']], columns=ITEMS)
+    scores = score_matrix(df)
+    assert scores.dtype == np.int8
+    # Unsigned scores used to wrap around (e.g. 18446744073709551611 instead of -5)
+    assert (scores.sum(axis=1) - 6).tolist() == [-2, -5]
+
+
+def test_aggregate_scores_totals_and_percent_labels():
+    df_scores = pd.DataFrame([[1, 1, 1, 1], [0, 1, 1, 0], [0, 0, 0, 0]], columns=ITEMS)
+    df = aggregate_scores(df_scores, ItemHierarchy(ITEMS), ACHIEVEMENT_LEVELS)
+
+    assert df['TotalScore'].tolist() == [4, 2, 0]
+    assert df['TotalScore_LowerLimit'].tolist() == [-2, -4, -6]
+    assert df['TotalScore_UpperLimit'].tolist() == [10, 8, 6]
+
+    # Following SOE the test LxPercent columns are not prefixed, the others are
+    for c in ['L1Percent', 'L2Percent', 'L3Percent', 'L4Percent',
+              'A.6.2_L1Percent', 'A.6.2.1_L4Percent', 'A.6.2.1.4Level', 'A.6Level']:
+        assert c in df.columns
+    assert 'A.6_L1Percent' not in df.columns
+    assert df[['L1Percent', 'L2Percent', 'L3Percent', 'L4Percent']].to_numpy().tolist() == [
+        [0, 0, 0, 1], [0, 1, 0, 0], [1, 0, 0, 0]]
+    assert df['A.6Level'].tolist() == ['Advanced', 'Developing', 'Beginning']
+    assert df['AYP'].tolist() == [1, 0, 0]
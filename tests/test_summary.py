@@ -0,0 +1,87 @@
+"""Results sheet summaries and the results cube against the original per column groupby."""
+import numpy as np
+import pandas as pd
+
+from exams.cube import ResultsCube
+from exams.summary import RubricSummary, level_summaries
+
+LEVELS = ['Beginning', 'Developing', 'Proficient', 'Advanced']
+COLS_LEVELS = ['A.6.2.1.3Level', 'A.6.2.1.4Level', 'A.6.2.2.1Level']
+
+
+def students():
+    rng = np.random.default_rng(0)
+    n = 40
+    df = pd.DataFrame({
+        'StudentName': ['Student {}'.format(i) for i in range(n)],
+        'IslandName': rng.choice(['Majuro', 'Ebeye'], n),
+        'SchoolName': rng.choice(['Aerok A', 'Woja M', 'Delap'], n),
+        'Gender': rng.choice(['F', 'M'], n),
+    })
+    for c in COLS_LEVELS:
+        df[c] = pd.Categorical(rng.choice(LEVELS, n), categories=LEVELS, ordered=True)
+    # Nobody Advanced in one column, a student without name and one without gender
+    df.loc[df['A.6.2.2.1Level'] == 'Advanced', 'A.6.2.2.1Level'] = 'Proficient'
+    df.loc[3, 'StudentName'] = np.nan
+    df.loc[5, 'Gender'] = np.nan
+    return df
+
+
+def baseline_summaries(df_metric, cols_levels):
+    """The summaries as the soe-assessment notebook first computed them (one groupby per column)."""
+    metrics = []
+    for m in cols_levels:
+        df = df_metric[['StudentName', m]].groupby([m], observed=True).count()
+        df.rename(columns={'StudentName': m.split('Level')[0]}, inplace=True)
+        df.index.name = None
+        metrics.append(df)
+    metric_gender = []
+    for m in cols_levels:
+        df = df_metric[['StudentName', 'Gender', m]].groupby([m, 'Gender'], observed=True).count()
+        df = df.unstack()
+        df.rename(columns={'StudentName': m.split('Level')[0]}, inplace=True)
+        df.index.name = None
+        metric_gender.append(df)
+    return pd.concat(metrics, axis=1), pd.concat(metric_gender, axis=1)
+
+
+def assert_same_summaries(summaries, expected):
+    for df, df_expected in zip(summaries, expected):
+        pd.testing.assert_frame_equal(df.reset_index(drop=True), df_expected.reset_index(drop=True),
+                                      check_dtype=False, check_column_type=False)
+        assert [str(level) for level in df.index] == [str(level) for level in df_expected.index]
+
+
+def test_level_summaries_same_as_groupby():
+    df = students()
+    assert_same_summaries(level_summaries(df, COLS_LEVELS, LEVELS), baseline_summaries(df, COLS_LEVELS))
+
+
+def test_results_cube_same_as_groupby():
+    df = students()
+    cube = ResultsCube(df, {'indicators': COLS_LEVELS}, LEVELS)
+    assert_same_summaries(cube.summaries('indicators'), baseline_summaries(df, COLS_LEVELS))
+    # A school is a slice of the cube
+    school = df[df['SchoolName'] == 'Aerok A']
+    assert_same_summaries(cube.summaries('indicators', SchoolName='Aerok A'), baseline_summaries(school, COLS_LEVELS))
+    assert cube.to_frame()['Students'].sum() == df['StudentName'].notna().sum() * len(COLS_LEVELS)
+
+
+def test_rubric_summary_frames():
+    df = students()
+    descriptions = {'A.6.2.1.3': 'Add', 'A.6.2.1.4': 'Subtract', 'A.6.2.2.1': 'Count'}
+    summary = ResultsCube(df, {'indicators': COLS_LEVELS}, LEVELS).rubric_summary('indicators', descriptions)
+    expected, expected_gender = baseline_summaries(df, COLS_LEVELS)
+    assert len(summary) == len(RubricSummary.VARIANTS)
+    assert_same_summaries([summary['df_indicators_summary'], summary['df_indicators_summary_gender']],
+                          [expected, expected_gender])
+    assert list(summary['df_indicators_summary_x'].columns) == ['Add', 'Subtract', 'Count']
+    df_tot = summary['df_indicators_summary_tot']
+    assert df_tot.loc['Total'].tolist() == [df['StudentName'].notna().sum()] * len(COLS_LEVELS)
+
+    # Percents ready for charts: the lower levels negative, a Total row of 100%
+    df_per = summary['df_indicators_summary_per']
+    assert list(df_per.index) == ['Proficient', 'Advanced', 'Developing', 'Beginning', 'Total']
+    assert (df_per.loc[['Developing', 'Beginning']].fillna(0) <= 0).all().all()
+    np.testing.assert_allclose(df_per.loc['Total'], 1.0, atol=0.02)
+    assert df_per.columns[0] == 'A.6.2.1.3 (n=39)'